@@ -3,150 +3,253 @@
 Each specialist agent can be invoked directly via:
 POST /api/v1/agent/{agent_name}/run
 
+Several agents can be run concurrently on one or more claims via:
+POST /api/v1/agent/batch/run
+
 The request body mirrors the existing ``ClaimIn`` schema.  The endpoint
 returns the serialized message list from that single agent.
 """
 from __future__ import annotations
 
-import re
+import asyncio
+import time
 import uuid
 import logging
 from typing import Any, List
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import ORJSONResponse
 
 from app.models.claim import ClaimIn
-from app.models.agent import AgentRunOut, AgentContinueIn
+from app.models.agent import AgentBatchIn, AgentRunOut, AgentContinueIn
 from app.models.agent_models import AgentExecution, AgentStepExecution, ExecutionStatus
 from app.services.single_agent import run as run_single_agent, UnknownAgentError
-from app.services.cosmos_service import get_cosmos_service
+from app.services.cosmos_service import get_cosmos_service_if_ready, get_execution_write_queue
+from app.workflow.azure_agent_client_v2 import get_project_client_v2, run_agent_v2
+from app.workflow.azure_agent_manager_v2 import get_azure_agent_id_v2
 from app.api.v1.endpoints.workflow import (
+    DECISION_PATTERN,  # re-exported for external reuse
     get_sample_claim_by_id,
     _serialize_msg,  # reuse existing serializer
 )
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["agent"])
+router = APIRouter(tags=["agent"], default_response_class=ORJSONResponse)
 
-# Re-use decision pattern from workflow endpoint if needed externally
-DECISION_PATTERN = re.compile(
-    r"\b(APPROVED|DENIED|REQUIRES_INVESTIGATION)\b", re.IGNORECASE
+# Tool attributes reported by /agent/{name}/info, one per tool definition type
+_TOOL_FIELDS = (
+    "name",
+    "description",
+    "function",
+    "file_search",
+    "code_interpreter",
+    "azure_ai_search",
+    "bing_grounding",
+    "fabric_dataagent",
+    "openapi",
 )
 
+# /agent/{name}/info payloads keyed by Azure agent ID, with expiry
+# (monotonic time). Agents can be updated in place under the same ID, so
+# entries are only trusted for a few minutes.
+_AGENT_INFO_CACHE: dict[str, tuple[dict, float]] = {}
+_AGENT_INFO_TTL_SECONDS = 300.0
 
-@router.post("/agent/{agent_name}/run", response_model=AgentRunOut)
-async def agent_run(agent_name: str, claim: ClaimIn):  # noqa: D401
-    """Run a single specialist agent and return its conversation trace.
-    
-    For the Claims Data Analyst agent with Fabric integration, pass a user_token
-    obtained from Azure AD sign-in on the frontend. This is required for Fabric
-    Data Agent's identity passthrough (On-Behalf-Of) authentication.
-    """
+# Agent runs of one batch request in flight at once
+_BATCH_CONCURRENCY = 4
+
+# GPT-4o pricing, USD per token
+_PROMPT_COST = 0.005 / 1000
+_COMPLETION_COST = 0.015 / 1000
+
+
+def _err(status_code: int, detail: str) -> ORJSONResponse:
+    """Build an error response directly instead of raising HTTPException."""
+    return ORJSONResponse({"detail": detail}, status_code=status_code)
+
+
+def _estimate_cost(usage_info: dict) -> float:
+    """Estimate the USD cost of a single agent run from its token usage."""
+    prompt_tokens = usage_info.get('prompt_tokens', 0)
+    completion_tokens = usage_info.get('completion_tokens', 0)
+    return prompt_tokens * _PROMPT_COST + completion_tokens * _COMPLETION_COST
+
+
+def _error_status(exc: BaseException) -> tuple[int, str]:
+    """Map an agent run failure to an HTTP status code and detail."""
+    if isinstance(exc, UnknownAgentError):
+        # 503 if agent is still deploying, 404 if truly unknown
+        return (503 if "not ready yet" in str(exc) else 404), str(exc)
+    if isinstance(exc, HTTPException):
+        # e.g. unknown sample claim_id
+        return exc.status_code, exc.detail
+    return 500, str(exc)
+
+
+async def _execute_agent(agent_name: str, claim: ClaimIn, wait_for_save: bool = False) -> dict:
+    """Run one specialist agent, queue its execution record and build the payload.
 
+    The record goes through the shared ``ExecutionWriteQueue``; it is only
+    saved on the request path when ``wait_for_save`` is set.
+    """
     # Generate unique execution ID
     execution_id = str(uuid.uuid4())
     started_at = datetime.utcnow()
-    
+    t0 = time.perf_counter()
+
     # Extract user_token for Fabric Data Agent authentication
     user_token = claim.user_token
 
-    try:
-        # ------------------------------------------------------------------
-        # 1. Load sample claim or use provided data (same logic as supervisor)
-        # ------------------------------------------------------------------
-        if claim.claim_id:
-            claim_data = get_sample_claim_by_id(claim.claim_id)
-
-            # Merge/override with any additional fields supplied in request
-            override_data = {
-                k: v
-                for k, v in claim.model_dump(by_alias=True, exclude_none=True).items()
-                if k != "claim_id"
-            }
-            claim_data.update(override_data)
-        else:
-            claim_data = claim.to_dict()
+    # ------------------------------------------------------------------
+    # 1. Load sample claim or use provided data (same logic as supervisor)
+    # ------------------------------------------------------------------
+    # Single dump serves both branches (equivalent to claim.to_dict())
+    dumped = claim.model_dump(by_alias=True, exclude_none=True)
+    if claim.claim_id:
+        claim_data = get_sample_claim_by_id(claim.claim_id)
+
+        # Merge/override with any additional fields supplied in request
+        dumped.pop("claim_id", None)
+        claim_data.update(dumped)
+    else:
+        claim_data = dumped
 
-        # ------------------------------------------------------------------
-        # 2. Run the agent graph (token tracking handled internally)
-        # ------------------------------------------------------------------
-        raw_msgs, usage_info, thread_id = await run_single_agent(agent_name, claim_data, user_token=user_token)
+    # ------------------------------------------------------------------
+    # 2. Run the agent graph (token tracking handled internally)
+    # ------------------------------------------------------------------
+    raw_msgs, usage_info, thread_id = await run_single_agent(agent_name, claim_data, user_token=user_token)
 
-        # ------------------------------------------------------------------
-        # 3. Serialize messages for JSON response
-        # ------------------------------------------------------------------
-        chronological = [_serialize_msg(agent_name, m, include_node=False) for m in raw_msgs]
+    # ------------------------------------------------------------------
+    # 3. Serialize messages for JSON response
+    # ------------------------------------------------------------------
+    chronological = [_serialize_msg(agent_name, m, include_node=False) for m in raw_msgs]
 
+    duration_ms = (time.perf_counter() - t0) * 1000
+
+    # ------------------------------------------------------------------
+    # 4. Save individual agent execution to Cosmos DB
+    # ------------------------------------------------------------------
+    cosmos_service = get_cosmos_service_if_ready()
+    if cosmos_service is not None:
         completed_at = datetime.utcnow()
-        duration_ms = (completed_at - started_at).total_seconds() * 1000
-
-        # ------------------------------------------------------------------
-        # 4. Save individual agent execution to Cosmos DB
-        # ------------------------------------------------------------------
-        cosmos_service = await get_cosmos_service()
-        if cosmos_service._initialized:
-            # Create agent step execution with token usage
-            agent_step = AgentStepExecution(
-                agent_type=agent_name,
-                agent_version="1.0.0",
-                started_at=started_at,
-                completed_at=completed_at,
-                duration_ms=duration_ms,
-                input_data={"claim_id": claim_data.get("claim_id", "unknown"), "claim_data": claim_data},
-                output_data={"messages": chronological},
-                token_usage=usage_info,  # Populate with actual token usage
-                status=ExecutionStatus.COMPLETED
-            )
-
-            # Calculate total tokens for the execution record
-            total_tokens = usage_info.get('total_tokens', 0) if usage_info else 0
-            total_cost = 0.0
-            if total_tokens > 0:
-                # Estimate cost using GPT-4o pricing
-                total_cost = (usage_info.get('prompt_tokens', 0) * 0.005 + 
-                             usage_info.get('completion_tokens', 0) * 0.015) / 1000
-
-            # Create execution record for individual agent
-            execution = AgentExecution(
-                id=execution_id,
-                workflow_id=execution_id,  # For individual agent, workflow_id is same as execution_id
-                workflow_type="single_agent_execution",
-                claim_id=claim_data.get("claim_id", "unknown"),
-                agent_steps=[agent_step],
-                final_result={"success": True, "messages_count": len(chronological)},
-                status=ExecutionStatus.COMPLETED,
-                started_at=started_at,
-                completed_at=completed_at,
-                duration_ms=duration_ms,
-                total_tokens=total_tokens,
-                total_cost=total_cost,
-                agents_invoked=[agent_name],
-                metadata={
-                    "single_agent": True,
-                    "agent_name": agent_name,
-                    "message_count": len(chronological),
-                    "thread_id": thread_id
-                }
-            )
-            await cosmos_service.save_execution(execution)
 
-        return AgentRunOut(
-            success=True,
-            agent_name=agent_name,
-            claim_body=claim_data,
-            conversation_chronological=chronological,
-            execution_id=execution_id,
-            thread_id=thread_id,
+        # Create agent step execution with token usage
+        agent_step = AgentStepExecution(
+            agent_type=agent_name,
+            agent_version="1.0.0",
+            started_at=started_at,
+            completed_at=completed_at,
+            duration_ms=duration_ms,
+            input_data={"claim_id": claim_data.get("claim_id", "unknown"), "claim_data": claim_data},
+            output_data={"messages": chronological},
+            token_usage=usage_info,  # Populate with actual token usage
+            status=ExecutionStatus.COMPLETED
         )
 
-    except UnknownAgentError as err:
-        # Return 503 if agent is still deploying, 404 if truly unknown
-        status = 503 if "not ready yet" in str(err) else 404
-        raise HTTPException(status_code=status, detail=str(err))
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc))
+        # Calculate total tokens for the execution record
+        total_tokens = usage_info.get('total_tokens', 0) if usage_info else 0
+        total_cost = _estimate_cost(usage_info) if total_tokens > 0 else 0.0
+
+        # Create execution record for individual agent
+        execution = AgentExecution(
+            id=execution_id,
+            workflow_id=execution_id,  # For individual agent, workflow_id is same as execution_id
+            workflow_type="single_agent_execution",
+            claim_id=claim_data.get("claim_id", "unknown"),
+            agent_steps=[agent_step],
+            final_result={"success": True, "messages_count": len(chronological)},
+            status=ExecutionStatus.COMPLETED,
+            started_at=started_at,
+            completed_at=completed_at,
+            duration_ms=duration_ms,
+            total_tokens=total_tokens,
+            total_cost=total_cost,
+            agents_invoked=[agent_name],
+            metadata={
+                "single_agent": True,
+                "agent_name": agent_name,
+                "message_count": len(chronological),
+                "thread_id": thread_id
+            }
+        )
+        if wait_for_save:
+            await cosmos_service.save_execution(execution)
+        else:
+            await get_execution_write_queue().put(execution)
+
+    # Serialized directly by ORJSONResponse, skipping AgentRunOut
+    # re-validation and jsonable_encoder on the way out.
+    return {
+        "success": True,
+        "agent_name": agent_name,
+        "claim_body": claim_data,
+        "conversation_chronological": chronological,
+        "execution_id": execution_id,
+        "thread_id": thread_id,
+    }
+
+
+@router.post("/agent/batch/run")
+async def agent_batch_run(
+    batch: AgentBatchIn,
+    wait_for_save: bool = Query(False, description="Persist execution records before responding"),
+):  # noqa: D401
+    """Run several specialist agents concurrently and return every trace.
+
+    Each run succeeds or fails on its own; failed runs report the status
+    code and detail the single-agent endpoint would have returned. At most
+    ``_BATCH_CONCURRENCY`` runs execute at a time.
+    """
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def bounded_run(item):
+        async with semaphore:
+            return await _execute_agent(item.agent_name, item.claim, wait_for_save)
+
+    outcomes = await asyncio.gather(
+        *(bounded_run(item) for item in batch.runs),
+        return_exceptions=True,
+    )
+
+    results = []
+    for item, outcome in zip(batch.runs, outcomes):
+        if isinstance(outcome, BaseException):
+            status, detail = _error_status(outcome)
+            logger.error(f"[AGENT_BATCH] {item.agent_name} failed ({status}): {detail}")
+            results.append({
+                "success": False,
+                "agent_name": item.agent_name,
+                "status_code": status,
+                "detail": detail,
+            })
+        else:
+            results.append(outcome)
+
+    return ORJSONResponse(content={"results": results, "total": len(results)})
+
+
+@router.post("/agent/{agent_name}/run", response_model=AgentRunOut)
+async def agent_run(
+    agent_name: str,
+    claim: ClaimIn,
+    wait_for_save: bool = Query(False, description="Persist the execution record before responding"),
+):  # noqa: D401
+    """Run a single specialist agent and return its conversation trace.
+    
+    For the Claims Data Analyst agent with Fabric integration, pass a user_token
+    obtained from Azure AD sign-in on the frontend. This is required for Fabric
+    Data Agent's identity passthrough (On-Behalf-Of) authentication.
+
+    The execution record is queued for a batched Cosmos DB write, like
+    ``/workflow/run`` does; pass ``wait_for_save=true`` to have it saved
+    before the response is sent.
+    """
+    try:
+        return ORJSONResponse(content=await _execute_agent(agent_name, claim, wait_for_save))
+    except Exception as exc:
+        return _err(*_error_status(exc))
 
 
 @router.post("/agent/{agent_name}/continue", response_model=AgentRunOut)
@@ -162,18 +265,15 @@ async def agent_continue(
     """
     logger.info(f"[AGENT_CONTINUE] Continuing conversation on thread {body.thread_id} for {agent_name}")
     
-    started_at = datetime.utcnow()
+    t0 = time.perf_counter()
     
     # Use token from header or body
     user_token = x_user_token or body.user_token
 
     try:
-        from app.workflow.azure_agent_manager_v2 import get_azure_agent_id_v2
-        from app.workflow.azure_agent_client_v2 import run_agent_v2
-        
         agent_id = get_azure_agent_id_v2(agent_name)
         if not agent_id:
-            raise HTTPException(status_code=404, detail=f"Agent '{agent_name}' not found")
+            return _err(404, f"Agent '{agent_name}' not found")
         
         # For follow-up messages, don't force tool_choice - let the model decide naturally
         # The model already knows about the Fabric tool and will call it when appropriate
@@ -182,8 +282,9 @@ async def agent_continue(
         
         logger.info(f"[AGENT_CONTINUE] Sending follow-up message: '{body.message[:100]}...'")
         
-        # Continue the conversation on the existing thread
-        azure_messages, usage_info, _, thread_id = run_agent_v2(
+        # Continue the conversation on the existing thread (blocking SDK call)
+        azure_messages, usage_info, _, thread_id = await asyncio.to_thread(
+            run_agent_v2,
             agent_id, 
             body.message, 
             tool_choice=tool_choice,
@@ -196,19 +297,18 @@ async def agent_continue(
         for msg in azure_messages:
             content = msg.get("content", "")
             if isinstance(content, list):
-                text_parts = []
-                for item in content:
-                    if item.get("type") == "text" and isinstance(item.get("text"), dict):
-                        text_parts.append(item["text"].get("value", ""))
-                content = "\n".join(text_parts)
+                content = "\n".join(
+                    item["text"].get("value", "")
+                    for item in content
+                    if item.get("type") == "text" and isinstance(item.get("text"), dict)
+                )
             
             chronological.append({
                 "role": "ai" if msg.get("role") == "assistant" else "human",
                 "content": content
             })
         
-        completed_at = datetime.utcnow()
-        duration_ms = (completed_at - started_at).total_seconds() * 1000
+        duration_ms = (time.perf_counter() - t0) * 1000
         
         logger.info(f"[AGENT_CONTINUE] Completed in {duration_ms:.0f}ms with {len(chronological)} messages")
         
@@ -222,42 +322,38 @@ async def agent_continue(
 
     except Exception as exc:
         logger.error(f"[AGENT_CONTINUE] Error: {exc}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(exc))
+        return _err(500, str(exc))
 
 
 @router.get("/agent/{agent_name}/info")
 async def agent_info(agent_name: str):
     """Get diagnostic information about an agent including its tools."""
     try:
-        from app.workflow.azure_agent_manager_v2 import get_azure_agent_id_v2
-        from app.workflow.azure_agent_client_v2 import get_project_client_v2
-        
         agent_id = get_azure_agent_id_v2(agent_name)
         if not agent_id:
-            raise HTTPException(status_code=404, detail=f"Agent '{agent_name}' not found")
+            return _err(404, f"Agent '{agent_name}' not found")
+        
+        cached = _AGENT_INFO_CACHE.get(agent_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
         
         project_client = get_project_client_v2()
-        agent = project_client.agents.get_agent(agent_id=agent_id)
+        agent = await asyncio.to_thread(project_client.agents.get_agent, agent_id=agent_id)
         
-        # Extract tool information
+        # Extract tool information from a fixed set of fields
         tools_info = []
         if hasattr(agent, 'tools') and agent.tools:
             for tool in agent.tools:
                 tool_dict = {
                     "type": getattr(tool, 'type', 'unknown'),
                 }
-                # Add all non-private attributes
-                for attr in dir(tool):
-                    if not attr.startswith('_') and not callable(getattr(tool, attr)):
-                        try:
-                            val = getattr(tool, attr)
-                            if val is not None and attr not in ['type']:
-                                tool_dict[attr] = str(val)[:200]  # Limit length
-                        except:
-                            pass
+                for attr in _TOOL_FIELDS:
+                    val = getattr(tool, attr, None)
+                    if val is not None:
+                        tool_dict[attr] = str(val)[:200]  # Limit length
                 tools_info.append(tool_dict)
         
-        return {
+        info = {
             "agent_name": agent_name,
             "agent_id": agent_id,
             "model": getattr(agent, 'model', 'unknown'),
@@ -266,8 +362,12 @@ async def agent_info(agent_name: str):
             "instructions_length": len(agent.instructions) if hasattr(agent, 'instructions') else 0,
             "instructions_preview": agent.instructions[:500] if hasattr(agent, 'instructions') else None
         }
-    except HTTPException:
-        raise
+        now = time.monotonic()
+        # Drop expired entries, e.g. for agents replaced by a redeploy
+        for stale_id in [key for key, (_, expires) in _AGENT_INFO_CACHE.items() if expires <= now]:
+            del _AGENT_INFO_CACHE[stale_id]
+        _AGENT_INFO_CACHE[agent_id] = (info, now + _AGENT_INFO_TTL_SECONDS)
+        return info
     except Exception as e:
         logger.error(f"[AGENT_INFO] Error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        return _err(500, str(e))
@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from app.models.agent_models import (
@@ -19,7 +21,7 @@ from app.services.token_tracker import get_token_tracker
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/agents", tags=["agents"])
+router = APIRouter(prefix="/agents", tags=["agents"], default_response_class=ORJSONResponse)
 
 
 # ==================== REQUEST/RESPONSE MODELS ====================
@@ -55,9 +57,28 @@ class ClaimTokenSummaryResponse(BaseModel):
     total_calls: int
 
 
+def _list_response(key: str, items: list) -> ORJSONResponse:
+    """Serialize a list of models straight to JSON, skipping ``jsonable_encoder``."""
+    return ORJSONResponse(
+        content={key: [item.model_dump(mode="json") for item in items], "total": len(items)}
+    )
+
+
+async def _stream_json_array(key: str, items: AsyncIterator) -> AsyncIterator[bytes]:
+    """Stream ``{"<key>": [...], "total": n}`` one serialized item at a time."""
+    yield b'{"' + key.encode() + b'":['
+    total = 0
+    async for item in items:
+        if total:
+            yield b","
+        yield orjson.dumps(item.model_dump(mode="json"))
+        total += 1
+    yield b'],"total":' + str(total).encode() + b"}"
+
+
 # ==================== AGENT DEFINITIONS ====================
 
-@router.get("/definitions", response_model=AgentDefinitionListResponse)
+@router.get("/definitions", responses={200: {"model": AgentDefinitionListResponse}})
 async def list_agent_definitions(
     agent_type: Optional[AgentType] = Query(None, description="Filter by agent type"),
     is_active: Optional[bool] = Query(None, description="Filter by active status")
@@ -75,10 +96,7 @@ async def list_agent_definitions(
             is_active=is_active
         )
         
-        return AgentDefinitionListResponse(
-            agents=agents,
-            total=len(agents)
-        )
+        return _list_response("agents", agents)
         
     except Exception as e:
         logger.error(f"Failed to list agent definitions: {e}")
@@ -138,7 +156,7 @@ async def save_agent_definition(agent_def: AgentDefinition):
 
 # ==================== AGENT EXECUTIONS ====================
 
-@router.get("/executions", response_model=AgentExecutionListResponse)
+@router.get("/executions", responses={200: {"model": AgentExecutionListResponse}})
 async def list_executions(
     claim_id: Optional[str] = Query(None, description="Filter by claim ID"),
     status: Optional[ExecutionStatus] = Query(None, description="Filter by execution status"),
@@ -152,15 +170,15 @@ async def list_executions(
     try:
         cosmos_service = await get_cosmos_service()
         
-        executions = await cosmos_service.list_executions(
+        executions = cosmos_service.list_executions_stream(
             claim_id=claim_id,
             status=status,
             limit=limit
         )
         
-        return AgentExecutionListResponse(
-            executions=executions,
-            total=len(executions)
+        return StreamingResponse(
+            _stream_json_array("executions", executions),
+            media_type="application/json"
         )
         
     except Exception as e:
@@ -195,7 +213,7 @@ async def get_execution(execution_id: str):
         raise HTTPException(status_code=500, detail="Failed to retrieve execution")
 
 
-@router.get("/executions/claim/{claim_id}", response_model=AgentExecutionListResponse)
+@router.get("/executions/claim/{claim_id}", responses={200: {"model": AgentExecutionListResponse}})
 async def get_claim_execution_history(claim_id: str):
     """Get all execution records for a specific claim.
     
@@ -208,11 +226,11 @@ async def get_claim_execution_history(claim_id: str):
     try:
         cosmos_service = await get_cosmos_service()
         
-        executions = await cosmos_service.get_claim_execution_history(claim_id)
+        executions = cosmos_service.list_executions_stream(claim_id=claim_id)
         
-        return AgentExecutionListResponse(
-            executions=executions,
-            total=len(executions)
+        return StreamingResponse(
+            _stream_json_array("executions", executions),
+            media_type="application/json"
         )
         
     except Exception as e:
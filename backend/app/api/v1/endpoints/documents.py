@@ -5,28 +5,33 @@ and integration with Azure AI Search for indexing uploaded documents.
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import bisect
+import hashlib
 import logging
-import uuid
+import orjson
+import os
+import time
+import weakref
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import List, Optional, Dict, Any
-from io import BytesIO
+from typing import List, Optional, Dict, Any, Set, Tuple
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from app.services.azure_storage import get_azure_storage_service
 from app.services.azure_search import get_azure_search_service
-from app.services.content_understanding_service import ContentUnderstandingClient
-from app.workflow.pdf_processor import get_pdf_processor
+from app.services.content_understanding_service import get_content_understanding_service
+from app.utils.pdf_parse import parse_pdf_bytes
+from app.workflow.pdf_processor import get_pdf_processor, get_pdf_process_pool
 from app.core.config import get_settings
 from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document as LangChainDocument
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["documents"])
+router = APIRouter(tags=["documents"], default_response_class=ORJSONResponse)
 
 # Pydantic models
 class DocumentMetadata(BaseModel):
@@ -41,11 +46,26 @@ class DocumentMetadata(BaseModel):
     blob_name: str
     blob_url: str
     metadata: Dict[str, Any] = {}
+    duplicate: bool = False
+    
+    @property
+    def file_extension(self) -> str:
+        """Lower-cased extension of the stored file, including the dot."""
+        return os.path.splitext(self.filename)[1].lower()
+    
+    @staticmethod
+    def _doc_id_from_blob(blob_name: str) -> Optional[Tuple[str, str, str]]:
+        """Split a ``category/<id>.<ext>`` blob name into category, filename and id."""
+        category, sep, filename = blob_name.partition('/')
+        if not sep or '/' in filename:
+            return None
+        return category, filename, os.path.splitext(filename)[0]
 
 class DocumentUploadResponse(BaseModel):
     success: bool
     documents: List[DocumentMetadata]
     message: str
+    errors: List[str] = []
 
 class DocumentListResponse(BaseModel):
     documents: List[DocumentMetadata]
@@ -59,54 +79,651 @@ class DocumentResponse(BaseModel):
     document: DocumentMetadata
     download_url: Optional[str] = None
 
+class MetadataStore:
+    """In-memory document metadata with secondary indexes for listing.
+    
+    Documents are indexed by id, by category and by indexed state, and kept
+    in newest-first order so listings don't scan and sort the whole cache.
+    """
+    
+    def __init__(self):
+        self.by_id: Dict[str, DocumentMetadata] = {}
+        self.by_category: Dict[str, Dict[str, DocumentMetadata]] = defaultdict(dict)
+        self.indexed_ids: Set[str] = set()
+        # Indexed document count per category, kept in step with indexed_ids
+        # so status endpoints don't have to scan every document
+        self._indexed_by_category: Dict[str, int] = defaultdict(int)
+        # (-upload timestamp, id) pairs in ascending order, i.e. newest first,
+        # for all documents and per category
+        self._by_date: List[Tuple[float, str]] = []
+        self._by_category_date: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        # Bumped on every change so derived caches know when to refresh
+        self.version = 0
+        # Store version at which each document was last added or replaced
+        self._added_version: Dict[str, int] = {}
+    
+    @staticmethod
+    def _date_key(doc: DocumentMetadata) -> Tuple[float, str]:
+        return (-doc.upload_date.timestamp(), doc.id)
+    
+    def add(self, doc: DocumentMetadata) -> None:
+        """Add or replace a document."""
+        if doc.id in self.by_id:
+            self.remove(doc.id)
+        self.by_id[doc.id] = doc
+        self.by_category[doc.category][doc.id] = doc
+        if doc.indexed:
+            self.indexed_ids.add(doc.id)
+            self._indexed_by_category[doc.category] += 1
+        key = self._date_key(doc)
+        bisect.insort(self._by_date, key)
+        bisect.insort(self._by_category_date[doc.category], key)
+        self.version += 1
+        self._added_version[doc.id] = self.version
+    
+    def remove(self, doc_id: str) -> Optional[DocumentMetadata]:
+        """Remove a document, returning it if it was present."""
+        doc = self.by_id.pop(doc_id, None)
+        if doc is None:
+            return None
+        self._added_version.pop(doc_id, None)
+        category_docs = self.by_category.get(doc.category)
+        if category_docs is not None:
+            category_docs.pop(doc_id, None)
+            if not category_docs:
+                del self.by_category[doc.category]
+        if doc_id in self.indexed_ids:
+            self.indexed_ids.discard(doc_id)
+            self._indexed_by_category[doc.category] -= 1
+        key = self._date_key(doc)
+        self._discard_sorted(self._by_date, key)
+        category_dates = self._by_category_date.get(doc.category)
+        if category_dates is not None:
+            self._discard_sorted(category_dates, key)
+            if not category_dates:
+                del self._by_category_date[doc.category]
+        self.version += 1
+        return doc
+    
+    @staticmethod
+    def _discard_sorted(keys: List[Tuple[float, str]], key: Tuple[float, str]) -> None:
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+    
+    def added_since(self, doc_id: str, version: int) -> bool:
+        """Whether a document was added or replaced after the store was at ``version``."""
+        return self._added_version.get(doc_id, 0) > version
+    
+    def mark_indexed(self, doc_id: str) -> bool:
+        """Flag a document as added to its search index.
+        
+        Returns False if the document was removed in the meantime.
+        """
+        doc = self.by_id.get(doc_id)
+        if doc is None:
+            return False
+        doc.indexed = True
+        if doc_id not in self.indexed_ids:
+            self.indexed_ids.add(doc_id)
+            self._indexed_by_category[doc.category] += 1
+        self.version += 1
+        return True
+    
+    def clear_indexed(self) -> None:
+        """Flag every document as not indexed, e.g. after an index reset."""
+        for doc_id in self.indexed_ids:
+            self.by_id[doc_id].indexed = False
+        self.indexed_ids.clear()
+        self._indexed_by_category.clear()
+        self.version += 1
+    
+    def count(self, category: Optional[str] = None) -> int:
+        """Number of documents, optionally limited to one category."""
+        if category is None:
+            return len(self.by_id)
+        return len(self.by_category.get(category, ()))
+    
+    def indexed_count(self, category: Optional[str] = None) -> int:
+        """Number of indexed documents, optionally limited to one category."""
+        if category is None:
+            return len(self.indexed_ids)
+        return self._indexed_by_category.get(category, 0)
+    
+    def list(
+        self,
+        category: Optional[str] = None,
+        indexed_only: bool = False,
+        skip: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[DocumentMetadata], int]:
+        """Return one page of matching documents (newest first) and the match count."""
+        end = None if limit is None else skip + limit
+        
+        if category is None:
+            ordered = self._by_date
+        else:
+            ordered = self._by_category_date.get(category, [])
+        
+        if not indexed_only:
+            page = [self.by_id[doc_id] for _, doc_id in ordered[skip:end]]
+            return page, len(ordered)
+        
+        # Walk the ordered keys only as far as the requested page reaches
+        if category is None:
+            total = len(self.indexed_ids)
+        else:
+            total = len(self.by_category.get(category, {}).keys() & self.indexed_ids)
+        page = []
+        seen = 0
+        for _, doc_id in ordered:
+            if doc_id not in self.indexed_ids:
+                continue
+            if seen >= skip:
+                page.append(self.by_id[doc_id])
+            seen += 1
+            if end is not None and seen >= end:
+                break
+        return page, total
+    
+    def get(self, doc_id: str) -> Optional[DocumentMetadata]:
+        return self.by_id.get(doc_id)
+    
+    def values(self):
+        return self.by_id.values()
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.by_id
+    
+    def __getitem__(self, doc_id: str) -> DocumentMetadata:
+        return self.by_id[doc_id]
+    
+    def __len__(self) -> int:
+        return len(self.by_id)
+
 # In-memory metadata cache (could be replaced with Azure Cosmos DB or Table Storage)
-_metadata_cache: Dict[str, DocumentMetadata] = {}
-_cache_initialized = False
+_metadata_cache = MetadataStore()
+# monotonic() time of the last listing; None until the first load
+_cache_loaded_at: Optional[float] = None
+# The single in-flight listing, shared by all callers
+_cache_refresh_task: Optional[asyncio.Task] = None
+
+_DOCUMENT_CATEGORIES = ("policy", "regulation", "reference", "claim")
+
+# Per-document locks serializing index and delete requests; entries go away
+# once no request holds them
+_document_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# Download URLs handed out by get_document, with their expiry (monotonic
+# time); the per-document locks go away once no request holds them
+_download_urls: Dict[str, Tuple[str, float]] = {}
+_download_url_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_DOWNLOAD_URL_EXPIRY_SKEW_SECONDS = 60
+
+# Content Understanding results by file SHA-256, with expiry (monotonic time)
+_analysis_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_ANALYSIS_CACHE_SIZE = 512
+_ANALYSIS_CACHE_TTL_SECONDS = 3600
+_MAX_ANALYZE_BYTES = 20 * 1024 * 1024
+# Limit on the whole multipart request, leaving room for form framing
+ANALYZE_MAX_REQUEST_BYTES = _MAX_ANALYZE_BYTES + 64 * 1024
+
+# File types whose content is extracted when indexing
+_TEXT_EXTRACTABLE_EXTENSIONS = frozenset({'.pdf', '.txt', '.md'})
+
+# Allow documents and images for claim forms
+_ALLOWED_UPLOAD_EXTENSIONS = frozenset({
+    '.txt', '.md', '.pdf', '.doc', '.docx', '.png', '.jpg', '.jpeg', '.tiff'
+})
 
+# Files of one upload request stored in parallel
+_UPLOAD_CONCURRENCY = 8
+# Claim documents of one upload request extracted and indexed in parallel
+_INDEX_CONCURRENCY = 4
 
-def _initialize_cache_from_storage():
-    """Initialize metadata cache from Azure Blob Storage on first access."""
-    global _cache_initialized
-    if _cache_initialized:
+# Document ids recently confirmed absent from storage, with expiry times
+_missing_documents: Dict[str, float] = {}
+_MISSING_DOCUMENT_TTL_SECONDS = 30.0
+_MISSING_DOCUMENTS_MAX = 10_000
+
+# Serialized GET /documents bodies, valid for one metadata store version
+_list_body_cache: Dict[Tuple[Optional[str], bool, int, Optional[int]], bytes] = {}
+_list_body_cache_version = -1
+_LIST_BODY_CACHE_SIZE = 64
+
+
+def _metadata_from_blobs(blobs: List[Dict[str, Any]], storage_service) -> List[DocumentMetadata]:
+    """Build document metadata from a blob listing.
+    
+    Listing fields come straight from the storage SDK with the right types,
+    so entries are built without validation.
+    """
+    documents = []
+    url_prefix = storage_service.blob_url_prefix
+    for blob in blobs:
+        blob_name = blob["blob_name"]
+        # Extract document ID from blob name (format: category/uuid.ext)
+        parts = DocumentMetadata._doc_id_from_blob(blob_name)
+        if parts is not None:
+            blob_category, filename, doc_id = parts
+            
+            # Get metadata from blob
+            blob_metadata = blob.get("metadata") or {}
+            
+            # Create metadata from blob properties
+            documents.append(DocumentMetadata.model_construct(
+                id=doc_id,
+                filename=filename,
+                original_filename=blob_metadata.get("original_filename", filename),
+                category=blob_metadata.get("category", blob_category),
+                size=blob.get("size", 0),
+                content_type=blob.get("content_type") or "application/octet-stream",
+                upload_date=blob.get("created") or datetime.now(timezone.utc),
+                indexed=True,  # Assume migrated documents are indexed
+                blob_name=blob_name,
+                blob_url=url_prefix + blob_name,
+                metadata=blob_metadata
+            ))
+    return documents
+
+
+async def _refresh_cache_from_storage() -> None:
+    """Reconcile the metadata cache with a fresh listing of the container.
+    
+    New blobs are added, and documents deleted from storage by other
+    workers or tools are dropped. Local state such as the indexed flag is
+    kept for documents that are still present. This periodic refresh is
+    how changes made by other workers become visible.
+    """
+    global _cache_loaded_at
+    first_load = _cache_loaded_at is None
+    # Documents added after this point may be missing from the listing
+    version_before_listing = _metadata_cache.version
+    
+    try:
+        storage_service = get_azure_storage_service()
+        # List and build the entries in a worker thread; only the cache
+        # updates below run on the event loop
+        listed = await asyncio.to_thread(
+            lambda: _metadata_from_blobs(storage_service.list_documents(), storage_service)
+        )
+        
+        listed_ids = set()
+        for doc_metadata in listed:
+            listed_ids.add(doc_metadata.id)
+            # Keep entries added by uploads that finished while listing, and
+            # don't resurrect documents deleted while listing
+            if (
+                doc_metadata.id not in _metadata_cache
+                and _missing_documents.get(doc_metadata.id, 0.0) <= time.monotonic()
+            ):
+                _metadata_cache.add(doc_metadata)
+        
+        if not first_load:
+            removed = [
+                doc.id for doc in _metadata_cache.values()
+                if doc.id not in listed_ids
+                and not _metadata_cache.added_since(doc.id, version_before_listing)
+            ]
+            for doc_id in removed:
+                _metadata_cache.remove(doc_id)
+        
+        logger.info(f"Refreshed metadata cache with {len(_metadata_cache)} documents from Azure Blob Storage")
+        
+    except Exception as e:
+        logger.error(f"Failed to initialize cache from storage: {e}", exc_info=True)
+    
+    # Set even on failure so a broken listing is retried once per TTL, not per request
+    _cache_loaded_at = time.monotonic()
+
+
+async def _initialize_cache_from_storage():
+    """Make sure the metadata cache is loaded from Azure Blob Storage.
+    
+    The first load is awaited (it is also warmed in the background at
+    startup). Once the cache is older than the configured TTL, it is
+    refreshed in the background while callers keep reading the current
+    contents. At most one listing runs at a time: every caller shares the
+    same task, and it is shielded so a caller whose request is cancelled
+    doesn't abort the listing the others are waiting on.
+    """
+    global _cache_refresh_task
+    refresh_running = _cache_refresh_task is not None and not _cache_refresh_task.done()
+    
+    if _cache_loaded_at is None:
+        if not refresh_running:
+            _cache_refresh_task = asyncio.create_task(_refresh_cache_from_storage())
+        await asyncio.shield(_cache_refresh_task)
         return
     
+    ttl = get_settings().document_cache_ttl_seconds
+    if time.monotonic() - _cache_loaded_at > ttl and not refresh_running:
+        _cache_refresh_task = asyncio.create_task(_refresh_cache_from_storage())
+
+
+async def _get_or_fetch(doc_id: str) -> Optional[DocumentMetadata]:
+    """Look up a document, falling back to Azure Blob Storage on a cache miss.
+    
+    Misses are remembered for a short time so repeated lookups of unknown
+    ids don't each list the container.
+    """
+    await _initialize_cache_from_storage()
+    
+    doc_metadata = _metadata_cache.get(doc_id)
+    if doc_metadata is not None:
+        return doc_metadata
+    
+    now = time.monotonic()
+    if _missing_documents.get(doc_id, 0.0) > now:
+        return None
+    
     try:
         storage_service = get_azure_storage_service()
-        blobs = storage_service.list_documents()
-        
-        for blob in blobs:
-            blob_name = blob["blob_name"]
-            # Extract document ID from blob name (format: category/uuid.ext)
-            parts = blob_name.split('/')
-            if len(parts) == 2:
-                filename = parts[1]
-                doc_id = Path(filename).stem  # Get UUID without extension
-                
-                # Get metadata from blob
-                blob_metadata = blob.get("metadata", {})
-                
-                # Create metadata from blob properties
-                doc_metadata = DocumentMetadata(
-                    id=doc_id,
-                    filename=filename,
-                    original_filename=blob_metadata.get("original_filename", filename),
-                    category=blob_metadata.get("category", parts[0]),
-                    size=blob.get("size", 0),
-                    content_type=blob.get("content_type", "application/octet-stream"),
-                    upload_date=blob.get("created", datetime.now(timezone.utc)),
-                    indexed=True,  # Assume migrated documents are indexed
-                    blob_name=blob_name,
-                    blob_url=f"https://{storage_service.account_name}.blob.core.windows.net/{storage_service.container_name}/{blob_name}",
-                    metadata=blob_metadata
+        listings = await asyncio.gather(*(
+            asyncio.to_thread(storage_service.list_documents, category=category, name_prefix=f"{doc_id}.")
+            for category in _DOCUMENT_CATEGORIES
+        ))
+        blobs = [blob for listing in listings for blob in listing]
+    except Exception as e:
+        logger.error(f"Failed to look up document {doc_id} in storage: {e}")
+        return None
+    
+    for doc_metadata in _metadata_from_blobs(blobs, storage_service):
+        if doc_metadata.id == doc_id:
+            _metadata_cache.add(doc_metadata)
+            return doc_metadata
+    
+    if len(_missing_documents) >= _MISSING_DOCUMENTS_MAX:
+        _missing_documents.clear()
+    _missing_documents[doc_id] = now + _MISSING_DOCUMENT_TTL_SECONDS
+    return None
+
+
+def _document_lock(doc_id: str) -> asyncio.Lock:
+    """Return the lock for one document, creating it on first use."""
+    lock = _document_locks.get(doc_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _document_locks[doc_id] = lock
+    return lock
+
+
+def _download_url_lock(doc_id: str) -> asyncio.Lock:
+    """Return the download URL lock for one document, creating it on first use."""
+    lock = _download_url_locks.get(doc_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _download_url_locks[doc_id] = lock
+    return lock
+
+
+async def _get_download_url(doc_metadata: DocumentMetadata) -> str:
+    """Return a SAS URL for a document, re-signing only when it nears expiry.
+    
+    Cache hits are answered without leaving the event loop; concurrent
+    misses for the same document share one signing call.
+    """
+    cached = _download_urls.get(doc_metadata.id)
+    if cached is not None and cached[1] - time.monotonic() > _DOWNLOAD_URL_EXPIRY_SKEW_SECONDS:
+        return cached[0]
+    
+    async with _download_url_lock(doc_metadata.id):
+        cached = _download_urls.get(doc_metadata.id)
+        if cached is not None and cached[1] - time.monotonic() > _DOWNLOAD_URL_EXPIRY_SKEW_SECONDS:
+            return cached[0]
+        
+        storage_service = get_azure_storage_service()
+        sas_url = await asyncio.to_thread(
+            storage_service.generate_sas_url, doc_metadata.blob_name, expiry_hours=1
+        )
+        # Signed URLs stay valid for at least the configured expiry; direct
+        # blob URLs don't expire
+        expiry_minutes = min(storage_service.sas_expiry_minutes, 60)
+        ttl = expiry_minutes * 60 if expiry_minutes > 0 else 3600
+        _download_urls[doc_metadata.id] = (sas_url, time.monotonic() + ttl)
+        return sas_url
+
+
+async def _parse_pdf(data: bytes, filename: str) -> List[LangChainDocument]:
+    """Parse PDF bytes into a single LangChain document in the PDF process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_pdf_process_pool(), parse_pdf_bytes, data, filename, False
+    )
+
+
+async def _decode_text(data: bytes) -> str:
+    """Decode a text file, replacing invalid UTF-8 instead of failing."""
+    return await asyncio.to_thread(data.decode, 'utf-8', 'replace')
+
+
+async def _policy_documents_from_blob(doc: DocumentMetadata, blob_content: bytes) -> List[LangChainDocument]:
+    """Convert a stored policy/reference file to LangChain documents."""
+    file_extension = doc.file_extension
+    
+    if file_extension == '.pdf':
+        return await _parse_pdf(blob_content, doc.original_filename)
+    
+    if file_extension in ['.txt', '.md']:
+        # Process text files
+        content = await _decode_text(blob_content)
+        return [LangChainDocument(
+            page_content=content,
+            metadata={"source": doc.original_filename}
+        )]
+    
+    return []
+
+
+async def _index_blob(doc: DocumentMetadata, content: Optional[bytes] = None) -> int:
+    """Add one policy/reference document to the policy search index.
+    
+    Uses ``content`` when the caller already has the file bytes and
+    downloads the blob otherwise. Returns the number of chunks indexed, or
+    zero when no text could be extracted.
+    """
+    if content is None:
+        storage_service = get_azure_storage_service()
+        content = await asyncio.to_thread(storage_service.download_document, doc.blob_name)
+    
+    langchain_docs = await _policy_documents_from_blob(doc, content)
+    if not langchain_docs:
+        return 0
+    
+    search_service = get_azure_search_service()
+    return await asyncio.to_thread(
+        search_service.add_documents, langchain_docs, blob_name=doc.blob_name
+    )
+
+
+async def _index_claim_upload(doc: DocumentMetadata, blob_content: bytes, claims_search_service) -> int:
+    """Extract and index one uploaded claim document.
+    
+    Returns the number of chunks indexed; failures are logged and count as
+    zero so other documents in the batch are still indexed.
+    """
+    try:
+        # Get content as text
+        file_extension = doc.file_extension
+        content = ""
+        
+        if file_extension == '.pdf':
+            # Extract PDF text
+            langchain_docs = await _parse_pdf(blob_content, doc.original_filename)
+            content = "\n\n".join([d.page_content for d in langchain_docs])
+        elif file_extension in ['.txt', '.md']:
+            content = await _decode_text(blob_content)
+        elif file_extension in ['.png', '.jpg', '.jpeg', '.tiff']:
+            # For images, we'll index minimal metadata (full OCR could be added later)
+            content = f"Image file: {doc.original_filename}"
+        
+        if not content:
+            return 0
+        
+        # Extract structured data from claim documents using Content Understanding
+        extracted_data = {}
+        if file_extension == '.pdf':
+            try:
+                settings = get_settings()
+                if (settings.azure_content_understanding_endpoint and 
+                    settings.azure_content_understanding_key and 
+                    settings.azure_content_understanding_analyzer_id):
+                    logger.info(f"Extracting structured data from claim PDF: {doc.original_filename}")
+                    # Shared client: keeps its credential token and connections
+                    cu_client = get_content_understanding_service().get_client()
+                    if cu_client is None:
+                        raise ValueError("Content Understanding client could not be initialized")
+                    
+                    # Analyze the document using configured analyzer (polls until done)
+                    analysis_result = await asyncio.to_thread(
+                        cu_client.analyze_document,
+                        analyzer_id=settings.azure_content_understanding_analyzer_id,
+                        file_data=blob_content,
+                        content_type="application/pdf"
+                    )
+                    extracted_data = analysis_result.key_value_pairs
+                    logger.info(f"Extracted {len(extracted_data)} fields from claim document: {list(extracted_data.keys())[:10]}")
+                else:
+                    logger.warning("Content Understanding not configured - indexing without structured extraction")
+            except Exception as e:
+                logger.error(f"Failed to extract structured data from claim: {e}", exc_info=True)
+                # Continue with plain content indexing if extraction fails
+        
+        # Add to claims index with extracted data
+        return await asyncio.to_thread(
+            claims_search_service.add_claim_document,
+            content=content,
+            blob_name=doc.blob_name,
+            metadata={
+                "source": doc.original_filename,
+                "file_type": file_extension[1:] if file_extension else "unknown",
+                "document_type": "claim_form",
+                "claim_status": "pending",
+            },
+            extracted_data=extracted_data if extracted_data else None
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to index claim document {doc.original_filename}: {e}")
+        return 0
+
+
+def _content_doc_id(digest: str, category: str, file_extension: str) -> str:
+    """Document id for uploaded content: the same bytes in another category
+    or with another file type get their own id (and blob)."""
+    key = f"{category}/{digest}{file_extension}".encode()
+    return hashlib.sha256(key).hexdigest()[:32]
+
+
+async def _store_upload(
+    upload: UploadFile,
+    category: str,
+    storage_service,
+    raw_bytes: Optional[Dict[str, bytes]] = None,
+    uploaded_at: Optional[datetime] = None
+) -> Optional[DocumentMetadata]:
+    """Validate a single uploaded file and store it in Azure Blob Storage.
+    
+    Returns the cached metadata for the stored blob, or None when the upload
+    has no filename. When ``raw_bytes`` is given, the content of text and PDF
+    files is kept there under the document id so it can be indexed without
+    a download. ``uploaded_at`` is the request time shared by all files of
+    one upload (now if omitted).
+    """
+    uploaded_at = uploaded_at or datetime.now(timezone.utc)
+    try:
+        # Validate file
+        if not upload.filename:
+            return None
+            
+        # Check file type
+        file_extension = os.path.splitext(upload.filename)[1].lower()
+        
+        if file_extension not in _ALLOWED_UPLOAD_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File \"{upload.filename}\" has an unsupported format. Supported formats: PDF, Markdown, Text, Word documents, PNG, JPG, TIFF."
+            )
+        
+        # Validate PDF files directly from the spooled upload
+        if file_extension == '.pdf':
+            pdf_processor = get_pdf_processor()
+            if not await asyncio.to_thread(pdf_processor.is_valid_pdf_stream, upload.file):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File \"{upload.filename}\" is not a valid PDF or cannot be processed."
                 )
-                _metadata_cache[doc_id] = doc_metadata
         
-        _cache_initialized = True
-        logger.info(f"Initialized metadata cache with {len(_metadata_cache)} documents from Azure Blob Storage")
+        # Name the blob after its content hash so identical files map to one blob
+        upload.file.seek(0)
+        digest = (await asyncio.to_thread(hashlib.file_digest, upload.file, "sha256")).hexdigest()
+        upload.file.seek(0)
+        doc_id = _content_doc_id(digest, category, file_extension)
+        blob_name = f"{category}/{doc_id}{file_extension}"
+        
+        existing = _metadata_cache.get(doc_id)
+        if existing is not None and existing.indexed:
+            logger.info(f"Skipping upload of {upload.filename}: identical to {existing.original_filename}")
+            return existing.model_copy(update={"duplicate": True})
         
+        if existing is not None:
+            # Stored but never indexed (indexing failed or the index was
+            # reset); reuse the blob and index it like a new upload
+            logger.info(f"Skipping upload of {upload.filename}: {existing.original_filename} is stored but not indexed")
+            blob_name, blob_url = existing.blob_name, existing.blob_url
+        elif await asyncio.to_thread(storage_service.document_exists, blob_name):
+            # Stored earlier but not in the cache yet, so whether it was
+            # indexed is unknown; keep the blob and index it like a new upload
+            logger.info(f"Skipping upload of {upload.filename}: blob {blob_name} already exists")
+            blob_url = storage_service.get_blob_url(blob_name)
+        else:
+            # Stream the spooled upload straight to Azure Blob Storage in blocks
+            blob_name, blob_url = await asyncio.to_thread(
+                storage_service.upload_document,
+                file_data=upload.file,
+                length=upload.size,
+                filename=upload.filename,
+                category=category,
+                content_type=upload.content_type or "application/octet-stream",
+                metadata={"sha256": digest},
+                doc_id=doc_id,
+                upload_date=uploaded_at
+            )
+        
+        # Create metadata
+        doc_metadata = DocumentMetadata(
+            id=doc_id,
+            filename=blob_name.rpartition('/')[2],
+            original_filename=upload.filename,
+            category=category,
+            size=upload.size or 0,
+            content_type=upload.content_type or "application/octet-stream",
+            upload_date=uploaded_at,
+            indexed=False,
+            blob_name=blob_name,
+            blob_url=blob_url,
+            metadata={"sha256": digest}
+        )
+        
+        # Only text and PDF content is parsed for indexing; other files are
+        # indexed by name, so don't pull them into memory
+        if raw_bytes is not None and file_extension in _TEXT_EXTRACTABLE_EXTENSIONS:
+            await upload.seek(0)
+            raw_bytes[doc_id] = await upload.read()
+        
+        _metadata_cache.add(doc_metadata)
+        return doc_metadata
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to initialize cache from storage: {e}", exc_info=True)
-        _cache_initialized = True  # Set to true anyway to avoid repeated failures
+        logger.error(f"Failed to upload {upload.filename}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload {upload.filename}: {str(e)}"
+        )
+    finally:
+        await upload.close()
 
 
 # API endpoints
@@ -124,89 +741,42 @@ async def upload_documents_for_indexing(
     if not files:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files uploaded")
     
-    if category not in ["policy", "regulation", "reference", "claim"]:
+    if category not in _DOCUMENT_CATEGORIES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid category")
     
     storage_service = get_azure_storage_service()
-    uploaded_docs = []
     
-    for upload in files:
-        try:
-            # Validate file
-            if not upload.filename:
-                continue
-                
-            # Check file type
-            file_extension = Path(upload.filename).suffix.lower()
-            # Allow documents and images for claim forms
-            allowed_extensions = {'.txt', '.md', '.pdf', '.doc', '.docx', '.png', '.jpg', '.jpeg', '.tiff'}
-            
-            if file_extension not in allowed_extensions:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File \"{upload.filename}\" has an unsupported format. Supported formats: PDF, Markdown, Text, Word documents, PNG, JPG, TIFF."
-                )
-            
-            # Read file content
-            file_content = await upload.read()
-            file_data = BytesIO(file_content)
-            
-            # Validate PDF files
-            if file_extension == '.pdf':
-                pdf_processor = get_pdf_processor()
-                # Save temporarily to validate
-                temp_path = Path(f"/tmp/{uuid.uuid4()}{file_extension}")
-                try:
-                    with open(temp_path, 'wb') as f:
-                        f.write(file_content)
-                    if not pdf_processor.is_valid_pdf(temp_path):
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"File \"{upload.filename}\" is not a valid PDF or cannot be processed."
-                        )
-                finally:
-                    if temp_path.exists():
-                        temp_path.unlink()
-            
-            # Upload to Azure Blob Storage
-            blob_name, blob_url = storage_service.upload_document(
-                file_data=file_data,
-                filename=upload.filename,
-                category=category,
-                content_type=upload.content_type or "application/octet-stream"
-            )
-            
-            # Create metadata
-            doc_id = blob_name.split('/')[1].split('.')[0]  # Extract UUID from blob_name
-            doc_metadata = DocumentMetadata(
-                id=doc_id,
-                filename=Path(blob_name).name,
-                original_filename=upload.filename,
-                category=category,
-                size=len(file_content),
-                content_type=upload.content_type or "application/octet-stream",
-                upload_date=datetime.now(timezone.utc),
-                indexed=False,
-                blob_name=blob_name,
-                blob_url=blob_url
-            )
-            
-            _metadata_cache[doc_id] = doc_metadata
-            uploaded_docs.append(doc_metadata)
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Failed to upload {upload.filename}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload {upload.filename}: {str(e)}"
-            )
-        finally:
-            await upload.close()
+    # Keep file bytes around for indexing so they aren't fetched back from storage
+    raw_bytes: Optional[Dict[str, bytes]] = {} if auto_index else None
+    
+    # Store files concurrently (bounded); blob uploads run in worker threads
+    upload_slots = asyncio.Semaphore(_UPLOAD_CONCURRENCY)
+    uploaded_at = datetime.now(timezone.utc)
+    
+    async def _store_bounded(upload: UploadFile) -> Optional[DocumentMetadata]:
+        async with upload_slots:
+            return await _store_upload(upload, category, storage_service, raw_bytes, uploaded_at)
+    
+    stored = await asyncio.gather(
+        *(_store_bounded(upload) for upload in files),
+        return_exceptions=True
+    )
+    uploaded_docs = [doc for doc in stored if isinstance(doc, DocumentMetadata)]
+    failures = [exc for exc in stored if isinstance(exc, BaseException)]
+    
+    # Report partial failures in the response; fail the request only if nothing was stored
+    if failures and not uploaded_docs:
+        raise failures[0]
+    errors = [
+        exc.detail if isinstance(exc, HTTPException) else str(exc)
+        for exc in failures
+    ]
+    # Duplicates of stored files don't need indexing again (and identical
+    # files within one request only once)
+    new_docs = list({doc.id: doc for doc in uploaded_docs if not doc.duplicate}.values())
     
     # Auto-index if requested
-    if auto_index and uploaded_docs:
+    if auto_index and new_docs:
         try:
             # Route to appropriate index based on category
             if category == "claim":
@@ -214,78 +784,19 @@ async def upload_documents_for_indexing(
                 from app.services.azure_claims_search import get_azure_claims_search_service
                 claims_search_service = get_azure_claims_search_service()
                 indexed_count = 0
+                index_slots = asyncio.Semaphore(_INDEX_CONCURRENCY)
                 
-                for doc in uploaded_docs:
-                    # Download document from blob storage
-                    blob_content = storage_service.download_document(doc.blob_name)
-                    
-                    # Get content as text
-                    file_extension = Path(doc.filename).suffix.lower()
-                    content = ""
-                    
-                    if file_extension == '.pdf':
-                        # Extract PDF text
-                        temp_path = Path(f"/tmp/{doc.id}{file_extension}")
-                        try:
-                            with open(temp_path, 'wb') as f:
-                                f.write(blob_content)
-                            pdf_processor = get_pdf_processor()
-                            langchain_docs = pdf_processor.pdf_to_langchain_documents(temp_path, chunk_pages=False)
-                            content = "\n\n".join([d.page_content for d in langchain_docs])
-                        finally:
-                            if temp_path.exists():
-                                temp_path.unlink()
-                    elif file_extension in ['.txt', '.md']:
-                        content = blob_content.decode('utf-8')
-                    elif file_extension in ['.png', '.jpg', '.jpeg', '.tiff']:
-                        # For images, we'll index minimal metadata (full OCR could be added later)
-                        content = f"Image file: {doc.original_filename}"
-                    
-                    if content:
-                        # Extract structured data from claim documents using Content Understanding
-                        extracted_data = {}
-                        if file_extension == '.pdf':
-                            try:
-                                settings = get_settings()
-                                if (settings.azure_content_understanding_endpoint and 
-                                    settings.azure_content_understanding_key and 
-                                    settings.azure_content_understanding_analyzer_id):
-                                    logger.info(f"Extracting structured data from claim PDF: {doc.original_filename}")
-                                    cu_client = ContentUnderstandingClient(
-                                        endpoint=settings.azure_content_understanding_endpoint,
-                                        subscription_key=settings.azure_content_understanding_key
-                                    )
-                                    
-                                    # Analyze the document using configured analyzer
-                                    analysis_result = cu_client.analyze_document(
-                                        analyzer_id=settings.azure_content_understanding_analyzer_id,
-                                        file_data=blob_content,
-                                        content_type="application/pdf"
-                                    )
-                                    extracted_data = analysis_result.key_value_pairs
-                                    logger.info(f"Extracted {len(extracted_data)} fields from claim document: {list(extracted_data.keys())[:10]}")
-                                else:
-                                    logger.warning("Content Understanding not configured - indexing without structured extraction")
-                            except Exception as e:
-                                logger.error(f"Failed to extract structured data from claim: {e}", exc_info=True)
-                                # Continue with plain content indexing if extraction fails
-                        
-                        # Add to claims index with extracted data
-                        chunks_indexed = claims_search_service.add_claim_document(
-                            content=content,
-                            blob_name=doc.blob_name,
-                            metadata={
-                                "source": doc.original_filename,
-                                "file_type": file_extension[1:] if file_extension else "unknown",
-                                "document_type": "claim_form",
-                                "claim_status": "pending",
-                            },
-                            extracted_data=extracted_data if extracted_data else None
-                        )
-                        if chunks_indexed > 0:
-                            _metadata_cache[doc.id].indexed = True
-                            indexed_count += 1
-                            logger.info(f"Indexed claim document: {doc.original_filename} ({chunks_indexed} chunks)")
+                async def _index_bounded(doc: DocumentMetadata) -> int:
+                    async with index_slots:
+                        # Reuse the bytes received with the request instead of re-downloading
+                        return await _index_claim_upload(doc, raw_bytes.get(doc.id, b""), claims_search_service)
+                
+                chunk_counts = await asyncio.gather(*(_index_bounded(doc) for doc in new_docs))
+                for doc, chunks_indexed in zip(new_docs, chunk_counts):
+                    if chunks_indexed > 0:
+                        _metadata_cache.mark_indexed(doc.id)
+                        indexed_count += 1
+                        logger.info(f"Indexed claim document: {doc.original_filename} ({chunks_indexed} chunks)")
                 
                 if indexed_count > 0:
                     logger.info(f"Successfully indexed {indexed_count} claim documents to claims index")
@@ -294,39 +805,21 @@ async def upload_documents_for_indexing(
                 search_service = get_azure_search_service()
                 indexed_count = 0
                 
-                for doc in uploaded_docs:
-                    # Download document from blob storage
-                    blob_content = storage_service.download_document(doc.blob_name)
-                    
-                    # Convert to LangChain documents
-                    langchain_docs = []
-                    file_extension = Path(doc.filename).suffix.lower()
-                    
-                    if file_extension == '.pdf':
-                        # Save temporarily for PDF processing
-                        temp_path = Path(f"/tmp/{doc.id}{file_extension}")
-                        try:
-                            with open(temp_path, 'wb') as f:
-                                f.write(blob_content)
-                            pdf_processor = get_pdf_processor()
-                            langchain_docs = pdf_processor.pdf_to_langchain_documents(temp_path, chunk_pages=False)
-                        finally:
-                            if temp_path.exists():
-                                temp_path.unlink()
-                                
-                    elif file_extension in ['.txt', '.md']:
-                        # Process text files
-                        content = blob_content.decode('utf-8')
-                        langchain_docs = [LangChainDocument(
-                            page_content=content,
-                            metadata={"source": doc.original_filename}
-                        )]
-                    
-                    if langchain_docs:
-                        # Add to policy search index
-                        chunks_indexed = search_service.add_documents(langchain_docs, blob_name=doc.blob_name)
+                # Parse all files concurrently, reusing the bytes received with the request
+                parsed = await asyncio.gather(*(
+                    _policy_documents_from_blob(doc, raw_bytes.get(doc.id, b"")) for doc in new_docs
+                ))
+                pending = [(doc, docs) for doc, docs in zip(new_docs, parsed) if docs]
+                
+                if pending:
+                    # Add everything to the policy search index in one batch
+                    chunk_counts = await asyncio.to_thread(
+                        search_service.add_documents_batch,
+                        [(doc.blob_name, docs) for doc, docs in pending]
+                    )
+                    for (doc, _), chunks_indexed in zip(pending, chunk_counts):
                         if chunks_indexed > 0:
-                            _metadata_cache[doc.id].indexed = True
+                            _metadata_cache.mark_indexed(doc.id)
                             indexed_count += 1
                             logger.info(f"Indexed policy document: {doc.original_filename} ({chunks_indexed} chunks)")
                 
@@ -336,115 +829,152 @@ async def upload_documents_for_indexing(
         except Exception as e:
             logger.error(f"Failed to auto-index documents: {e}")
             # Don't fail upload if indexing fails
+        finally:
+            raw_bytes.clear()
     
-    return DocumentUploadResponse(
+    message = f"Successfully uploaded {len(uploaded_docs)} document(s) to Azure Blob Storage"
+    if errors:
+        message += f"; {len(errors)} file(s) failed"
+    
+    # Documents were validated when created; skip revalidating them here
+    return DocumentUploadResponse.model_construct(
         success=True,
         documents=uploaded_docs,
-        message=f"Successfully uploaded {len(uploaded_docs)} document(s) to Azure Blob Storage"
+        message=message,
+        errors=errors
     )
 
 
-@router.get("/documents", response_model=DocumentListResponse)
+@router.get("/documents", responses={200: {"model": DocumentListResponse}})
 async def list_documents(
     category: Optional[str] = Query(None, description="Filter by category"),
-    indexed_only: bool = Query(False, description="Show only indexed documents")
-) -> DocumentListResponse:
-    """List all uploaded documents with optional filtering."""
-    # Initialize cache from Azure Storage on first access
-    _initialize_cache_from_storage()
+    indexed_only: bool = Query(False, description="Show only indexed documents"),
+    skip: int = Query(0, ge=0, description="Number of documents to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of documents to return")
+) -> Response:
+    """List uploaded documents (newest first) with optional filtering and paging."""
+    global _list_body_cache_version
     
-    documents = list(_metadata_cache.values())
-    
-    # Apply filters
-    if category:
-        documents = [doc for doc in documents if doc.category == category]
+    # Initialize cache from Azure Storage on first access
+    await _initialize_cache_from_storage()
     
-    if indexed_only:
-        documents = [doc for doc in documents if doc.indexed]
+    if _list_body_cache_version != _metadata_cache.version:
+        _list_body_cache.clear()
+        _list_body_cache_version = _metadata_cache.version
     
-    # Sort by upload date (newest first)
-    documents.sort(key=lambda x: x.upload_date, reverse=True)
+    key = (category or None, indexed_only, skip, limit)
+    body = _list_body_cache.get(key)
+    if body is None:
+        documents, total = _metadata_cache.list(
+            category=key[0],
+            indexed_only=indexed_only,
+            skip=skip,
+            limit=limit
+        )
+        body = orjson.dumps({
+            "documents": [doc.model_dump(mode="json") for doc in documents],
+            "total": total
+        })
+        if len(_list_body_cache) >= _LIST_BODY_CACHE_SIZE:
+            _list_body_cache.clear()
+        _list_body_cache[key] = body
     
-    return DocumentListResponse(
-        documents=documents,
-        total=len(documents)
-    )
+    return Response(content=body, media_type="application/json")
+
+
+def _delete_search_chunks(doc: DocumentMetadata) -> int:
+    """Delete a document's chunks from its search index, returning the count."""
+    if doc.category == "claim":
+        from app.services.azure_claims_search import get_azure_claims_search_service
+        return get_azure_claims_search_service().delete_documents_by_blob(doc.blob_name)
+    return get_azure_search_service().delete_documents_by_blob(doc.blob_name)
 
 
 @router.delete("/documents/{document_id}", response_model=StatusResponse)
 async def delete_document(document_id: str) -> StatusResponse:
     """Delete a document from Azure Blob Storage and search index."""
-    if document_id not in _metadata_cache:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    # Serialize with other index/delete requests for the same document
+    async with _document_lock(document_id):
+        doc_metadata = await _get_or_fetch(document_id)
+        if doc_metadata is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
-    doc_metadata = _metadata_cache[document_id]
-    
-    try:
-        # Delete from blob storage
-        storage_service = get_azure_storage_service()
-        storage_service.delete_document(doc_metadata.blob_name)
+        try:
+            # Delete from blob storage
+            storage_service = get_azure_storage_service()
+            await asyncio.to_thread(storage_service.delete_document, doc_metadata.blob_name)
         
-        # Delete from appropriate search index if indexed
-        if doc_metadata.indexed:
-            if doc_metadata.category == "claim":
-                from app.services.azure_claims_search import get_azure_claims_search_service
-                claims_search_service = get_azure_claims_search_service()
-                claims_search_service.delete_documents_by_blob(doc_metadata.blob_name)
-            else:
-                search_service = get_azure_search_service()
-                search_service.delete_documents_by_blob(doc_metadata.blob_name)
+            # Delete from the search index even if not flagged as indexed: an
+            # index reset clears the flag on documents whose chunks remain
+            await asyncio.to_thread(_delete_search_chunks, doc_metadata)
         
-        # Remove from metadata cache
-        del _metadata_cache[document_id]
+            # Remove from metadata cache; the negative entry keeps a background
+            # refresh that listed the blob before deletion from re-adding it
+            _metadata_cache.remove(document_id)
+            _missing_documents[document_id] = time.monotonic() + _MISSING_DOCUMENT_TTL_SECONDS
+            _download_urls.pop(document_id, None)
         
-        return StatusResponse(
-            success=True,
-            message=f"Document {doc_metadata.original_filename} deleted successfully"
-        )
+            return StatusResponse(
+                success=True,
+                message=f"Document {doc_metadata.original_filename} deleted successfully"
+            )
         
-    except Exception as e:
-        logger.error(f"Failed to delete document {document_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete document: {str(e)}"
-        )
+        except Exception as e:
+            logger.error(f"Failed to delete document {document_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete document: {str(e)}"
+            )
 
 
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
 async def get_document(document_id: str) -> DocumentResponse:
     """Get document metadata and SAS URL for download."""
-    if document_id not in _metadata_cache:
+    doc_metadata = await _get_or_fetch(document_id)
+    if doc_metadata is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
-    doc_metadata = _metadata_cache[document_id]
-    
     # Generate SAS URL for secure download (valid for 1 hour)
-    storage_service = get_azure_storage_service()
-    sas_url = storage_service.generate_sas_url(doc_metadata.blob_name, expiry_hours=1)
+    sas_url = await _get_download_url(doc_metadata)
     
-    return DocumentResponse(
+    return DocumentResponse.model_construct(
         document=doc_metadata,
         download_url=sas_url
     )
 
 
 @router.get("/documents/{document_id}/download")
-async def download_document(document_id: str):
-    """Download a document file from Azure Blob Storage."""
-    if document_id not in _metadata_cache:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+async def download_document(
+    document_id: str,
+    redirect: bool = Query(False, description="Redirect to a SAS URL instead of proxying the file")
+):
+    """Download a document file from Azure Blob Storage.
     
-    doc_metadata = _metadata_cache[document_id]
+    The file is streamed through in chunks. With ``redirect=true`` the client is
+    sent straight to a SAS URL when one can be signed.
+    """
+    doc_metadata = await _get_or_fetch(document_id)
+    if doc_metadata is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
     try:
         storage_service = get_azure_storage_service()
-        blob_content = storage_service.download_document(doc_metadata.blob_name)
         
-        return Response(
-            content=blob_content,
+        if redirect:
+            sas_url = await _get_download_url(doc_metadata)
+            # Only signed URLs are usable without our credentials
+            if "?" in sas_url:
+                return RedirectResponse(sas_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        
+        downloader = await asyncio.to_thread(storage_service.stream_document, doc_metadata.blob_name)
+        
+        # Sync iterators are consumed in Starlette's threadpool
+        return StreamingResponse(
+            downloader.chunks(),
             media_type=doc_metadata.content_type,
             headers={
-                "Content-Disposition": f'attachment; filename="{doc_metadata.original_filename}"'
+                "Content-Disposition": f'attachment; filename="{doc_metadata.original_filename}"',
+                "Content-Length": str(downloader.size)
             }
         )
         
@@ -459,60 +989,34 @@ async def download_document(document_id: str):
 @router.post("/documents/{document_id}/index", response_model=StatusResponse)
 async def index_document(document_id: str) -> StatusResponse:
     """Manually add a specific document to the Azure AI Search index."""
-    if document_id not in _metadata_cache:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    # Serialize with other index/delete requests for the same document
+    async with _document_lock(document_id):
+        doc_metadata = await _get_or_fetch(document_id)
+        if doc_metadata is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
-    doc_metadata = _metadata_cache[document_id]
-    
-    try:
-        storage_service = get_azure_storage_service()
-        search_service = get_azure_search_service()
-        
-        # Download document
-        blob_content = storage_service.download_document(doc_metadata.blob_name)
-        
-        # Convert to LangChain documents
-        langchain_docs = []
-        file_extension = Path(doc_metadata.filename).suffix.lower()
+        try:
+            chunks_indexed = await _index_blob(doc_metadata)
         
-        if file_extension == '.pdf':
-            temp_path = Path(f"/tmp/{doc_metadata.id}{file_extension}")
-            try:
-                with open(temp_path, 'wb') as f:
-                    f.write(blob_content)
-                pdf_processor = get_pdf_processor()
-                langchain_docs = pdf_processor.pdf_to_langchain_documents(temp_path, chunk_pages=False)
-            finally:
-                if temp_path.exists():
-                    temp_path.unlink()
-                    
-        elif file_extension in ['.txt', '.md']:
-            content = blob_content.decode('utf-8')
-            langchain_docs = [LangChainDocument(
-                page_content=content,
-                metadata={"source": doc_metadata.original_filename}
-            )]
-        
-        if langchain_docs:
-            chunks_indexed = search_service.add_documents(langchain_docs, blob_name=doc_metadata.blob_name)
-            _metadata_cache[document_id].indexed = True
+            if chunks_indexed > 0:
+                _metadata_cache.mark_indexed(document_id)
             
-            return StatusResponse(
-                success=True,
-                message=f"Document '{doc_metadata.original_filename}' successfully added to search index ({chunks_indexed} chunks)"
-            )
-        else:
-            return StatusResponse(
-                success=False,
-                message=f"Failed to extract content from '{doc_metadata.original_filename}'"
-            )
+                return StatusResponse(
+                    success=True,
+                    message=f"Document '{doc_metadata.original_filename}' successfully added to search index ({chunks_indexed} chunks)"
+                )
+            else:
+                return StatusResponse(
+                    success=False,
+                    message=f"Failed to extract content from '{doc_metadata.original_filename}'"
+                )
             
-    except Exception as e:
-        logger.error(f"Error indexing document {document_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to index document: {str(e)}"
-        )
+        except Exception as e:
+            logger.error(f"Error indexing document {document_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to index document: {str(e)}"
+            )
 
 
 # ============================================================================
@@ -558,9 +1062,14 @@ async def analyze_document_with_content_understanding(
             detail=f"Unsupported file type: {file.content_type}. Supported types: PDF, PNG, JPG, TIFF"
         )
     
-    # Check file size (max 20MB)
+    # Check file size (max 20MB), before reading when the size is known
+    if file.size is not None and file.size > _MAX_ANALYZE_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail="File too large. Maximum size is 20MB"
+        )
     content = await file.read()
-    if len(content) > 20 * 1024 * 1024:
+    if len(content) > _MAX_ANALYZE_BYTES:
         raise HTTPException(
             status_code=400,
             detail="File too large. Maximum size is 20MB"
@@ -575,8 +1084,15 @@ async def analyze_document_with_content_understanding(
             detail="Content Understanding service not configured. Please add AZURE_CONTENT_UNDERSTANDING_* environment variables."
         )
     
+    # Identical files analyzed recently get the cached result
+    digest = (await asyncio.to_thread(hashlib.sha256, content)).hexdigest()
+    cached = _analysis_cache.get(digest)
+    if cached is not None and cached[1] > time.monotonic():
+        _analysis_cache.move_to_end(digest)
+        logger.info(f"Returning cached analysis for {file.filename}")
+        return dict(cached[0])
+    
     try:
-        import time
         start_time = time.time()
         logger.info(f"Analyzing document with Content Understanding: {file.filename} ({len(content)} bytes)")
         
@@ -602,7 +1118,12 @@ async def analyze_document_with_content_understanding(
                 "or you can use a prebuilt analyzer like 'prebuilt-document' or 'prebuilt-invoice'."
             )
         
-        return result
+        _analysis_cache[digest] = (result, time.monotonic() + _ANALYSIS_CACHE_TTL_SECONDS)
+        _analysis_cache.move_to_end(digest)
+        while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+        
+        return dict(result)
         
     except Exception as e:
         logger.error(f"Document analysis failed: {e}", exc_info=True)
@@ -5,16 +5,25 @@ including monitoring index status and statistics.
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import logging
+import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+import orjson
+from fastapi import APIRouter, HTTPException, Query, status, BackgroundTasks
 from pydantic import BaseModel
 
 from app.core.config import get_settings
+from app.api.v1.endpoints.documents import (
+    _delete_search_chunks,
+    _initialize_cache_from_storage,
+    _metadata_cache,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["index"])
@@ -23,6 +32,25 @@ router = APIRouter(tags=["index"])
 WORKFLOW_DATA_DIR = Path(__file__).resolve().parents[3] / "workflow" / "data"
 METADATA_FILE = WORKFLOW_DATA_DIR / "document_metadata.json"
 INDEX_STATUS_FILE = WORKFLOW_DATA_DIR / "index_status.json"
+# IDs of uploaded documents marked as indexed, kept apart from the (much
+# larger) metadata file so resets and updates don't rewrite it
+INDEXED_IDS_FILE = WORKFLOW_DATA_DIR / "indexed_ids.json"
+
+# Dashboards poll the status endpoints; serve repeated polls from memory
+_STATUS_CACHE_TTL_SECONDS = 5.0
+# Last status per index: (expires at, cache key, status)
+_status_cache: Dict[str, Tuple[float, Tuple[int, int], "IndexStatus"]] = {}
+_status_locks: Dict[str, asyncio.Lock] = {"policy": asyncio.Lock(), "claims": asyncio.Lock()}
+# Bumped by endpoints that change the index or its metadata
+_status_version = 0
+
+# In-flight index reset shared by concurrent reset requests
+_reset_task: Optional[asyncio.Task] = None
+# Search chunk deletions in flight at once during a reset
+_RESET_DELETE_CONCURRENCY = 8
+
+# Parsed JSON data files: path -> (st_mtime_ns, st_size, data)
+_json_file_cache: Dict[Path, Tuple[int, int, Any]] = {}
 
 # Pydantic models
 class IndexStatus(BaseModel):
@@ -65,50 +93,59 @@ class IndexUpdateResponse(BaseModel):
     failed_count: int
 
 # Helper functions
-def get_index_status() -> IndexStatus:
-    """Get current index status information from Azure AI Search."""
+@functools.lru_cache(maxsize=1)
+def _is_search_configured() -> bool:
+    """Whether Azure AI Search and its Service Principal credentials are configured."""
+    settings = get_settings()
+    return bool(
+        settings.azure_search_endpoint
+        and settings.azure_tenant_id
+        and settings.azure_client_id
+        and settings.azure_client_secret
+    )
+
+def _not_configured_status(index_name: str) -> IndexStatus:
+    """Status reported for an index when Azure AI Search is not configured."""
+    return IndexStatus(
+        index_name=index_name,
+        is_built=False,
+        document_count=0,
+        original_policies_count=0,
+        uploaded_docs_count=0,
+        indexed_uploaded_count=0,
+        status="not_configured",
+        index_size_mb=None
+    )
+
+def get_index_status(recompute: bool = False) -> IndexStatus:
+    """Get current index status information from Azure AI Search.
+    
+    Uploaded document counts come from counters kept by the metadata cache;
+    ``recompute`` counts them by scanning every document instead.
+    """
     try:
-        settings = get_settings()
-        
-        # Check if Azure AI Search is configured (now using Service Principal auth)
-        if not settings.azure_search_endpoint:
-            return IndexStatus(
-                is_built=False,
-                document_count=0,
-                original_policies_count=0,
-                uploaded_docs_count=0,
-                indexed_uploaded_count=0,
-                status="not_configured",
-                index_size_mb=None
-            )
-        
-        # Check Service Principal credentials
-        if not settings.azure_tenant_id or not settings.azure_client_id or not settings.azure_client_secret:
-            return IndexStatus(
-                is_built=False,
-                document_count=0,
-                original_policies_count=0,
-                uploaded_docs_count=0,
-                indexed_uploaded_count=0,
-                status="not_configured",
-                index_size_mb=None
-            )
+        # Check if Azure AI Search is configured (Service Principal auth)
+        if not _is_search_configured():
+            return _not_configured_status("insurance-policies")
         
         # Try to get Azure AI Search service
         try:
-            logger.info("Attempting to initialize Azure AI Search service...")
+            logger.debug("Attempting to initialize Azure AI Search service...")
             from app.services.azure_search import get_azure_search_service
             search_service = get_azure_search_service()
-            logger.info(f"Azure AI Search service initialized: {search_service.index_name}")
+            logger.debug("Azure AI Search service initialized: %s", search_service.index_name)
             
             # Get index statistics
-            logger.info("Getting index statistics...")
+            logger.debug("Getting index statistics...")
             stats = search_service.get_index_statistics()
             document_count = stats.get("document_count", 0)
             storage_size_bytes = stats.get("storage_size_bytes", 0)
             # Convert bytes to MB
             index_size_mb = round(storage_size_bytes / (1024 * 1024), 2) if storage_size_bytes > 0 else None
-            logger.info(f"Retrieved document count: {document_count}, storage size: {storage_size_bytes} bytes ({index_size_mb} MB)")
+            logger.debug(
+                "Retrieved document count: %s, storage size: %s bytes (%s MB)",
+                document_count, storage_size_bytes, index_size_mb
+            )
             
             # Count uploaded documents from metadata
             # Import the metadata cache from documents.py to get all uploaded documents
@@ -116,25 +153,33 @@ def get_index_status() -> IndexStatus:
             indexed_uploaded_count = 0
             
             try:
-                from app.api.v1.endpoints.documents import _metadata_cache, _initialize_cache_from_storage
-                # Initialize cache from Azure Blob Storage first
-                _initialize_cache_from_storage()
+                # Endpoints load the cache from Azure Blob Storage before calling this
+                from app.api.v1.endpoints.documents import _metadata_cache
                 
-                # Filter for non-claim documents (policies, regulations, etc.)
-                policy_docs = [doc for doc in _metadata_cache.values() if doc.category != "claim"]
-                uploaded_docs_count = len(policy_docs)
-                indexed_uploaded_count = sum(1 for doc in policy_docs if doc.indexed)
-                logger.info(f"Counted {uploaded_docs_count} uploaded policy documents ({indexed_uploaded_count} indexed) from metadata cache")
+                # Non-claim documents (policies, regulations, etc.)
+                if recompute:
+                    # Snapshot first: this runs in a worker thread while uploads may add documents
+                    policy_docs = [doc for doc in list(_metadata_cache.values()) if doc.category != "claim"]
+                    uploaded_docs_count = len(policy_docs)
+                    indexed_uploaded_count = sum(1 for doc in policy_docs if doc.indexed)
+                else:
+                    uploaded_docs_count = _metadata_cache.count() - _metadata_cache.count("claim")
+                    indexed_uploaded_count = (
+                        _metadata_cache.indexed_count() - _metadata_cache.indexed_count("claim")
+                    )
+                logger.debug(
+                    "Counted %s uploaded policy documents (%s indexed) from metadata cache",
+                    uploaded_docs_count, indexed_uploaded_count
+                )
             except Exception as e:
                 logger.warning(f"Could not read metadata cache: {e}")
                 # Fallback to file-based metadata
                 if METADATA_FILE.exists():
                     try:
-                        with open(METADATA_FILE, 'r') as f:
-                            metadata = json.load(f)
+                        metadata = _load_json_file(METADATA_FILE)
                         policy_docs = {k: v for k, v in metadata.items() if v.get('category') != 'claim'}
                         uploaded_docs_count = len(policy_docs)
-                        indexed_uploaded_count = sum(1 for doc in policy_docs.values() if doc.get('indexed', False))
+                        indexed_uploaded_count = len(load_indexed_ids().intersection(policy_docs))
                     except Exception:
                         pass
             
@@ -142,8 +187,7 @@ def get_index_status() -> IndexStatus:
             last_rebuild = None
             if INDEX_STATUS_FILE.exists():
                 try:
-                    with open(INDEX_STATUS_FILE, 'r') as f:
-                        status_data = json.load(f)
+                    status_data = _load_json_file(INDEX_STATUS_FILE)
                     last_rebuild_str = status_data.get('last_rebuild')
                     if last_rebuild_str:
                         last_rebuild = datetime.fromisoformat(last_rebuild_str)
@@ -198,37 +242,14 @@ def get_index_status() -> IndexStatus:
 def get_claims_index_status() -> IndexStatus:
     """Get current claims index status information from Azure AI Search."""
     try:
-        settings = get_settings()
-        
-        if not settings.azure_search_endpoint:
-            return IndexStatus(
-                index_name="insurance-claims",
-                is_built=False,
-                document_count=0,
-                original_policies_count=0,
-                uploaded_docs_count=0,
-                indexed_uploaded_count=0,
-                status="not_configured",
-                index_size_mb=None
-            )
-        
-        if not settings.azure_tenant_id or not settings.azure_client_id or not settings.azure_client_secret:
-            return IndexStatus(
-                index_name="insurance-claims",
-                is_built=False,
-                document_count=0,
-                original_policies_count=0,
-                uploaded_docs_count=0,
-                indexed_uploaded_count=0,
-                status="not_configured",
-                index_size_mb=None
-            )
+        if not _is_search_configured():
+            return _not_configured_status("insurance-claims")
         
         try:
-            logger.info("Attempting to initialize Azure Claims Search service...")
+            logger.debug("Attempting to initialize Azure Claims Search service...")
             from app.services.azure_claims_search import get_azure_claims_search_service
             claims_service = get_azure_claims_search_service()
-            logger.info(f"Azure Claims Search service initialized: {claims_service.index_name}")
+            logger.debug("Azure Claims Search service initialized: %s", claims_service.index_name)
             
             # Get index statistics
             stats = claims_service.get_index_statistics()
@@ -236,22 +257,25 @@ def get_claims_index_status() -> IndexStatus:
             storage_size_bytes = stats.get("storage_size", 0)
             # Convert bytes to MB
             index_size_mb = round(storage_size_bytes / (1024 * 1024), 2) if storage_size_bytes > 0 else None
-            logger.info(f"Retrieved claims document count: {document_count}, storage size: {storage_size_bytes} bytes ({index_size_mb} MB)")
+            logger.debug(
+                "Retrieved claims document count: %s, storage size: %s bytes (%s MB)",
+                document_count, storage_size_bytes, index_size_mb
+            )
             
             # Count uploaded claim documents from metadata
             uploaded_docs_count = 0
             indexed_uploaded_count = 0
             
             try:
-                from app.api.v1.endpoints.documents import _metadata_cache, _initialize_cache_from_storage
-                # Initialize cache from Azure Blob Storage first
-                _initialize_cache_from_storage()
+                # Endpoints load the cache from Azure Blob Storage before calling this
+                from app.api.v1.endpoints.documents import _metadata_cache
                 
-                # Filter for claim documents only
-                claim_docs = [doc for doc in _metadata_cache.values() if doc.category == "claim"]
-                uploaded_docs_count = len(claim_docs)
-                indexed_uploaded_count = sum(1 for doc in claim_docs if doc.indexed)
-                logger.info(f"Counted {uploaded_docs_count} claim documents ({indexed_uploaded_count} indexed)")
+                # Claim documents only
+                uploaded_docs_count = _metadata_cache.count("claim")
+                indexed_uploaded_count = _metadata_cache.indexed_count("claim")
+                logger.debug(
+                    "Counted %s claim documents (%s indexed)", uploaded_docs_count, indexed_uploaded_count
+                )
             except Exception as e:
                 logger.warning(f"Could not read metadata cache for claims: {e}")
             
@@ -300,6 +324,66 @@ def get_claims_index_status() -> IndexStatus:
             status="error"
         )
 
+def _load_json_file(path: Path) -> Any:
+    """Load a JSON data file, reusing the parsed data while the file is unchanged.
+    
+    The returned object is shared between callers and must not be mutated.
+    """
+    stat = path.stat()
+    cached = _json_file_cache.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    _json_file_cache[path] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def _write_json_file(path: Path, data: Any, default: Optional[Callable[[Any], Any]] = None) -> None:
+    """Write a JSON data file and remember ``data`` as its parsed content.
+    
+    The data is serialized up front and written to a temporary file that
+    replaces the target, so readers never see a partially written file.
+    """
+    payload = orjson.dumps(data, default=default, option=orjson.OPT_INDENT_2)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    stat = path.stat()
+    _json_file_cache[path] = (stat.st_mtime_ns, stat.st_size, data)
+
+
+def _invalidate_status_cache() -> None:
+    """Drop cached statuses after the index or its metadata changed."""
+    global _status_version
+    _status_version += 1
+
+
+async def _cached_status(kind: str, compute: Callable[[], IndexStatus]) -> IndexStatus:
+    """Return a recent status for one index, computing it at most once per TTL.
+    
+    Concurrent callers wait for the same computation. Entries are also
+    dropped when documents are uploaded, indexed or deleted (the metadata
+    cache version changes) or the index is reset.
+    """
+    async with _status_locks[kind]:
+        key = (_status_version, _metadata_cache.version)
+        cached = _status_cache.get(kind)
+        if cached is not None and cached[0] > time.monotonic() and cached[1] == key:
+            return cached[2]
+        
+        status = await asyncio.to_thread(compute)
+        _status_cache[kind] = (time.monotonic() + _STATUS_CACHE_TTL_SECONDS, key, status)
+        return status
+
 def save_index_status(status: IndexStatus):
     """Save index status to file."""
     try:
@@ -308,26 +392,45 @@ def save_index_status(status: IndexStatus):
             "status": status.status,
             "document_count": status.document_count
         }
-        with open(INDEX_STATUS_FILE, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        _write_json_file(INDEX_STATUS_FILE, status_data)
     except Exception as e:
         logger.error(f"Error saving index status: {e}")
 
 def load_document_metadata() -> Dict[str, Any]:
-    """Load document metadata from JSON file."""
-    if not METADATA_FILE.exists():
-        return {}
+    """Load document metadata from JSON file.
     
+    The parsed file is cached until it changes on disk, so the returned dict
+    is shared; build a new dict to change it and pass that to
+    ``save_document_metadata``.
+    """
     try:
-        with open(METADATA_FILE, 'r') as f:
-            return json.load(f)
+        return _load_json_file(METADATA_FILE)
     except Exception:
         return {}
 
 def save_document_metadata(metadata_dict: Dict[str, Any]):
     """Save document metadata to JSON file."""
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata_dict, f, indent=2, default=str)
+    _write_json_file(METADATA_FILE, metadata_dict, default=str)
+
+def load_indexed_ids() -> Set[str]:
+    """Load the IDs of uploaded documents marked as indexed.
+    
+    Until the first save, the IDs are taken from the ``indexed`` flags in
+    the document metadata file, where they used to be stored.
+    """
+    try:
+        return set(_load_json_file(INDEXED_IDS_FILE)["ids"])
+    except FileNotFoundError:
+        return {
+            doc_id for doc_id, doc_data in load_document_metadata().items()
+            if doc_data.get('indexed', False)
+        }
+    except Exception:
+        return set()
+
+def save_indexed_ids(doc_ids: Set[str]):
+    """Save the IDs of uploaded documents marked as indexed."""
+    _write_json_file(INDEXED_IDS_FILE, {"ids": sorted(doc_ids)})
 
 def rebuild_index_sync(include_uploaded: bool = True) -> IndexStatus:
     """Rebuild functionality is not needed with Azure AI Search.
@@ -351,12 +454,20 @@ def rebuild_index_sync(include_uploaded: bool = True) -> IndexStatus:
 
 # API endpoints
 @router.get("/index/status", response_model=IndexStatusResponse)
-async def get_index_status_endpoint() -> IndexStatusResponse:
+async def get_index_status_endpoint(
+    recompute: bool = Query(False, description="Count uploaded documents by scanning all metadata")
+) -> IndexStatusResponse:
     """Get current policy index status and statistics (legacy endpoint)."""
     try:
-        logger.info("Getting policy index status...")
-        status = get_index_status()
-        logger.info(f"Policy index status retrieved: {status.status}, document_count={status.document_count}")
+        logger.debug("Getting policy index status...")
+        await _initialize_cache_from_storage()
+        if recompute:
+            status = await asyncio.to_thread(get_index_status, True)
+        else:
+            status = await _cached_status("policy", get_index_status)
+        logger.debug(
+            "Policy index status retrieved: %s, document_count=%s", status.status, status.document_count
+        )
         return IndexStatusResponse(status=status)
     except Exception as e:
         logger.error(f"Error in get_index_status_endpoint: {e}", exc_info=True)
@@ -375,11 +486,17 @@ async def get_index_status_endpoint() -> IndexStatusResponse:
 async def get_combined_index_status() -> CombinedIndexStatusResponse:
     """Get status for both policy and claims indexes."""
     try:
-        logger.info("Getting combined index status...")
-        policy_status = get_index_status()
-        claims_status = get_claims_index_status()
+        logger.debug("Getting combined index status...")
+        await _initialize_cache_from_storage()
+        policy_status, claims_status = await asyncio.gather(
+            _cached_status("policy", get_index_status),
+            _cached_status("claims", get_claims_index_status)
+        )
         
-        logger.info(f"Policy index: {policy_status.document_count} docs, Claims index: {claims_status.document_count} docs")
+        logger.debug(
+            "Policy index: %s docs, Claims index: %s docs",
+            policy_status.document_count, claims_status.document_count
+        )
         
         return CombinedIndexStatusResponse(
             policy_index=policy_status,
@@ -428,7 +545,8 @@ async def rebuild_index(
         background_tasks: Ignored (maintained for API compatibility)
     """
     try:
-        current_status = get_index_status()
+        await _initialize_cache_from_storage()
+        current_status = await _cached_status("policy", get_index_status)
         
         return IndexRebuildResponse(
             success=True,
@@ -443,6 +561,27 @@ async def rebuild_index(
             detail=f"Failed to get index status: {str(e)}"
         )
 
+async def _reset_index() -> IndexStatus:
+    """Remove uploaded documents from the search indexes and refresh the index status."""
+    # Delete the chunks of every indexed upload so none are left orphaned
+    # once the documents are marked as not indexed
+    indexed_docs = [_metadata_cache.get(doc_id) for doc_id in list(_metadata_cache.indexed_ids)]
+    semaphore = asyncio.Semaphore(_RESET_DELETE_CONCURRENCY)
+    
+    async def delete_chunks(doc) -> None:
+        async with semaphore:
+            await asyncio.to_thread(_delete_search_chunks, doc)
+    
+    await asyncio.gather(*(delete_chunks(doc) for doc in indexed_docs if doc is not None))
+    
+    # Mark all uploaded documents as not indexed
+    await asyncio.to_thread(save_indexed_ids, set())
+    _metadata_cache.clear_indexed()
+    _invalidate_status_cache()
+    
+    # Rebuild index with only original policies
+    return await asyncio.to_thread(rebuild_index_sync, include_uploaded=False)
+
 @router.post("/index/reset", response_model=IndexResetResponse)
 async def reset_index_to_original() -> IndexResetResponse:
     """Reset the index to contain only original policy documents.
@@ -450,15 +589,13 @@ async def reset_index_to_original() -> IndexResetResponse:
     This removes all uploaded documents from the index and rebuilds
     with only the original policy files.
     """
+    global _reset_task
     try:
-        # Mark all uploaded documents as not indexed
-        metadata_dict = load_document_metadata()
-        for doc_id, doc_data in metadata_dict.items():
-            doc_data['indexed'] = False
-        save_document_metadata(metadata_dict)
-        
-        # Rebuild index with only original policies
-        new_status = rebuild_index_sync(include_uploaded=False)
+        # Concurrent resets share one run; shielded so a disconnecting
+        # caller doesn't cancel it for the others
+        if _reset_task is None or _reset_task.done():
+            _reset_task = asyncio.create_task(_reset_index())
+        new_status = await asyncio.shield(_reset_task)
         
         if new_status.status == "ready":
             return IndexResetResponse(
@@ -490,17 +627,19 @@ async def add_documents_to_index(document_ids: List[str]) -> IndexUpdateResponse
     """
     try:
         metadata_dict = load_document_metadata()
+        indexed_ids = load_indexed_ids()
         added_count = 0
         failed_count = 0
         
         for doc_id in document_ids:
             if doc_id in metadata_dict:
-                metadata_dict[doc_id]['indexed'] = True
+                indexed_ids.add(doc_id)
                 added_count += 1
             else:
                 failed_count += 1
         
-        save_document_metadata(metadata_dict)
+        save_indexed_ids(indexed_ids)
+        _invalidate_status_cache()
         
         return IndexUpdateResponse(
             success=True,
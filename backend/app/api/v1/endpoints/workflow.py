@@ -1,132 +1,196 @@
 """Workflow endpoint definitions (API v1)."""
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+import asyncio
+import contextlib
 import re
-from typing import Any
+import threading
+import time
+from typing import Any, AsyncIterator, Iterable, Iterator, TypeVar
 from datetime import datetime
 import uuid
 import logging
+import orjson
 
+from app.core.config import get_settings
 from app.models.claim import ClaimIn, ClaimOut
 from app.services.claim_processing import run as run_workflow
 from app.sample_data import ALL_SAMPLE_CLAIMS
-from app.services.cosmos_service import get_cosmos_service
-from app.services.token_tracker import TokenUsageTracker, get_token_tracker
+from app.services.cosmos_service import get_cosmos_service, get_execution_write_queue
+from app.services.token_span_processor import get_token_span_processor, setup_token_span_processor
+from app.services.token_tracker import (
+    TokenUsageTracker,
+    reset_run_token_tracker,
+    use_run_token_tracker,
+)
 from app.models.agent_models import AgentExecution, AgentStepExecution, ExecutionStatus
 from app.services.token_estimation import estimate_agent_step_tokens
 from app.services.evaluation_service import get_evaluation_service
 from app.models.evaluation import EvaluationRequest
 
-router = APIRouter(tags=["workflow"])
+router = APIRouter(tags=["workflow"], default_response_class=ORJSONResponse)
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Items a worker-thread iterator may run ahead of its consumer
+_ITERATOR_QUEUE_SIZE = 32
+
+# Tracer for workflow spans; a proxy, so it picks up the provider that
+# setup_tracing installs at startup
+_TRACER = trace.get_tracer(__name__)
+
 # Regex compiled once
 DECISION_PATTERN = re.compile(
     r"\b(APPROVED|DENIED|REQUIRES_INVESTIGATION)\b", re.IGNORECASE)
+_DECISION_KEYWORDS = ("APPROVED", "DENIED", "REQUIRES_INVESTIGATION")
 
+# Estimated cost per token using GPT-4.1-mini pricing
+# ($0.00015 per 1K prompt, $0.0006 per 1K completion)
+_PROMPT_TOKEN_PRICE = 0.00015 / 1000
+_COMPLETION_TOKEN_PRICE = 0.0006 / 1000
 
-def get_sample_claim_by_id(claim_id: str) -> dict:
-    """Retrieve sample claim data by claim_id."""
-    for claim in ALL_SAMPLE_CLAIMS:
-        if claim.get("claim_id") == claim_id:
-            return claim
+# Agents whose messages are recorded as execution steps (not the supervisor)
+_TRACKED_AGENTS = frozenset({"claim_assessor", "policy_checker", "risk_analyst", "communication_agent"})
 
-    # If not found, list available claim IDs
-    available_ids = [claim.get("claim_id") for claim in ALL_SAMPLE_CLAIMS]
-    raise HTTPException(
-        status_code=404,
-        detail=f"Claim ID '{claim_id}' not found. Available sample claim IDs: {available_ids}"
-    )
 
+def _is_word_char(text: str, index: int) -> bool:
+    """Whether ``text[index]`` exists and is a regex word character."""
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
 
-@router.get("/workflow/sample-claims")
-async def list_sample_claims():
-    """List all available sample claims for testing."""
-    claims_summary = []
-    for claim in ALL_SAMPLE_CLAIMS:
-        claims_summary.append({
+
+def _extract_decision(text: str) -> str | None:
+    """Return the first decision keyword in ``text``, upper-cased, if any.
+
+    Equivalent to searching with ``DECISION_PATTERN``, but done with
+    ``str.find`` on the upper-cased text: a keyword counts only as a whole
+    word, and the leftmost one wins.
+    """
+    upper = text.upper()
+    best_pos = -1
+    best_keyword = None
+    for keyword in _DECISION_KEYWORDS:
+        pos = upper.find(keyword)
+        while pos != -1 and (best_pos == -1 or pos < best_pos):
+            if not _is_word_char(upper, pos - 1) and not _is_word_char(upper, pos + len(keyword)):
+                best_pos, best_keyword = pos, keyword
+                break
+            pos = upper.find(keyword, pos + 1)
+    return best_keyword
+
+
+# Sample claims indexed by ID, built once at import
+_SAMPLE_CLAIMS_BY_ID = {
+    claim["claim_id"]: claim for claim in ALL_SAMPLE_CLAIMS if claim.get("claim_id")
+}
+_SAMPLE_CLAIM_IDS = [claim.get("claim_id") for claim in ALL_SAMPLE_CLAIMS]
+
+# The sample claims are static, so the listing is serialized once
+_SAMPLE_CLAIMS_BODY = orjson.dumps({
+    "available_claims": [
+        {
             "claim_id": claim.get("claim_id"),
             "claimant_name": claim.get("claimant_name"),
             "claim_type": claim.get("claim_type"),
             "estimated_damage": claim.get("estimated_damage"),
             "description": claim.get("description", "")
-        })
+        }
+        for claim in ALL_SAMPLE_CLAIMS
+    ],
+    "usage": "Use POST /api/v1/workflow/run with {'claim_id': 'CLM-2024-001'} to process a sample claim"
+})
 
-    return {
-        "available_claims": claims_summary,
-        "usage": "Use POST /api/v1/workflow/run with {'claim_id': 'CLM-2024-001'} to process a sample claim"
-    }
+
+def get_sample_claim_by_id(claim_id: str) -> dict:
+    """Retrieve a copy of the sample claim data for claim_id.
+
+    Top-level fields and the nested dicts/lists of the copy can be changed
+    without affecting other requests; the sample values themselves are
+    strings and numbers, so a full deep copy is not needed.
+    """
+    claim = _SAMPLE_CLAIMS_BY_ID.get(claim_id)
+    if claim is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Claim ID '{claim_id}' not found. Available sample claim IDs: {_SAMPLE_CLAIM_IDS}"
+        )
+    claim_data = claim.copy()
+    for key, value in claim_data.items():
+        if isinstance(value, dict):
+            claim_data[key] = value.copy()
+        elif isinstance(value, list):
+            claim_data[key] = list(value)
+    return claim_data
+
+
+@router.get("/workflow/sample-claims")
+async def list_sample_claims():
+    """List all available sample claims for testing."""
+    return Response(content=_SAMPLE_CLAIMS_BODY, media_type="application/json")
 
 
 @router.post("/workflow/run", response_model=ClaimOut)
-async def workflow_run(claim: ClaimIn):  # noqa: D401
+async def workflow_run(claim: ClaimIn, background_tasks: BackgroundTasks):  # noqa: D401
     """Run the claim through the multi-agent workflow and return full trace.
 
     Accepts either:
     - A claim_id to load sample data: {"claim_id": "CLM-2024-001"}
     - Full claim data: {"claim_id": "...", "policy_number": "...", ...}
     """
-    from opentelemetry import trace
-    from opentelemetry.trace import Status, StatusCode
-    
-    # Get tracer for creating spans
-    tracer = trace.get_tracer(__name__)
-
-    # Initialize tracking
+    # Initialize tracking. Runs overlap while the workflow iterates in a
+    # worker thread, so each run records its tokens to its own tracker; the
+    # span processor finds it through a context variable.
     cosmos_service = await get_cosmos_service()
-    token_tracker = get_token_tracker(cosmos_service)
+    token_tracker = TokenUsageTracker(cosmos_service)
+    tracker_token = use_run_token_tracker(token_tracker)
     execution_id = str(uuid.uuid4())
     
-    # Create top-level span for entire workflow
-    with tracer.start_as_current_span(
-        "workflow.insurance_claim_processing",
-        attributes={
-            "gen_ai.operation.name": "workflow.execute",
-            "workflow.type": "insurance_claim_processing",
-            "workflow.execution_id": execution_id,
-        }
-    ) as workflow_span:
+    # Create top-level span for entire workflow. With telemetry disabled the
+    # span is skipped and the attribute/status calls below go to a no-op span.
+    if get_settings().enable_telemetry:
+        workflow_span_cm = _TRACER.start_as_current_span(
+            "workflow.insurance_claim_processing",
+            attributes={
+                "gen_ai.operation.name": "workflow.execute",
+                "workflow.type": "insurance_claim_processing",
+                "workflow.execution_id": execution_id,
+            }
+        )
+    else:
+        workflow_span_cm = contextlib.nullcontext(trace.INVALID_SPAN)
+    # Reported on the failure path too, before the claim is resolved
+    claim_id = "unknown"
+    with workflow_span_cm as workflow_span:
         try:
             # ------------------------------------------------------------------
             # 1. Decide whether to load sample claim or use provided data
             # ------------------------------------------------------------------
-            # Load sample data if claim_id provided and matches sample claim
-            if claim.claim_id:
-                claim_data = get_sample_claim_by_id(claim.claim_id)
-
-                # Merge/override with any additional fields supplied in request (e.g., supporting_documents)
-                override_data = {
-                    k: v for k, v in claim.model_dump(by_alias=True, exclude_none=True).items()
-                    if k != "claim_id"
-                }
-
-                # Apply overrides (including supporting_images) on top of sample claim
-                claim_data.update(override_data)
-            else:
-                # Full claim provided without loading sample
-                claim_data = claim.to_dict()
+            claim_data = _resolve_claim_data(claim)
+            claim_id = claim_data.get("claim_id", "unknown")
             
             # Add claim_id to workflow span
-            workflow_span.set_attribute("insurance.claim_id", claim_data.get("claim_id", "unknown"))
+            workflow_span.set_attribute("insurance.claim_id", claim_id)
             workflow_span.set_attribute("insurance.claim_type", claim_data.get("claim_type", "unknown"))
             
             # Start tracking
             await token_tracker.start_tracking(
-                claim_id=claim_data.get("claim_id", "unknown"),
+                claim_id=claim_id,
                 workflow_id=execution_id
             )
             
             # Setup and enable token capture from OpenTelemetry spans for Cosmos DB
             try:
-                from app.services.token_span_processor import setup_token_span_processor, get_token_span_processor
-                
                 # Setup span processor if not already configured
                 span_processor = get_token_span_processor()
                 if not span_processor:
-                    span_processor = setup_token_span_processor(token_tracker)
+                    span_processor = setup_token_span_processor()
                 
                 if span_processor:
                     span_processor.enable()
@@ -135,122 +199,95 @@ async def workflow_run(claim: ClaimIn):  # noqa: D401
                 logger.warning(f"⚠️ Could not enable token span processor: {e}")
 
             # ------------------------------------------------------------------
-            # 2. Stream LangGraph execution; capture both grouped & chronological
+            # 2. Stream LangGraph execution; capture chronological messages and
+            #    the final decision (the last decision keyword seen)
             # ------------------------------------------------------------------
             chronological: list[dict[str, str]] = []
-            seen_lengths: dict[str, int] = {}
             agent_steps: list[AgentStepExecution] = []
+            agent_step_count = 0
+            # Agents that produced steps, in first-seen order
+            agents_invoked: dict[str, None] = {}
+            # Step records are only persisted to Cosmos DB; skip building them
+            # otherwise. Read once so the loop and the save below agree even if
+            # Cosmos finishes initializing mid-run.
+            record_steps = cosmos_service._initialized
+            # Last decision keyword seen, checked as each message arrives
+            final_decision: str | None = None
+            # Evaluation question/answer: the first human message and the
+            # last assistant message that isn't a tool call
+            first_user_message: dict[str, str] | None = None
+            last_assistant_message: dict[str, str] | None = None
             started_at = datetime.utcnow()
-
-            chunks = []
-            for chunk in run_workflow(claim_data):
-                chunks.append(chunk)
+            started_perf = time.perf_counter_ns()
+
+            # The workflow blocks on LLM calls, so it runs in a worker thread
+            # to keep the event loop free for other requests
+            messages = _iter_workflow_messages(run_workflow(claim_data))
+            async for chunk_received, node_name, serialized in _iterate_in_thread(messages):
+                chronological.append(serialized)
+                decision = _extract_decision(serialized["content"])
+                if decision:
+                    final_decision = decision
+                role = serialized["role"]
+                if role == "human":
+                    if first_user_message is None:
+                        first_user_message = serialized
+                # Look for 'ai' (LangGraph) or 'assistant' (Azure AI Agents v2)
+                elif role in ("ai", "assistant") and not serialized["content"].startswith("TOOL_CALL:"):
+                    last_assistant_message = serialized
                 
-                # Process each node in the chunk (now we get individual agent updates)
-                for node_name, node_data in chunk.items():
-                    if node_name == "__end__":
-                        continue
-
-                    # Handle different data structures
-                    if isinstance(node_data, list):
-                        msgs = node_data
-                    elif isinstance(node_data, dict) and "messages" in node_data:
-                        # Handles both LangGraph format and Azure AI Agents v2 format
-                        # V2 chunks may have additional keys like "final_assessment"
-                        msgs = node_data["messages"]
-                    else:
+                # Track agent steps (only for recognized agents, skip supervisor)
+                if node_name in _TRACKED_AGENTS:
+                    agent_step_count += 1
+                    if not record_steps:
                         continue
-
-                    # Handle deduplication differently based on workflow type:
-                    # - LangGraph accumulates messages in each chunk (need prev_len tracking)
-                    # - Azure AI Agents v2 returns separate chunks per message (no tracking needed)
-                    # Detect V2 format by checking for "source" marker
-                    is_v2_chunk = isinstance(node_data, dict) and node_data.get("source") == "azure_agents_v2"
+                    agents_invoked.setdefault(node_name, None)
+                    step_started = chunk_received
                     
-                    if is_v2_chunk:
-                        # V2: Each chunk contains independent messages, no deduplication needed
-                        new_msgs = msgs
-                    else:
-                        # LangGraph: Messages accumulate, track seen lengths to avoid duplicates
-                        prev_len = seen_lengths.get(node_name, 0)
-                        new_msgs = msgs[prev_len:]
-                        seen_lengths[node_name] = len(msgs)
-
-                    for msg in new_msgs:
-                        serialized = _serialize_msg(node_name, msg)
-                        chronological.append(serialized)
-                        
-                        # Track agent steps (only for recognized agents, skip supervisor)
-                        if node_name in ["claim_assessor", "policy_checker", "risk_analyst", "communication_agent"]:
-                            step_started = datetime.utcnow()
-                            
-                            # Prepare input/output data
-                            input_data = {"content": serialized.get("content", "")}
-                            output_data = {"role": serialized.get("role", ""), "content": serialized.get("content", "")}
-                            
-                            # Estimate token usage for this step
-                            estimated_tokens = estimate_agent_step_tokens(input_data, output_data)
-                            
-                            agent_steps.append(AgentStepExecution(
-                                agent_type=node_name,  # AgentType enum value
-                                agent_version="1.0.0",
-                                started_at=step_started,
-                                completed_at=step_started,  # Immediate for message processing
-                                duration_ms=0.0,
-                                input_data=input_data,
-                                output_data=output_data,
-                                token_usage=estimated_tokens,
-                                status=ExecutionStatus.COMPLETED
-                            ))
-
-                    seen_lengths[node_name] = len(msgs)
-
-            # ------------------------------------------------------------------
-            # 3. Extract final decision from chronological messages
-            # ------------------------------------------------------------------
-            final_decision: str | None = None
-
-            # Extract final decision scanning chronological reverse order
-            for entry in reversed(chronological):
-                match = DECISION_PATTERN.search(entry["content"])
-                if match:
-                    final_decision = match.group(1).upper()
-                    break
+                    # Prepare input/output data
+                    input_data = {"content": serialized.get("content", "")}
+                    output_data = {"role": serialized.get("role", ""), "content": serialized.get("content", "")}
+                    
+                    # Estimate token usage for this step
+                    estimated_tokens = estimate_agent_step_tokens(input_data, output_data)
+                    
+                    agent_steps.append(AgentStepExecution(
+                        agent_type=node_name,  # AgentType enum value
+                        agent_version="1.0.0",
+                        started_at=step_started,
+                        completed_at=step_started,  # Immediate for message processing
+                        duration_ms=0.0,
+                        input_data=input_data,
+                        output_data=output_data,
+                        token_usage=estimated_tokens,
+                        status=ExecutionStatus.COMPLETED
+                    ))
 
             # Finalize tracking
+            duration_ms = (time.perf_counter_ns() - started_perf) / 1e6
             completed_at = datetime.utcnow()
-            duration_ms = (completed_at - started_at).total_seconds() * 1000
             
             # Save execution to Cosmos DB
-            if cosmos_service._initialized:
+            if record_steps:
                 # Calculate total tokens and cost from agent steps (already estimated)
-                total_tokens_all = sum(step.token_usage.get('total_tokens', 0) for step in agent_steps)
-                total_cost_all = 0.0
-                
-                # Estimate cost using GPT-4.1-mini pricing ($0.00015 per 1K prompt, $0.0006 per 1K completion)
+                total_tokens_all = 0
+                total_prompt_tokens = 0
+                total_completion_tokens = 0
                 for step in agent_steps:
-                    prompt_tokens = step.token_usage.get('prompt_tokens', 0)
-                    completion_tokens = step.token_usage.get('completion_tokens', 0)
-                    total_cost_all += (prompt_tokens * 0.00015 + completion_tokens * 0.0006) / 1000
-                
-                # Save token usage records to Cosmos DB for each agent step
-                for step in agent_steps:
-                    total_tokens = step.token_usage.get('total_tokens', 0) if isinstance(step.token_usage, dict) else 0
-                    if total_tokens > 0:
-                        await token_tracker.record_token_usage(
-                            model_name="gpt-4.1-mini",
-                            deployment_name="gpt-4.1-mini",
-                            prompt_tokens=step.token_usage.get('prompt_tokens', 0),
-                            completion_tokens=step.token_usage.get('completion_tokens', 0),
-                            agent_type=step.agent_type,
-                            operation_type="chat_completion"
-                        )
+                    token_usage = step.token_usage
+                    total_tokens_all += token_usage.get('total_tokens', 0)
+                    total_prompt_tokens += token_usage.get('prompt_tokens', 0)
+                    total_completion_tokens += token_usage.get('completion_tokens', 0)
+                total_cost_all = (
+                    total_prompt_tokens * _PROMPT_TOKEN_PRICE
+                    + total_completion_tokens * _COMPLETION_TOKEN_PRICE
+                )
                 
                 execution = AgentExecution(
                     id=execution_id,
                     workflow_id=execution_id,
                     workflow_type="insurance_claim_processing",
-                    claim_id=claim_data.get("claim_id", "unknown"),
+                    claim_id=claim_id,
                     agent_steps=agent_steps,
                     final_result={"decision": final_decision, "success": True},
                     status=ExecutionStatus.COMPLETED,
@@ -259,117 +296,46 @@ async def workflow_run(claim: ClaimIn):  # noqa: D401
                     duration_ms=duration_ms,
                     total_tokens=total_tokens_all,
                     total_cost=total_cost_all,
-                    agents_invoked=list(set(step.agent_type for step in agent_steps)),
+                    agents_invoked=list(agents_invoked),
                     metadata={
                         "total_steps": len(agent_steps),
                         "execution_id": execution_id
                     }
                 )
-                await cosmos_service.save_execution(execution)
-            
-            # Force flush of tracer provider to ensure all spans are processed
-            try:
-                from opentelemetry import trace
-                tracer_provider = trace.get_tracer_provider()
-                if hasattr(tracer_provider, 'force_flush'):
-                    tracer_provider.force_flush()
-                    logger.debug("✅ Flushed tracer provider - all spans processed")
-            except Exception as e:
-                logger.warning(f"Could not flush tracer provider: {e}")
-            
-            # Wait briefly for span processor to complete async operations
-            import asyncio
-            await asyncio.sleep(0.5)
-            
-            # Finalize token tracking and disable span processor
-            await token_tracker.finalize_tracking()
-            
-            try:
-                from app.services.token_span_processor import get_token_span_processor
-                span_processor = get_token_span_processor()
-                if span_processor:
-                    span_processor.disable()
-                    logger.debug("Token span processor disabled after workflow completion")
-            except Exception as e:
-                logger.warning(f"Could not disable token span processor: {e}")
+                # Written in batches by the background queue, off the request path
+                await get_execution_write_queue().put(execution)
 
             # ------------------------------------------------------------------
-            # 4. Run evaluation on workflow execution
+            # 3. Run evaluation on workflow execution
             # ------------------------------------------------------------------
             evaluation_results = None
-            try:
-                evaluation_service = get_evaluation_service()
-                if evaluation_service.is_available():
-                    logger.info(f"Running evaluation for execution: {execution_id}")
-                    
-                    # Extract question and answer from conversation
-                    first_user_message = next((msg for msg in chronological if msg.get('role') == 'human'), None)
-                    # Look for 'ai' (LangGraph) or 'assistant' (Azure AI Agents v2)
-                    last_assistant_message = next(
-                        (msg for msg in reversed(chronological) 
-                         if msg.get('role') in ('ai', 'assistant') and not msg.get('content', '').startswith('TOOL_CALL:')),
-                        None
-                    )
-                    
-                    question = first_user_message.get('content', f"Process claim {claim_data.get('claim_id')}") if first_user_message else f"Process claim {claim_data.get('claim_id')}"
-                    answer = last_assistant_message.get('content', 'No response available') if last_assistant_message else 'No response available'
-                    
-                    # Extract context from claim data
-                    context = [
-                        f"Claim ID: {claim_data.get('claim_id', 'N/A')}",
-                        f"Claimant: {claim_data.get('claimant_name', 'N/A')}",
-                        f"Claim Type: {claim_data.get('claim_type', 'N/A')}",
-                        f"Description: {claim_data.get('description', 'N/A')}",
-                        f"Estimated Damage: ${claim_data.get('estimated_damage', 'N/A')}",
-                    ]
-                    
-                    # Run evaluation
-                    eval_request = EvaluationRequest(
-                        execution_id=execution_id,
-                        claim_id=str(claim_data.get('claim_id', 'unknown')),
-                        agent_type='workflow',
-                        question=question,
-                        answer=answer,
-                        context=context,
-                        metrics=['groundedness', 'relevance', 'coherence', 'fluency']
-                    )
-                    
-                    eval_result = await evaluation_service.evaluate_execution(eval_request)
-                    
-                    if eval_result:
-                        # Determine score quality for display (1-5 scale, 5 is best)
-                        score_quality = "poor" if eval_result.overall_score < 2 else "fair" if eval_result.overall_score < 3 else "good" if eval_result.overall_score < 4 else "excellent"
-                        evaluation_results = {
-                            'evaluation_id': eval_result.evaluation_id,
-                            'overall_score': eval_result.overall_score,
-                            'score_scale': '1-5 (5 is best)',
-                            'score_quality': score_quality,
-                            'groundedness_score': eval_result.groundedness_score,
-                            'relevance_score': eval_result.relevance_score,
-                            'coherence_score': eval_result.coherence_score,
-                            'fluency_score': eval_result.fluency_score,
-                            'reasoning': eval_result.reasoning
-                        }
-                        logger.info(f"✅ Evaluation completed with score: {eval_result.overall_score:.2f}/5.0 ({score_quality})")
-                else:
-                    logger.info("Evaluation service not available, skipping evaluation")
-            except Exception as eval_err:
-                logger.warning(f"Evaluation failed, continuing without it: {eval_err}")
+            if get_settings().workflow_inline_evaluation:
+                evaluation_results = await _evaluate_workflow(
+                    execution_id, claim_data, first_user_message, last_assistant_message
+                )
+            else:
+                # Results are available from /evaluation/execution/{execution_id}
+                background_tasks.add_task(
+                    _evaluate_workflow, execution_id, claim_data, first_user_message, last_assistant_message
+                )
             
             # ------------------------------------------------------------------
-            # 5. Return response with chronological stream and evaluation
+            # 4. Return response with chronological stream and evaluation
             # ------------------------------------------------------------------
             workflow_span.set_attribute("workflow.status", "completed")
-            workflow_span.set_attribute("workflow.agent_count", len(agent_steps))
+            workflow_span.set_attribute("workflow.agent_count", agent_step_count)
             workflow_span.set_status(Status(StatusCode.OK))
             
-            return ClaimOut(
-                success=True,
-                final_decision=final_decision,
-                conversation_chronological=chronological,
-                execution_id=execution_id,
-                evaluation_results=evaluation_results,
-            )
+            await _finish_token_tracking(token_tracker, agent_steps)
+            
+            # Serialized directly; the fields already match ClaimOut
+            return ORJSONResponse(content={
+                "success": True,
+                "final_decision": final_decision,
+                "conversation_chronological": chronological,
+                "execution_id": execution_id,
+                "evaluation_results": evaluation_results,
+            })
 
         except Exception as exc:
             # Mark workflow span as failed
@@ -381,24 +347,236 @@ async def workflow_run(claim: ClaimIn):  # noqa: D401
                 try:
                     now = datetime.utcnow()
                     start = started_at if 'started_at' in locals() else now
+                    duration_ms = (
+                        (time.perf_counter_ns() - started_perf) / 1e6
+                        if 'started_perf' in locals() else 0.0
+                    )
                     execution = AgentExecution(
                         id=execution_id,
                         workflow_id=execution_id,
                         workflow_type="insurance_claim_processing",
-                        claim_id=claim_data.get("claim_id", "unknown") if 'claim_data' in locals() else "unknown",
+                        claim_id=claim_id,
                         agent_steps=[],
                         final_result={"error": str(exc)},
                         status=ExecutionStatus.FAILED,
                         started_at=start,
                         completed_at=now,
-                        duration_ms=(now - start).total_seconds() * 1000,
+                        duration_ms=duration_ms,
                         error_message=str(exc)
                     )
-                    await cosmos_service.save_execution(execution)
+                    await get_execution_write_queue().put(execution)
                 except:
                     pass  # Don't fail on tracking errors
             
             raise HTTPException(status_code=500, detail=str(exc))
+        finally:
+            reset_run_token_tracker(tracker_token)
+
+
+@router.post("/workflow/run/stream")
+async def workflow_run_stream(claim: ClaimIn):  # noqa: D401
+    """Run the claim through the multi-agent workflow, streaming messages as SSE.
+
+    Each message is sent as a ``data:`` event as soon as the workflow
+    produces it, followed by a final ``{"event": "final", "decision": ...}``
+    event. Execution tracking and evaluation are only done by
+    ``POST /workflow/run``.
+    """
+    claim_data = _resolve_claim_data(claim)
+    return StreamingResponse(_stream_workflow(claim_data), media_type="text/event-stream")
+
+
+async def _stream_workflow(claim_data: dict) -> AsyncIterator[bytes]:
+    """Yield SSE frames for one workflow run."""
+    final_decision = None
+    try:
+        messages = _iter_workflow_messages(run_workflow(claim_data))
+        async for _, _, serialized in _iterate_in_thread(messages):
+            decision = _extract_decision(serialized["content"])
+            if decision:
+                final_decision = decision
+            yield b"data: " + orjson.dumps(serialized) + b"\n\n"
+    except Exception as exc:
+        logger.error(f"Streaming workflow failed: {exc}", exc_info=True)
+        yield b"data: " + orjson.dumps({"event": "error", "detail": str(exc)}) + b"\n\n"
+        return
+    yield b"data: " + orjson.dumps({"event": "final", "decision": final_decision}) + b"\n\n"
+
+
+async def _iterate_in_thread(iterator: Iterator[_T]) -> AsyncIterator[_T]:
+    """Run a blocking iterator to completion in one worker thread, yielding its items.
+
+    The whole iteration stays in a single thread and context: LangGraph
+    sets and resets context variables across steps, which fails if each
+    ``next()`` runs in a fresh copy of the context.
+
+    The producer runs at most ``_ITERATOR_QUEUE_SIZE`` items ahead, and
+    stops (closing the iterator) after its current item once the consumer
+    goes away, e.g. when a streaming client disconnects.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[bool, Any]] = asyncio.Queue(maxsize=_ITERATOR_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(entry: tuple[bool, Any]) -> None:
+        # Blocks this worker thread while the queue is full
+        asyncio.run_coroutine_threadsafe(queue.put(entry), loop).result()
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                put((True, item))
+        except BaseException as exc:
+            if not stop.is_set():
+                put((False, exc))
+        else:
+            if not stop.is_set():
+                put((False, None))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = asyncio.ensure_future(asyncio.to_thread(produce))
+    try:
+        while True:
+            has_item, value = await queue.get()
+            if has_item:
+                yield value
+                continue
+            await producer
+            if value is not None:
+                raise value
+            return
+    finally:
+        if not producer.done():
+            stop.set()
+            # Unblock a producer waiting on the full queue so it sees the stop
+            while not queue.empty():
+                queue.get_nowait()
+
+
+def _resolve_claim_data(claim: ClaimIn) -> dict:
+    """Build the workflow input, starting from the sample claim when claim_id names one."""
+    # Load sample data if claim_id provided and matches sample claim
+    if claim.claim_id:
+        claim_data = get_sample_claim_by_id(claim.claim_id)
+
+        # Merge/override with any additional fields supplied in request (e.g., supporting_documents)
+        override_data = claim.model_dump(by_alias=True, exclude_none=True, exclude={"claim_id"})
+
+        # Apply overrides (including supporting_images) on top of sample claim
+        claim_data.update(override_data)
+        return claim_data
+    # Full claim provided without loading sample
+    return claim.to_dict()
+
+
+async def _evaluate_workflow(
+    execution_id: str,
+    claim_data: dict,
+    first_user_message: dict[str, str] | None,
+    last_assistant_message: dict[str, str] | None,
+) -> dict | None:
+    """Evaluate a finished workflow run, returning the results for ClaimOut.
+
+    Returns None if evaluation is unavailable or fails.
+    """
+    evaluation_results = None
+    try:
+        evaluation_service = get_evaluation_service()
+        if evaluation_service.is_available():
+            logger.info(f"Running evaluation for execution: {execution_id}")
+            
+            # Question and answer from the conversation
+            question = first_user_message.get('content', f"Process claim {claim_data.get('claim_id')}") if first_user_message else f"Process claim {claim_data.get('claim_id')}"
+            answer = last_assistant_message.get('content', 'No response available') if last_assistant_message else 'No response available'
+            
+            # Extract context from claim data
+            context = [
+                f"Claim ID: {claim_data.get('claim_id', 'N/A')}",
+                f"Claimant: {claim_data.get('claimant_name', 'N/A')}",
+                f"Claim Type: {claim_data.get('claim_type', 'N/A')}",
+                f"Description: {claim_data.get('description', 'N/A')}",
+                f"Estimated Damage: ${claim_data.get('estimated_damage', 'N/A')}",
+            ]
+            
+            # Run evaluation
+            eval_request = EvaluationRequest(
+                execution_id=execution_id,
+                claim_id=str(claim_data.get('claim_id', 'unknown')),
+                agent_type='workflow',
+                question=question,
+                answer=answer,
+                context=context,
+                metrics=['groundedness', 'relevance', 'coherence', 'fluency']
+            )
+            
+            eval_result = await evaluation_service.evaluate_execution(eval_request)
+            
+            if eval_result:
+                # Determine score quality for display (1-5 scale, 5 is best)
+                score_quality = "poor" if eval_result.overall_score < 2 else "fair" if eval_result.overall_score < 3 else "good" if eval_result.overall_score < 4 else "excellent"
+                evaluation_results = {
+                    'evaluation_id': eval_result.evaluation_id,
+                    'overall_score': eval_result.overall_score,
+                    'score_scale': '1-5 (5 is best)',
+                    'score_quality': score_quality,
+                    'groundedness_score': eval_result.groundedness_score,
+                    'relevance_score': eval_result.relevance_score,
+                    'coherence_score': eval_result.coherence_score,
+                    'fluency_score': eval_result.fluency_score,
+                    'reasoning': eval_result.reasoning
+                }
+                logger.info(f"✅ Evaluation completed with score: {eval_result.overall_score:.2f}/5.0 ({score_quality})")
+        else:
+            logger.info("Evaluation service not available, skipping evaluation")
+    except Exception as eval_err:
+        logger.warning(f"Evaluation failed, continuing without it: {eval_err}")
+    return evaluation_results
+
+
+async def _finish_token_tracking(
+    token_tracker: TokenUsageTracker, agent_steps: list[AgentStepExecution]
+) -> None:
+    """Save estimated step token usage and finalize tracking for a workflow run."""
+    # Save token usage records for the agent steps to Cosmos DB in one batch
+    await token_tracker.record_token_usage_batch([
+        {
+            "model_name": "gpt-4.1-mini",
+            "deployment_name": "gpt-4.1-mini",
+            "prompt_tokens": step.token_usage.get('prompt_tokens', 0),
+            "completion_tokens": step.token_usage.get('completion_tokens', 0),
+            "agent_type": step.agent_type,
+            "operation_type": "chat_completion",
+        }
+        for step in agent_steps
+        if isinstance(step.token_usage, dict) and step.token_usage.get('total_tokens', 0) > 0
+    ])
+
+    # Force flush of tracer provider to ensure all spans are processed; the
+    # exporters do blocking I/O, so flush from a worker thread
+    try:
+        tracer_provider = trace.get_tracer_provider()
+        if hasattr(tracer_provider, 'force_flush'):
+            await asyncio.to_thread(tracer_provider.force_flush, 2000)
+            logger.debug("✅ Flushed tracer provider - all spans processed")
+    except Exception as e:
+        logger.warning(f"Could not flush tracer provider: {e}")
+
+    # Wait for the span processor's token records instead of a fixed sleep
+    try:
+        span_processor = get_token_span_processor()
+        if span_processor:
+            await span_processor.wait_pending(token_tracker)
+    except Exception as e:
+        logger.warning(f"Could not wait for token span processor: {e}")
+
+    # Finalize this run's tracker; the span processor stays enabled for
+    # runs still in flight, which record to their own trackers
+    await token_tracker.finalize_tracking()
 
 
 # ------------------------------------------------------------------
@@ -406,8 +584,48 @@ async def workflow_run(claim: ClaimIn):  # noqa: D401
 # ------------------------------------------------------------------
 
 
+_MISSING = object()
+
+
+def _message_dict(node: str, role: str, content: Any, include_node: bool) -> dict:
+    data = {
+        "role": role,
+        "content": content.strip() if isinstance(content, str) else str(content),
+    }
+    if include_node:
+        data["node"] = node
+    return data
+
+
+def _serialize_ai_message(node: str, msg: AIMessage, include_node: bool) -> dict:
+    tool_calls = msg.tool_calls
+    content = f"TOOL_CALL: {tool_calls}" if tool_calls else msg.content or ""
+    return _message_dict(node, "ai", content, include_node)
+
+
+def _message_serializer(role: str):
+    """Build a serializer for a message class whose type is always ``role``."""
+    def serialize(node: str, msg: Any, include_node: bool) -> dict:
+        return _message_dict(node, role, msg.content or "", include_node)
+    return serialize
+
+
+# Serializers for the common LangChain message classes, keyed by exact type;
+# anything else (subclasses, chunks, dicts) takes the generic path
+_MSG_HANDLERS = {
+    AIMessage: _serialize_ai_message,
+    HumanMessage: _message_serializer("human"),
+    SystemMessage: _message_serializer("system"),
+    ToolMessage: _message_serializer("tool"),
+}
+
+
 def _serialize_msg(node: str, msg: Any, *, include_node: bool = True) -> dict:  # noqa: D401
     """Return a serializable dict for a LangChain message including tool calls."""
+    handler = _MSG_HANDLERS.get(type(msg))
+    if handler is not None:
+        return handler(node, msg, include_node)
+    
     # Handle dict messages (from Azure AI Agents v2)
     if isinstance(msg, dict):
         role = msg.get("role", "assistant")
@@ -416,19 +634,65 @@ def _serialize_msg(node: str, msg: Any, *, include_node: bool = True) -> dict:
             role = "ai"
         content_repr = msg.get("content", "")
     else:
-        # Handle LangChain message objects
-        role = getattr(msg, "role", getattr(msg, "type", "assistant"))
+        # Handle LangChain message objects, reading each attribute once.
+        # Fallbacks are resolved lazily so str(msg) only runs when needed.
+        role = getattr(msg, "role", _MISSING)
+        if role is _MISSING:
+            role = getattr(msg, "type", "assistant")
         
         # Handle tool call messages (AIMessage with tool_calls attr)
-        if hasattr(msg, "tool_calls") and msg.tool_calls:
-            content_repr = f"TOOL_CALL: {msg.tool_calls}"
+        tool_calls = getattr(msg, "tool_calls", None)
+        if tool_calls:
+            content_repr = f"TOOL_CALL: {tool_calls}"
         else:
-            content_repr = getattr(msg, "content", str(msg)) or ""
+            content_repr = getattr(msg, "content", _MISSING)
+            if content_repr is _MISSING:
+                content_repr = str(msg)
+            content_repr = content_repr or ""
 
-    data = {
-        "role": role,
-        "content": content_repr.strip() if isinstance(content_repr, str) else str(content_repr),
-    }
-    if include_node:
-        data["node"] = node
-    return data
+    return _message_dict(node, role, content_repr, include_node)
+
+
+def _iter_workflow_messages(chunks: Iterable[dict]) -> Iterator[tuple[datetime, str, dict]]:
+    """Yield ``(received_at, node_name, serialized)`` for each new workflow message.
+
+    Messages are yielded as their chunk arrives, so nothing is buffered
+    beyond the current chunk.
+    """
+    seen_lengths: dict[str, int] = {}
+    for chunk in chunks:
+        # Messages of one chunk arrive together; timestamp them once
+        chunk_received = datetime.utcnow()
+        
+        # Process each node in the chunk (now we get individual agent updates)
+        for node_name, node_data in chunk.items():
+            if node_name == "__end__":
+                continue
+
+            # Handle different data structures
+            if isinstance(node_data, list):
+                msgs = node_data
+            elif isinstance(node_data, dict) and "messages" in node_data:
+                # Handles both LangGraph format and Azure AI Agents v2 format
+                # V2 chunks may have additional keys like "final_assessment"
+                msgs = node_data["messages"]
+            else:
+                continue
+
+            # Handle deduplication differently based on workflow type:
+            # - LangGraph accumulates messages in each chunk (need prev_len tracking)
+            # - Azure AI Agents v2 returns separate chunks per message (no tracking needed)
+            # Detect V2 format by checking for "source" marker
+            is_v2_chunk = isinstance(node_data, dict) and node_data.get("source") == "azure_agents_v2"
+            
+            if is_v2_chunk:
+                # V2: Each chunk contains independent messages, no deduplication needed
+                new_msgs = msgs
+            else:
+                # LangGraph: Messages accumulate, track seen lengths to avoid duplicates
+                prev_len = seen_lengths.get(node_name, 0)
+                new_msgs = msgs[prev_len:]
+            seen_lengths[node_name] = len(msgs)
+
+            for msg in new_msgs:
+                yield chunk_received, node_name, _serialize_msg(node_name, msg)
@@ -54,6 +54,13 @@ class Settings(BaseSettings):  # noqa: D101
         default=None, alias="AZURE_STORAGE_ACCOUNT_NAME")
     azure_storage_container_name: str | None = Field(
         default="insurance-documents", alias="AZURE_STORAGE_CONTAINER_NAME")
+    # How long the document metadata cache is trusted before re-listing the container
+    document_cache_ttl_seconds: float = Field(
+        default=60.0, alias="DOCUMENT_CACHE_TTL_SECONDS")
+    # Minutes a signed download URL stays valid; 0 hands out direct blob URLs
+    # that require Service Principal authentication
+    azure_storage_sas_expiry_minutes: int = Field(
+        default=0, alias="AZURE_STORAGE_SAS_EXPIRY_MINUTES")
     
     # Azure AI Search (for document indexing)
     azure_search_endpoint: str | None = Field(
@@ -86,6 +93,14 @@ class Settings(BaseSettings):  # noqa: D101
         default="agent-executions", alias="AZURE_COSMOS_AGENT_EXECUTIONS_CONTAINER")
     azure_cosmos_token_usage_container: str | None = Field(
         default="token-usage", alias="AZURE_COSMOS_TOKEN_USAGE_CONTAINER")
+    # Buffered execution writes: flush after this many records or this long
+    azure_cosmos_write_batch_size: int = Field(
+        default=100, alias="AZURE_COSMOS_WRITE_BATCH_SIZE")
+    azure_cosmos_write_max_wait_ms: int = Field(
+        default=50, alias="AZURE_COSMOS_WRITE_MAX_WAIT_MS")
+    # Records buffered before writers wait for the flush to catch up
+    azure_cosmos_write_queue_size: int = Field(
+        default=1000, alias="AZURE_COSMOS_WRITE_QUEUE_SIZE")
     
     # OpenTelemetry & Observability
     enable_telemetry: bool = Field(
@@ -109,6 +124,12 @@ class Settings(BaseSettings):  # noqa: D101
     fabric_connection_name: str | None = Field(
         default=None, alias="FABRIC_CONNECTION_NAME")
 
+    # Run the workflow evaluation before responding so /workflow/run includes
+    # its results; when false it runs after the response is sent and results
+    # are read from /evaluation/execution/{execution_id}
+    workflow_inline_evaluation: bool = Field(
+        default=True, alias="WORKFLOW_INLINE_EVALUATION")
+
     # FastAPI
     app_name: str = "Insurance Multi-Agent Backend"
     api_v1_prefix: str = "/api/v1"
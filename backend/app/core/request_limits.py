@@ -0,0 +1,42 @@
+"""Request body size limits enforced before the body is read.
+
+FastAPI parses multipart form data before a handler runs, so a size check in
+the handler only happens after the whole upload has been spooled to memory or
+disk. This middleware rejects requests whose declared ``Content-Length`` is
+over the limit for their path without reading any of the body.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RequestBodyLimitMiddleware:
+    """Pure ASGI middleware rejecting oversized bodies for selected paths.
+
+    Args:
+        app: The wrapped ASGI application.
+        limits: Maximum ``Content-Length`` in bytes, keyed by exact request path.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            limit = self.limits.get(scope["path"])
+            if limit is not None:
+                for name, value in scope["headers"]:
+                    if name == b"content-length":
+                        if value.isdigit() and int(value) > limit:
+                            response = JSONResponse(
+                                {"detail": f"Request body too large. Maximum size is {limit} bytes"},
+                                status_code=413,
+                            )
+                            await response(scope, receive, send)
+                            return
+                        break
+        await self.app(scope, receive, send)
@@ -1,11 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from app.api.v1.endpoints import workflow as workflow_endpoints
 from app.api.v1.endpoints import files as files_endpoints
 from app.api.v1.endpoints import agent as agent_endpoints
+from app.api.v1.endpoints.documents import ANALYZE_MAX_REQUEST_BYTES
+from app.core.request_limits import RequestBodyLimitMiddleware
 from app.workflow.policy_search import get_policy_search
 
 # Configure logging
@@ -14,6 +18,13 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# Reject oversized analyze uploads from their Content-Length before the body
+# is spooled. Added before CORS so rejections still carry CORS headers.
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    limits={"/api/v1/documents/analyze": ANALYZE_MAX_REQUEST_BYTES},
+)
+
 # Add CORS middleware
 frontend_origin = os.getenv("FRONTEND_ORIGIN")
 
@@ -59,9 +70,36 @@ app.add_middleware(
 )
 
 
+def _prewarm_service_clients() -> None:
+    """Create the service singletons and issue one cheap call on each."""
+    from app.services.azure_storage import get_azure_storage_service
+    from app.services.azure_search import get_azure_search_service
+    from app.services.azure_claims_search import get_azure_claims_search_service
+    from app.services.content_understanding_service import get_content_understanding_service
+    
+    warmups = (
+        ("blob storage", lambda: get_azure_storage_service().container_client.exists()),
+        ("policy search", lambda: get_azure_search_service().search_client.get_document_count()),
+        ("claims search", lambda: get_azure_claims_search_service().search_client.get_document_count()),
+        ("content understanding", lambda: get_content_understanding_service().is_available()),
+    )
+    for name, warmup in warmups:
+        try:
+            warmup()
+        except Exception as e:
+            logger.warning(f"[WARN] Failed to warm up {name} client: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize policy search index and deploy Azure AI agents on startup."""
+    # Blocking SDK calls run via asyncio.to_thread; size the pool explicitly
+    # instead of the min(32, cpu_count + 4) default, which is only a handful
+    # of threads in small containers where calls wait on slow Azure services
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=32, thread_name_prefix="blocking-io")
+    )
+    
     # Initialize OpenTelemetry tracing
     logger.info("🚀 Setting up OpenTelemetry tracing...")
     try:
@@ -95,6 +133,15 @@ async def startup_event():
         logger.error("[ERROR] Failed to initialize policy search index: %s", e)
         # Don't raise - let the app start but log the error
     
+    # Warm the document metadata cache so the first GET /documents doesn't
+    # wait on a full blob listing
+    from app.api.v1.endpoints.documents import _initialize_cache_from_storage
+    app.state.metadata_cache_task = asyncio.create_task(_initialize_cache_from_storage())
+    
+    # Build the shared service clients and open their connection pools so
+    # the first requests don't pay for credential setup and TLS handshakes
+    app.state.prewarm_task = asyncio.create_task(asyncio.to_thread(_prewarm_service_clients))
+    
     # Deploy Azure AI agents (v2) in background thread so API starts immediately
     # This prevents 25+ minute startup hangs when Azure services are unreachable
     import threading
@@ -115,6 +162,17 @@ async def startup_event():
     agent_thread.start()
     logger.info("[INFO] Agent deployment started in background — API is ready")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered Cosmos DB execution writes and release shared clients."""
+    from app.services.cosmos_service import get_execution_write_queue
+    from app.services.azure_storage import close_azure_storage_service
+    from app.workflow.pdf_processor import shutdown_pdf_process_pool
+    await get_execution_write_queue().close()
+    shutdown_pdf_process_pool()
+    close_azure_storage_service()
+
 # Root
 
 
@@ -1,6 +1,8 @@
 """Pydantic schema for per-agent execution response."""
 from typing import Dict, List, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.models.claim import ClaimIn
 
 
 class AgentRunOut(BaseModel):
@@ -17,3 +19,14 @@ class AgentContinueIn(BaseModel):
     thread_id: str
     message: str
     user_token: Optional[str] = None  # For Fabric identity passthrough
+
+
+class AgentBatchItemIn(BaseModel):
+    """A single agent run within a batch request."""
+    agent_name: str
+    claim: ClaimIn
+
+
+class AgentBatchIn(BaseModel):
+    """Input for running several agents concurrently."""
+    runs: List[AgentBatchItemIn] = Field(..., max_length=20)
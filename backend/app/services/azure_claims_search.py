@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import ClientSecretCredential, DefaultAzureCredential, get_bearer_token_provider
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
@@ -30,11 +32,15 @@ from azure.search.documents.models import VectorizedQuery
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from langchain_openai import AzureOpenAIEmbeddings
+from requests.adapters import HTTPAdapter
 
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Pooled connections to the search service shared by the index and search clients
+_CONNECTION_POOL_SIZE = 16
+
 
 class AzureClaimsSearchService:
     """Service for managing claims document indexing with Azure AI Search."""
@@ -61,14 +67,24 @@ class AzureClaimsSearchService:
         )
         
         # Initialize clients
+        # Both clients share one pooled session so TCP/TLS connections to the
+        # search service are reused across requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=_CONNECTION_POOL_SIZE,
+            pool_maxsize=_CONNECTION_POOL_SIZE
+        )
+        self._session.mount("https://", adapter)
         self.index_client = SearchIndexClient(
             endpoint=self.endpoint,
-            credential=self.credential
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False)
         )
         self.search_client = SearchClient(
             endpoint=self.endpoint,
             index_name=self.index_name,
-            credential=self.credential
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False)
         )
         
         # Initialize embeddings
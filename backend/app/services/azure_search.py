@@ -6,10 +6,15 @@ cloud-based document indexing and retrieval.
 from __future__ import annotations
 
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import orjson
+import requests
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import ClientSecretCredential
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
@@ -31,6 +36,7 @@ from langchain_core.documents import Document
 
 from app.workflow.pdf_processor import get_pdf_processor
 from langchain_openai import AzureOpenAIEmbeddings
+from requests.adapters import HTTPAdapter
 
 from app.core.config import get_settings
 from app.workflow.pdf_processor import get_pdf_processor
@@ -38,6 +44,34 @@ from app.workflow.pdf_processor import get_pdf_processor
 logger = logging.getLogger(__name__)
 
 
+# Azure AI Search accepts at most 1000 documents and 16 MB per indexing request
+_MAX_BATCH_DOCUMENTS = 1000
+_MAX_BATCH_BYTES = 14 * 1024 * 1024  # headroom for request overhead
+_UPLOAD_BATCH_CONCURRENCY = 4
+
+# Pooled connections to the search service, enough for the concurrent
+# batch uploads plus request handlers searching at the same time
+_CONNECTION_POOL_SIZE = 16
+
+
+def _pack_index_batches(search_documents: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split documents into batches within the service's count and size limits."""
+    batches: List[List[Dict[str, Any]]] = []
+    batch: List[Dict[str, Any]] = []
+    batch_bytes = 0
+    for doc in search_documents:
+        doc_bytes = len(orjson.dumps(doc))
+        if batch and (len(batch) >= _MAX_BATCH_DOCUMENTS or batch_bytes + doc_bytes > _MAX_BATCH_BYTES):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(doc)
+        batch_bytes += doc_bytes
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 class AzureSearchService:
     """Service for managing document indexing with Azure AI Search."""
     
@@ -63,14 +97,24 @@ class AzureSearchService:
         )
         
         # Initialize clients with Service Principal authentication
+        # Both clients share one pooled session so TCP/TLS connections to the
+        # search service are reused across requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=_CONNECTION_POOL_SIZE,
+            pool_maxsize=_CONNECTION_POOL_SIZE
+        )
+        self._session.mount("https://", adapter)
         self.index_client = SearchIndexClient(
             endpoint=self.endpoint,
-            credential=self.credential
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False)
         )
         self.search_client = SearchClient(
             endpoint=self.endpoint,
             index_name=self.index_name,
-            credential=self.credential
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False)
         )
         
         # Initialize embeddings
@@ -215,67 +259,107 @@ class AzureSearchService:
         Returns:
             Number of documents successfully indexed
         """
+        return self.add_documents_batch([(blob_name, documents)])[0]
+    
+    def add_documents_batch(
+        self,
+        items: List[Tuple[Optional[str], List[Document]]]
+    ) -> List[int]:
+        """Add documents from several source files to the search index at once.
+        
+        All chunks are embedded with a single batched embeddings request and
+        uploaded together, instead of one embedding call per chunk and one
+        upload round trip per source file.
+        
+        Args:
+            items: (blob_name, documents) pairs, one per source file
+            
+        Returns:
+            Number of chunks successfully indexed for each item, in input order
+        """
         try:
-            # Split documents into chunks
             splitter = RecursiveCharacterTextSplitter(
                 chunk_size=1000,
                 chunk_overlap=200,
                 length_function=len,
                 separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
             )
-            chunks = splitter.split_documents(documents)
             
-            # Prepare documents for indexing
+            # Prepare documents for indexing, remembering which item each came from
             search_documents = []
-            for i, chunk in enumerate(chunks):
-                # Extract metadata
-                source_path = Path(chunk.metadata.get("source", "Unknown"))
-                filename = source_path.stem
-                file_extension = source_path.suffix.lower()
-                
-                policy_type = chunk.metadata.get("policy_type", filename.replace("_", " ").title())
-                section = chunk.metadata.get("section", "General")
-                page_number = chunk.metadata.get("page", None)
-                
-                # Generate embedding
-                content_vector = self.embeddings.embed_query(chunk.page_content)
-                
-                # Create search document with sanitized ID
-                # Azure Search doc IDs can only contain letters, digits, underscore, dash, or equals
-                base_id = blob_name or filename
-                # Replace invalid characters with underscores
-                safe_id = base_id.replace("/", "_").replace(".", "_").replace(" ", "_")
-                doc_id = f"{safe_id}_{i}"
-                
-                search_doc = {
-                    "id": doc_id,
-                    "content": chunk.page_content,
-                    "content_vector": content_vector,
-                    "source": str(source_path),
-                    "policy_type": policy_type,
-                    "section": section,
-                    "file_type": file_extension[1:] if file_extension else "unknown",
-                    "blob_name": blob_name or "",
-                    "page_number": page_number,
-                }
-                search_documents.append(search_doc)
+            owner_by_id: Dict[str, int] = {}
+            for item_index, (blob_name, documents) in enumerate(items):
+                chunks = splitter.split_documents(documents)
+                for i, chunk in enumerate(chunks):
+                    search_doc = self._to_search_document(chunk, blob_name, i)
+                    owner_by_id[search_doc["id"]] = item_index
+                    search_documents.append(search_doc)
             
-            # Upload to search index in batches
-            batch_size = 100
-            indexed_count = 0
+            counts = [0] * len(items)
+            if not search_documents:
+                return counts
             
-            for i in range(0, len(search_documents), batch_size):
-                batch = search_documents[i:i + batch_size]
-                result = self.search_client.upload_documents(documents=batch)
-                indexed_count += sum(1 for r in result if r.succeeded)
+            # Generate all embeddings in one batched call
+            vectors = self.embeddings.embed_documents(
+                [doc["content"] for doc in search_documents]
+            )
+            for search_doc, vector in zip(search_documents, vectors):
+                search_doc["content_vector"] = vector
             
-            logger.info(f"Successfully indexed {indexed_count} chunks from document")
-            return indexed_count
+            # Upload to search index in size-bounded batches, several at a time
+            batches = _pack_index_batches(search_documents)
+            with ThreadPoolExecutor(max_workers=min(_UPLOAD_BATCH_CONCURRENCY, len(batches))) as pool:
+                for result in pool.map(
+                    lambda batch: self.search_client.upload_documents(documents=batch),
+                    batches
+                ):
+                    for r in result:
+                        if r.succeeded:
+                            counts[owner_by_id[r.key]] += 1
+            
+            logger.info(
+                f"Indexed {sum(counts)} chunks from {len(items)} document(s)"
+            )
+            return counts
             
         except Exception as e:
             logger.error(f"Failed to add documents to search index: {e}")
             raise
     
+    def _to_search_document(
+        self,
+        chunk: Document,
+        blob_name: Optional[str],
+        chunk_index: int
+    ) -> Dict[str, Any]:
+        """Build a search document (without its vector) from a chunk."""
+        # Extract metadata
+        source_path = Path(chunk.metadata.get("source", "Unknown"))
+        filename = source_path.stem
+        file_extension = source_path.suffix.lower()
+        
+        policy_type = chunk.metadata.get("policy_type", filename.replace("_", " ").title())
+        section = chunk.metadata.get("section", "General")
+        page_number = chunk.metadata.get("page", None)
+        
+        # Create search document with sanitized ID
+        # Azure Search doc IDs can only contain letters, digits, underscore, dash, or equals
+        base_id = blob_name or filename
+        # Replace invalid characters with underscores
+        safe_id = base_id.replace("/", "_").replace(".", "_").replace(" ", "_")
+        doc_id = f"{safe_id}_{chunk_index}"
+        
+        return {
+            "id": doc_id,
+            "content": chunk.page_content,
+            "source": str(source_path),
+            "policy_type": policy_type,
+            "section": section,
+            "file_type": file_extension[1:] if file_extension else "unknown",
+            "blob_name": blob_name or "",
+            "page_number": page_number,
+        }
+    
     def search(
         self,
         query: str,
@@ -421,35 +505,25 @@ class AzureSearchService:
             Number of chunks indexed
         """
         try:
-            # Use PDF processor to convert to LangChain documents
+            # Use PDF processor to convert to LangChain documents, in memory
             pdf_processor = get_pdf_processor()
+            pdf_stream = BytesIO(pdf_content)
             
-            # Save temporarily to process
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                tmp_file.write(pdf_content)
-                tmp_path = Path(tmp_file.name)
+            # Validate PDF
+            if not pdf_processor.is_valid_pdf_stream(pdf_stream):
+                raise ValueError(f"Invalid PDF file: {source}")
             
-            try:
-                # Validate PDF
-                if not pdf_processor.is_valid_pdf(tmp_path):
-                    raise ValueError(f"Invalid PDF file: {source}")
-                
-                # Convert to documents
-                docs = pdf_processor.pdf_to_langchain_documents(tmp_path, chunk_pages=False)
-                
-                # Add metadata
-                for doc in docs:
-                    if metadata:
-                        doc.metadata.update(metadata)
-                    doc.metadata["source"] = source
-                
-                # Index documents
-                return self.add_documents(docs, blob_name=metadata.get("blob_name") if metadata else None)
-                
-            finally:
-                # Clean up temp file
-                tmp_path.unlink(missing_ok=True)
+            # Convert to documents
+            docs = pdf_processor.pdf_stream_to_langchain_documents(pdf_stream, source, chunk_pages=False)
+            
+            # Add metadata
+            for doc in docs:
+                if metadata:
+                    doc.metadata.update(metadata)
+                doc.metadata["source"] = source
+            
+            # Index documents
+            return self.add_documents(docs, blob_name=metadata.get("blob_name") if metadata else None)
                 
         except Exception as e:
             logger.error(f"Failed to process PDF {source}: {e}")
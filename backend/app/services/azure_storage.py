@@ -6,10 +6,12 @@ in Azure Blob Storage instead of local filesystem.
 from __future__ import annotations
 
 import logging
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Dict, Optional, Tuple
 
 from azure.storage.blob import (
     BlobServiceClient,
@@ -17,15 +19,30 @@ from azure.storage.blob import (
     ContainerClient,
     generate_blob_sas,
     BlobSasPermissions,
-    ContentSettings
+    ContentSettings,
+    StorageStreamDownloader
 )
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import ClientSecretCredential
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Enough pooled connections for several concurrent transfers, each using
+# up to max_concurrency parallel block/range requests
+_CONNECTION_POOL_SIZE = 64
+
+# Range size for streamed downloads, bounding memory per download
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Signed SAS tokens kept per service before the cache is emptied
+_SAS_CACHE_SIZE = 1024
+
 
 class AzureStorageService:
     """Service for managing documents in Azure Blob Storage."""
@@ -45,6 +62,7 @@ class AzureStorageService:
         self.account_name = settings.azure_storage_account_name
         self.container_name = settings.azure_storage_container_name or "insurance-documents"
         self.account_url = f"https://{self.account_name}.blob.core.windows.net"
+        self.blob_url_prefix = f"{self.account_url}/{self.container_name}/"
         
         # Create Service Principal credential
         self.credential = ClientSecretCredential(
@@ -53,14 +71,50 @@ class AzureStorageService:
             client_secret=settings.azure_client_secret
         )
         
-        # Initialize clients with Service Principal authentication
+        # One keep-alive session shared by every request this service makes.
+        # The requests default of 10 pooled connections is smaller than a
+        # single transfer at max_concurrency=8 plus anything running alongside.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=_CONNECTION_POOL_SIZE,
+            pool_maxsize=_CONNECTION_POOL_SIZE
+        )
+        self._session.mount("https://", adapter)
+        
+        # Initialize clients with Service Principal authentication.
+        # Anything above max_single_put_size is streamed as 8 MiB blocks, so
+        # uploads never need the whole file in memory.
         self.blob_service_client = BlobServiceClient(
             account_url=self.account_url,
-            credential=self.credential
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False),
+            max_single_put_size=8 * 1024 * 1024,
+            max_block_size=8 * 1024 * 1024
         )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        # Separate client for streamed downloads: the default first GET pulls
+        # up to 32 MiB at once, which defeats streaming for typical documents
+        self.stream_container_client = ContainerClient(
+            account_url=self.account_url,
+            container_name=self.container_name,
+            credential=self.credential,
+            transport=RequestsTransport(session=self._session, session_owner=False),
+            max_single_get_size=_STREAM_CHUNK_SIZE,
+            max_chunk_get_size=_STREAM_CHUNK_SIZE
+        )
+        
+        # User delegation key used to sign SAS URLs, refreshed before it
+        # expires; SAS URLs are only handed out when an expiry is configured
+        self.sas_expiry_minutes = settings.azure_storage_sas_expiry_minutes
+        self._delegation_key = None
+        self._delegation_key_expiry: Optional[datetime] = None
+        self._delegation_key_lock = threading.Lock()
+        self._delegation_retry_at = 0.0
+        # Signed tokens by (blob_name, expiry_minutes, permissions, bucket);
+        # emptied when the delegation key rotates
+        self._sas_cache: Dict[Tuple[str, int, str, int], str] = {}
         
         # Ensure container exists
         self._ensure_container_exists()
@@ -82,7 +136,11 @@ class AzureStorageService:
         filename: str,
         category: str = "policy",
         content_type: str = "application/octet-stream",
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        max_concurrency: int = 8,
+        length: Optional[int] = None,
+        doc_id: Optional[str] = None,
+        upload_date: Optional[datetime] = None
     ) -> tuple[str, str]:
         """Upload a document to Azure Blob Storage.
         
@@ -92,20 +150,24 @@ class AzureStorageService:
             category: Document category (policy, regulation, reference)
             content_type: MIME type of the document
             metadata: Additional metadata to store with the blob
+            max_concurrency: Parallel block uploads for large files
+            length: Size of ``file_data`` in bytes, if known
+            doc_id: Document ID to name the blob with (random UUID if omitted)
+            upload_date: Upload time to record (current UTC time if omitted)
             
         Returns:
             Tuple of (blob_name, blob_url)
         """
         # Generate unique blob name
-        doc_id = str(uuid.uuid4())
-        file_extension = Path(filename).suffix
+        doc_id = doc_id or str(uuid.uuid4())
+        file_extension = Path(filename).suffix.lower()
         blob_name = f"{category}/{doc_id}{file_extension}"
         
         # Prepare metadata
         blob_metadata = {
             "original_filename": filename,
             "category": category,
-            "upload_date": datetime.utcnow().isoformat(),
+            "upload_date": (upload_date or datetime.now(timezone.utc)).isoformat(),
             "doc_id": doc_id
         }
         if metadata:
@@ -122,9 +184,11 @@ class AzureStorageService:
             blob_client = self.container_client.get_blob_client(blob_name)
             blob_client.upload_blob(
                 file_data,
+                length=length,
                 overwrite=True,
                 content_settings=content_settings,
-                metadata=blob_metadata
+                metadata=blob_metadata,
+                max_concurrency=max_concurrency
             )
             
             blob_url = blob_client.url
@@ -136,18 +200,52 @@ class AzureStorageService:
             logger.error(f"Failed to upload document {filename}: {e}")
             raise
     
-    def download_document(self, blob_name: str) -> bytes:
+    def download_document(self, blob_name: str, max_concurrency: int = 8) -> bytes:
         """Download a document from Azure Blob Storage.
         
         Args:
             blob_name: Name of the blob to download
+            max_concurrency: Parallel range downloads for large blobs
             
         Returns:
             Document content as bytes
         """
         try:
             blob_client = self.container_client.get_blob_client(blob_name)
-            return blob_client.download_blob().readall()
+            return blob_client.download_blob(max_concurrency=max_concurrency).readall()
+        except ResourceNotFoundError:
+            logger.error(f"Blob not found: {blob_name}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to download blob {blob_name}: {e}")
+            raise
+    
+    def document_exists(self, blob_name: str) -> bool:
+        """Check whether a blob exists with a single HEAD request.
+        
+        Args:
+            blob_name: Name of the blob to check
+            
+        Returns:
+            True if the blob exists
+        """
+        return self.container_client.get_blob_client(blob_name).exists()
+    
+    def stream_document(self, blob_name: str) -> StorageStreamDownloader:
+        """Start downloading a document so its content can be read in chunks.
+        
+        Only the first 1 MiB range is fetched here; iterate ``chunks()`` on
+        the returned downloader to pull the rest one range at a time.
+        
+        Args:
+            blob_name: Name of the blob to download
+            
+        Returns:
+            StorageStreamDownloader for the blob (``size`` holds its length)
+        """
+        try:
+            blob_client = self.stream_container_client.get_blob_client(blob_name)
+            return blob_client.download_blob()
         except ResourceNotFoundError:
             logger.error(f"Blob not found: {blob_name}")
             raise
@@ -193,18 +291,29 @@ class AzureStorageService:
             logger.error(f"Failed to get blob metadata for {blob_name}: {e}")
             raise
     
-    def list_documents(self, category: Optional[str] = None) -> list[dict]:
+    def list_documents(
+        self,
+        category: Optional[str] = None,
+        name_prefix: Optional[str] = None
+    ) -> list[dict]:
         """List all documents in storage, optionally filtered by category.
         
         Args:
             category: Optional category to filter by
+            name_prefix: Optional file name prefix within the category
             
         Returns:
             List of blob metadata dictionaries
         """
         try:
-            prefix = f"{category}/" if category else None
-            blobs = self.container_client.list_blobs(name_starts_with=prefix)
+            prefix = f"{category}/{name_prefix or ''}" if category else None
+            # Include metadata in the listing so callers don't need a request per
+            # blob, and ask for the largest page the service returns
+            blobs = self.container_client.list_blobs(
+                name_starts_with=prefix,
+                include=["metadata"],
+                results_per_page=5000
+            )
             
             documents = []
             for blob in blobs:
@@ -224,6 +333,80 @@ class AzureStorageService:
             logger.error(f"Failed to list documents: {e}")
             raise
     
+    def get_blob_url(self, blob_name: str) -> str:
+        """Build the direct URL of a blob without creating a client."""
+        return self.blob_url_prefix + blob_name
+    
+    def _get_user_delegation_key(self):
+        """Return a cached user delegation key, requesting a new one when needed.
+        
+        Keys are requested for 7 days (the maximum) and renewed once less than
+        a day of validity remains. If the Service Principal may not request
+        delegation keys, the failure is remembered for five minutes.
+        
+        Returns:
+            UserDelegationKey, or None if one cannot be obtained
+        """
+        now = datetime.now(timezone.utc)
+        if self._delegation_key is not None and self._delegation_key_expiry - now > timedelta(days=1):
+            return self._delegation_key
+        
+        with self._delegation_key_lock:
+            now = datetime.now(timezone.utc)
+            if self._delegation_key is not None and self._delegation_key_expiry - now > timedelta(days=1):
+                return self._delegation_key
+            if time.monotonic() < self._delegation_retry_at:
+                return None
+            
+            try:
+                start = now - timedelta(minutes=5)
+                expiry = now + timedelta(days=7)
+                self._delegation_key = self.blob_service_client.get_user_delegation_key(start, expiry)
+                self._delegation_key_expiry = expiry
+                self._sas_cache.clear()
+                logger.info("Obtained user delegation key for SAS generation")
+                return self._delegation_key
+            except Exception as e:
+                logger.warning(f"Could not obtain user delegation key, returning direct blob URLs: {e}")
+                self._delegation_retry_at = time.monotonic() + 300
+                return None
+    
+    def _signed_sas(
+        self,
+        blob_name: str,
+        expiry_minutes: int,
+        permissions: str,
+        expiry_bucket: int
+    ) -> str:
+        """Sign a SAS token for one blob within a 5-minute bucket.
+        
+        The expiry is anchored to the end of the bucket, so every request in
+        the same bucket gets the same token and it stays valid for at least
+        ``expiry_minutes``. Tokens are cached per service until the
+        delegation key rotates.
+        """
+        key = (blob_name, expiry_minutes, permissions, expiry_bucket)
+        sas_token = self._sas_cache.get(key)
+        if sas_token is not None:
+            return sas_token
+        
+        expiry = datetime.fromtimestamp((expiry_bucket + 1) * 300, timezone.utc) + timedelta(minutes=expiry_minutes)
+        sas_token = generate_blob_sas(
+            account_name=self.account_name,
+            container_name=self.container_name,
+            blob_name=blob_name,
+            user_delegation_key=self._delegation_key,
+            permission=BlobSasPermissions.from_string(permissions),
+            expiry=expiry,
+            start=datetime.now(timezone.utc) - timedelta(minutes=5)
+        )
+        # Tokens from past buckets are never asked for again, so rather than
+        # tracking recency just start over once the cache is full
+        if len(self._sas_cache) >= _SAS_CACHE_SIZE:
+            self._sas_cache.clear()
+        self._sas_cache[key] = sas_token
+        return sas_token
+    
     def generate_sas_url(
         self,
         blob_name: str,
@@ -232,31 +415,47 @@ class AzureStorageService:
     ) -> str:
         """Generate a SAS URL for temporary access to a blob.
         
-        Note: With Service Principal authentication, we cannot generate SAS tokens.
-        Instead, we return the direct blob URL. The caller must use the same
-        Service Principal credentials to access the blob.
+        SAS tokens are only issued when AZURE_STORAGE_SAS_EXPIRY_MINUTES is
+        set; they are signed with a cached user delegation key, reused within
+        5-minute buckets and expire after at most the configured minutes.
+        Otherwise, or if no delegation key is available (the Service Principal
+        lacks permission to request one), the direct blob URL is returned and
+        callers must authenticate with the same Service Principal.
         
         Args:
             blob_name: Name of the blob
-            expiry_hours: Hours until the SAS token expires (ignored with SPN auth)
-            permissions: Permissions string (ignored with SPN auth)
+            expiry_hours: Upper bound on the SAS token lifetime
+            permissions: Permissions string
             
         Returns:
-            Direct blob URL (requires Service Principal authentication to access)
+            Blob URL with a SAS token, or the direct blob URL
         """
+        blob_url = self.get_blob_url(blob_name)
+        expiry_minutes = min(self.sas_expiry_minutes, expiry_hours * 60)
+        if expiry_minutes <= 0:
+            return blob_url
         try:
-            blob_client = self.container_client.get_blob_client(blob_name)
+            if self._get_user_delegation_key() is None:
+                return blob_url
             
-            # With Service Principal auth, we can't generate SAS tokens without the account key
-            # Return the direct URL - client must authenticate with the same SPN
-            logger.info(f"Returning direct blob URL for {blob_name} (SPN auth mode)")
-            return blob_client.url
+            sas_token = self._signed_sas(
+                blob_name, expiry_minutes, permissions, int(time.time()) // 300
+            )
+            return f"{blob_url}?{sas_token}"
             
         except Exception as e:
-            logger.error(f"Failed to get blob URL for {blob_name}: {e}")
+            logger.error(f"Failed to generate SAS URL for {blob_name}: {e}")
             raise
 
 
+    def close(self) -> None:
+        """Close the blob client and its pooled connections."""
+        self.blob_service_client.close()
+        self.stream_container_client.close()
+        self._session.close()
+        self.credential.close()
+
+
 # Singleton instance
 _azure_storage_service: Optional[AzureStorageService] = None
 
@@ -271,3 +470,11 @@ def get_azure_storage_service() -> AzureStorageService:
     if _azure_storage_service is None:
         _azure_storage_service = AzureStorageService()
     return _azure_storage_service
+
+
+def close_azure_storage_service() -> None:
+    """Close the Azure Storage service singleton if it was created."""
+    global _azure_storage_service
+    if _azure_storage_service is not None:
+        _azure_storage_service.close()
+        _azure_storage_service = None
@@ -45,6 +45,8 @@ class ContentUnderstandingClient:
         self._credential = DefaultAzureCredential()
         self._subscription_key = subscription_key
         self._logger = logging.getLogger(__name__)
+        # Reuse connections across the analyze request and its polls
+        self._session = requests.Session()
     
     def _get_auth_headers(self) -> dict:
         """Get authentication headers using bearer token (preferred) or API key fallback."""
@@ -81,7 +83,7 @@ class ContentUnderstandingClient:
         self._logger.info(f"Request URL: {url}")
         self._logger.info(f"File size: {len(file_data)} bytes")
         
-        response = requests.post(url, headers=headers, data=file_data)
+        response = self._session.post(url, headers=headers, data=file_data)
         
         # Log response details
         self._logger.info(f"Analysis request status: {response.status_code}")
@@ -123,7 +125,7 @@ class ContentUnderstandingClient:
             if elapsed_time > timeout_seconds:
                 raise TimeoutError(f"Operation timed out after {timeout_seconds:.2f} seconds")
             
-            poll_response = requests.get(operation_location, headers=headers)
+            poll_response = self._session.get(operation_location, headers=headers)
             poll_response.raise_for_status()
             result = poll_response.json()
             
@@ -389,6 +391,11 @@ class ContentUnderstandingService:
         self._ensure_initialized()
         return self._client is not None
     
+    def get_client(self) -> Optional[ContentUnderstandingClient]:
+        """Return the shared client, or None if the service is not configured."""
+        self._ensure_initialized()
+        return self._client
+    
     async def analyze_claim_document(
         self,
         file_data: bytes,
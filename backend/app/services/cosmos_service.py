@@ -7,9 +7,10 @@ This service manages storage and retrieval of:
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from azure.cosmos import CosmosClient, PartitionKey, exceptions
 from azure.cosmos.container import ContainerProxy
@@ -27,6 +28,9 @@ from app.models.agent_models import (
 
 logger = logging.getLogger(__name__)
 
+# Upserts of one batch in flight at once; each holds a worker thread
+_UPSERT_CONCURRENCY = 8
+
 
 class CosmosAgentService:
     """Service for managing agent data in Cosmos DB."""
@@ -265,16 +269,64 @@ class CosmosAgentService:
             # Convert to dict for Cosmos DB
             execution_dict = execution.model_dump(mode='json')
             
-            # Upsert the document
-            result = self._executions_container.upsert_item(execution_dict)
+            # Upsert the document; skip echoing it back since we already hold it
+            self._executions_container.upsert_item(execution_dict, no_response=True)
             
             logger.debug(f"✅ Saved execution: {execution.id} for claim {execution.claim_id}")
-            return AgentExecution(**result)
+            return execution
             
         except Exception as e:
             logger.error(f"❌ Failed to save execution {execution.id}: {e}")
             raise
     
+    async def save_executions(self, executions: List[AgentExecution]) -> int:
+        """Upsert a batch of execution records concurrently.
+        
+        Args:
+            executions: Execution records to save
+            
+        Returns:
+            Number of records saved successfully
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if not self._executions_container:
+            logger.warning("Executions container not available")
+            return 0
+        
+        documents = [execution.model_dump(mode='json') for execution in executions]
+        saved = await self._upsert_concurrently(self._executions_container, documents, "id")
+        logger.debug(f"✅ Saved {saved}/{len(documents)} executions")
+        return saved
+    
+    async def _upsert_concurrently(
+        self,
+        container: ContainerProxy,
+        documents: List[Dict[str, Any]],
+        key: str
+    ) -> int:
+        """Upsert documents in worker threads, at most ``_UPSERT_CONCURRENCY`` at a time.
+        
+        Failures are logged per document; returns the number saved.
+        """
+        semaphore = asyncio.Semaphore(_UPSERT_CONCURRENCY)
+        
+        def upsert(document: Dict[str, Any]) -> bool:
+            try:
+                container.upsert_item(document, no_response=True)
+                return True
+            except Exception as e:
+                logger.error(f"❌ Failed to save {container.id} item {document.get(key)}: {e}")
+                return False
+        
+        async def bounded_upsert(document: Dict[str, Any]) -> bool:
+            async with semaphore:
+                return await asyncio.to_thread(upsert, document)
+        
+        results = await asyncio.gather(*(bounded_upsert(document) for document in documents))
+        return sum(results)
+    
     async def save_token_usage(self, token_record: 'TokenUsageRecord') -> 'TokenUsageRecord':
         """Save a token usage record to Cosmos DB.
         
@@ -340,6 +392,29 @@ class CosmosAgentService:
             logger.error(f"❌ Failed to get execution {execution_id}: {e}")
             return None
     
+    def _build_executions_query(
+        self,
+        claim_id: Optional[str],
+        status: Optional[ExecutionStatus],
+        limit: int
+    ) -> tuple[str, List[Dict[str, Any]]]:
+        """Build the filtered execution listing query and its parameters."""
+        # Executions are partitioned on /id, so claim filters always fan out
+        # across partitions; the default index policy covers /claim_id.
+        query = "SELECT * FROM c WHERE 1=1"
+        parameters = []
+        
+        if claim_id:
+            query += " AND c.claim_id = @claim_id"
+            parameters.append({"name": "@claim_id", "value": claim_id})
+        
+        if status:
+            query += " AND c.status = @status"
+            parameters.append({"name": "@status", "value": status.value})
+        
+        query += f" ORDER BY c.started_at DESC OFFSET 0 LIMIT {limit}"
+        return query, parameters
+    
     async def list_executions(
         self,
         claim_id: Optional[str] = None,
@@ -363,23 +438,13 @@ class CosmosAgentService:
             return []
         
         try:
-            query = "SELECT * FROM c WHERE 1=1"
-            parameters = []
-            
-            if claim_id:
-                query += " AND c.claim_id = @claim_id"
-                parameters.append({"name": "@claim_id", "value": claim_id})
-            
-            if status:
-                query += " AND c.status = @status"
-                parameters.append({"name": "@status", "value": status.value})
-            
-            query += f" ORDER BY c.started_at DESC OFFSET 0 LIMIT {limit}"
+            query, parameters = self._build_executions_query(claim_id, status, limit)
             
             items = list(self._executions_container.query_items(
                 query=query,
                 parameters=parameters,
-                enable_cross_partition_query=True
+                enable_cross_partition_query=True,
+                max_item_count=limit
             ))
             
             return [AgentExecution(**item) for item in items]
@@ -388,6 +453,53 @@ class CosmosAgentService:
             logger.error(f"❌ Failed to list executions: {e}")
             return []
     
+    async def list_executions_stream(
+        self,
+        claim_id: Optional[str] = None,
+        status: Optional[ExecutionStatus] = None,
+        limit: int = 100
+    ) -> AsyncIterator[AgentExecution]:
+        """Yield execution records page by page as they arrive from Cosmos DB.
+        
+        Same filters as ``list_executions`` but without materializing the
+        full result list, so callers can stream large histories. Each page
+        is fetched in a worker thread. Query failures are re-raised so a
+        stream that breaks off doesn't look complete.
+        
+        Args:
+            claim_id: Filter by claim ID
+            status: Filter by execution status
+            limit: Maximum number of records to return
+            
+        Yields:
+            Execution records, newest first
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if not self._executions_container:
+            return
+        
+        try:
+            query, parameters = self._build_executions_query(claim_id, status, limit)
+            
+            pages = self._executions_container.query_items(
+                query=query,
+                parameters=parameters,
+                enable_cross_partition_query=True,
+                max_item_count=limit
+            ).by_page()
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+                for item in page:
+                    yield AgentExecution(**item)
+                
+        except Exception as e:
+            logger.error(f"❌ Failed to stream executions: {e}")
+            raise
+    
     async def get_claim_execution_history(self, claim_id: str) -> List[AgentExecution]:
         """Get all execution records for a specific claim.
         
@@ -432,6 +544,27 @@ class CosmosAgentService:
             # Fail soft - don't propagate error
             return record
     
+    async def save_token_usages(self, records: List[TokenUsageRecord]) -> int:
+        """Upsert a batch of token usage records concurrently.
+        
+        Args:
+            records: Token usage records to save
+            
+        Returns:
+            Number of records saved successfully
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if not self._token_usage_container:
+            logger.warning("Token usage container not available")
+            return 0
+        
+        documents = [record.model_dump(mode='json') for record in records]
+        saved = await self._upsert_concurrently(self._token_usage_container, documents, "record_id")
+        logger.debug(f"✅ Saved {saved}/{len(documents)} token usage records")
+        return saved
+    
     async def get_token_usage_by_claim(
         self,
         claim_id: str
@@ -725,10 +858,127 @@ class CosmosAgentService:
         except Exception as e:
             logger.error(f"❌ Failed to get evaluations for claim: {e}")
             return []
+    
+    async def get_evaluation_scores(
+        self,
+        execution_id: Optional[str] = None,
+        claim_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get only the score fields of evaluations for an execution or claim.
+        
+        Used for summaries, so the prompts, responses and reasoning stored with
+        each evaluation are not transferred.
+        
+        Args:
+            execution_id: Execution ID to filter on
+            claim_id: Claim ID to filter on, used when no execution ID is given
+            
+        Returns:
+            List of score dicts, newest first
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if not self.client or not (execution_id or claim_id):
+            return []
+        
+        try:
+            database = self.client.get_database_client(self.settings.azure_cosmos_database_name)
+            evaluations_container = database.get_container_client('evaluations')
+            
+            field, value = ("execution_id", execution_id) if execution_id else ("claim_id", claim_id)
+            query = f"""
+                SELECT c.evaluator_type, c.groundedness_score, c.relevance_score,
+                       c.coherence_score, c.fluency_score, c.overall_score,
+                       c.evaluation_timestamp
+                FROM c 
+                WHERE c.type = 'evaluation' 
+                AND c.{field} = @value
+                ORDER BY c.evaluation_timestamp DESC
+            """
+            
+            parameters = [{"name": "@value", "value": value}]
+            
+            return await asyncio.to_thread(lambda: list(evaluations_container.query_items(
+                query=query,
+                parameters=parameters,
+                enable_cross_partition_query=True
+            )))
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to get evaluation scores: {e}")
+            return []
+
+
+class ExecutionWriteQueue:
+    """Buffer execution records and write them to Cosmos DB in batches.
+    
+    A single background consumer drains up to ``batch_size`` records, or
+    whatever arrived within ``max_wait_ms`` of the first one, and hands them
+    to ``CosmosAgentService.save_executions``. The executions container is
+    partitioned on ``/id`` so every record is its own partition and Cosmos
+    transactional batches do not apply; coalescing still bounds the number
+    of concurrent upserts and keeps them off the request path.
+    
+    At most ``max_size`` records are buffered; once full, ``put`` waits for
+    the consumer so a slow Cosmos DB slows producers down instead of
+    growing memory.
+    """
+    
+    def __init__(self, batch_size: int = 100, max_wait_ms: int = 50, max_size: int = 1000):
+        """Initialize the queue; the consumer starts on first ``put``."""
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue[AgentExecution] = asyncio.Queue(maxsize=max_size)
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def put(self, execution: AgentExecution) -> None:
+        """Enqueue an execution record for the next batch, waiting while the queue is full."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        if self._queue.full():
+            logger.warning(
+                f"⚠️ Execution write queue full ({self._queue.maxsize} records), waiting for Cosmos DB"
+            )
+        await self._queue.put(execution)
+    
+    async def _run(self) -> None:
+        """Consume the queue forever, flushing one batch at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                cosmos_service = await get_cosmos_service()
+                await cosmos_service.save_executions(batch)
+            except Exception as e:
+                logger.error(f"❌ Failed to flush {len(batch)} executions: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def close(self) -> None:
+        """Flush pending records and stop the consumer."""
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+        self._worker = None
 
 
 # Global singleton instance
 _cosmos_service: Optional[CosmosAgentService] = None
+_execution_write_queue: Optional[ExecutionWriteQueue] = None
 
 
 async def get_cosmos_service() -> CosmosAgentService:
@@ -742,3 +992,34 @@ async def get_cosmos_service() -> CosmosAgentService:
         _cosmos_service = CosmosAgentService()
         await _cosmos_service.initialize()
     return _cosmos_service
+
+
+def get_cosmos_service_if_ready() -> Optional[CosmosAgentService]:
+    """Return the Cosmos DB service without awaiting, if it is initialized.
+    
+    Hot paths use this to skip persistence cheaply when Cosmos DB is not
+    configured; startup has already created the singleton.
+    
+    Returns:
+        Initialized Cosmos DB service, or None
+    """
+    if _cosmos_service is not None and _cosmos_service._initialized:
+        return _cosmos_service
+    return None
+
+
+def get_execution_write_queue() -> ExecutionWriteQueue:
+    """Get or create the global execution write queue.
+    
+    Returns:
+        Shared execution write queue
+    """
+    global _execution_write_queue
+    if _execution_write_queue is None:
+        settings = get_settings()
+        _execution_write_queue = ExecutionWriteQueue(
+            batch_size=settings.azure_cosmos_write_batch_size,
+            max_wait_ms=settings.azure_cosmos_write_max_wait_ms,
+            max_size=settings.azure_cosmos_write_queue_size
+        )
+    return _execution_write_queue
@@ -398,40 +398,45 @@ class EvaluationService:
     async def get_evaluation_summary(self, execution_id: Optional[str] = None, claim_id: Optional[str] = None) -> EvaluationSummary:
         """Get evaluation summary."""
         try:
-            if execution_id:
-                results = await self.get_evaluations_for_execution(execution_id)
-            elif claim_id:
-                results = await self.get_evaluations_for_claim(claim_id)
-            else:
+            if not execution_id and not claim_id:
                 return EvaluationSummary()
             
-            if not results:
+            await self._ensure_cosmos_initialized()
+            if not self.cosmos_service:
                 return EvaluationSummary(execution_id=execution_id, claim_id=claim_id)
             
-            summary = EvaluationSummary(
+            # Only the score fields are fetched, newest first
+            rows = await self.cosmos_service.get_evaluation_scores(
                 execution_id=execution_id,
-                claim_id=claim_id,
-                total_evaluations=len(results),
-                evaluator_type=results[0].evaluator_type if results else EvaluatorType.FOUNDRY
+                claim_id=claim_id
             )
+            if not rows:
+                return EvaluationSummary(execution_id=execution_id, claim_id=claim_id)
             
-            # Calculate averages
-            groundedness_scores = [r.groundedness_score for r in results if r.groundedness_score is not None]
-            relevance_scores = [r.relevance_score for r in results if r.relevance_score is not None]
-            coherence_scores = [r.coherence_score for r in results if r.coherence_score is not None]
-            fluency_scores = [r.fluency_score for r in results if r.fluency_score is not None]
-            overall_scores = [r.overall_score for r in results if r.overall_score is not None]
-            
-            summary.avg_groundedness = sum(groundedness_scores) / len(groundedness_scores) if groundedness_scores else None
-            summary.avg_relevance = sum(relevance_scores) / len(relevance_scores) if relevance_scores else None
-            summary.avg_coherence = sum(coherence_scores) / len(coherence_scores) if coherence_scores else None
-            summary.avg_fluency = sum(fluency_scores) / len(fluency_scores) if fluency_scores else None
-            summary.avg_overall = sum(overall_scores) / len(overall_scores) if overall_scores else None
-            
-            summary.start_time = min(r.evaluation_timestamp for r in results)
-            summary.end_time = max(r.evaluation_timestamp for r in results)
+            # Calculate averages in one pass, skipping missing scores
+            metrics = ("groundedness", "relevance", "coherence", "fluency", "overall")
+            totals = dict.fromkeys(metrics, 0.0)
+            counts = dict.fromkeys(metrics, 0)
+            for row in rows:
+                for metric in metrics:
+                    score = row.get(f"{metric}_score")
+                    if score is not None:
+                        totals[metric] += score
+                        counts[metric] += 1
+            averages = {
+                f"avg_{metric}": totals[metric] / counts[metric] if counts[metric] else None
+                for metric in metrics
+            }
             
-            return summary
+            return EvaluationSummary(
+                execution_id=execution_id,
+                claim_id=claim_id,
+                total_evaluations=len(rows),
+                evaluator_type=rows[0].get("evaluator_type") or EvaluatorType.FOUNDRY,
+                start_time=rows[-1]["evaluation_timestamp"],
+                end_time=rows[0]["evaluation_timestamp"],
+                **averages
+            )
             
         except Exception as e:
             logger.error(f"Failed to get evaluation summary: {e}")
@@ -7,6 +7,7 @@ compiled LangGraph agent from ``app.workflow.registry``.
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import uuid
@@ -180,11 +181,13 @@ async def run(agent_name: str, claim_data: Dict[str, Any], user_token: str = Non
             if agent_id:
                 logger.debug(f"✨ Using Azure AI Agent Service (v2) for {agent_name}")
                 span.set_attribute("gen_ai.system", "azure_ai_agents_v2")
-                result = _run_azure_agent_v2(agent_name, claim_data, user_token=user_token)
+                result = await asyncio.to_thread(
+                    _run_azure_agent_v2, agent_name, claim_data, user_token=user_token
+                )
             elif agent_name in AGENTS:
                 logger.debug(f"📊 Using LangGraph agent for {agent_name}")
                 span.set_attribute("gen_ai.system", "langgraph")
-                messages, usage = _run_langgraph_agent(agent_name, claim_data)
+                messages, usage = await asyncio.to_thread(_run_langgraph_agent, agent_name, claim_data)
                 result = (messages, usage, None)  # No thread_id for LangGraph
             else:
                 # Agent not yet deployed (background thread still running) and no LangGraph fallback
@@ -5,6 +5,7 @@ and extracts token usage data to save to Cosmos DB.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Optional
 
@@ -13,6 +14,7 @@ from opentelemetry.sdk.trace.export import SpanProcessor
 from opentelemetry.trace import Status, StatusCode
 
 from app.models.agent_models import TokenUsageRecord, ServiceType, OperationType
+from app.services.token_tracker import get_run_token_tracker
 from datetime import datetime, timezone
 import uuid
 
@@ -25,14 +27,32 @@ class TokenUsageSpanProcessor(SpanProcessor):
     def __init__(self, token_tracker=None):
         """Initialize the span processor.
         
+        Usage is recorded to the tracker of the workflow run the span ended
+        in (see ``use_run_token_tracker``), so concurrent runs keep their
+        records apart.
+        
         Args:
-            token_tracker: TokenUsageTracker instance to record usage
+            token_tracker: TokenUsageTracker for spans that end outside a
+                tracked run (optional; such spans are skipped without one)
         """
         self.token_tracker = token_tracker
         self._enabled = False
+        # Recording tasks started from on_end that haven't finished yet,
+        # with the tracker each one records to
+        self._pending: dict[asyncio.Task, object] = {}
+        # Event loop that records usage for spans ending in worker threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
     
     def enable(self):
-        """Enable token usage capture."""
+        """Enable token usage capture.
+        
+        When called from the event loop, spans that end in worker threads
+        (e.g. a workflow iterated with asyncio.to_thread) are recorded on it.
+        """
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
         self._enabled = True
         logger.debug("Token usage capture enabled")
     
@@ -41,6 +61,24 @@ class TokenUsageSpanProcessor(SpanProcessor):
         self._enabled = False
         logger.debug("Token usage capture disabled")
     
+    def _start_recording(self, token_tracker, usage: dict) -> None:
+        """Start a recording task on the running loop and keep track of it."""
+        task = asyncio.get_running_loop().create_task(token_tracker.record_token_usage(**usage))
+        self._pending[task] = token_tracker
+        task.add_done_callback(lambda done: self._pending.pop(done, None))
+    
+    async def wait_pending(self, token_tracker=None) -> None:
+        """Wait for token usage recorded from ended spans to be saved.
+        
+        Only waits for records of ``token_tracker`` when given.
+        """
+        tasks = [
+            task for task, tracker in list(self._pending.items())
+            if token_tracker is None or tracker is token_tracker
+        ]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     def on_start(self, span: ReadableSpan, parent_context = None) -> None:
         """Called when a span starts (no-op for token capture)."""
         pass
@@ -50,7 +88,8 @@ class TokenUsageSpanProcessor(SpanProcessor):
         if not self._enabled:
             return
             
-        if not self.token_tracker:
+        token_tracker = get_run_token_tracker() or self.token_tracker
+        if not token_tracker:
             logger.debug("Token tracker not available in span processor")
             return
         
@@ -98,21 +137,25 @@ class TokenUsageSpanProcessor(SpanProcessor):
                 operation_type = "embedding" if "embedding" in span_name.lower() else "chat_completion"
                 
                 # Record the usage asynchronously
-                import asyncio
+                usage = {
+                    "model_name": model_name,
+                    "deployment_name": deployment,
+                    "prompt_tokens": int(prompt_tokens),
+                    "completion_tokens": int(completion_tokens),
+                    "agent_type": agent_type,
+                    "operation_type": operation_type,
+                }
                 try:
                     # Try to get the running event loop (Python 3.10+)
                     try:
-                        loop = asyncio.get_running_loop()
+                        asyncio.get_running_loop()
                         # If loop is running, create a task
-                        task = loop.create_task(self.token_tracker.record_token_usage(
-                            model_name=model_name,
-                            deployment_name=deployment,
-                            prompt_tokens=int(prompt_tokens),
-                            completion_tokens=int(completion_tokens),
-                            agent_type=agent_type,
-                            operation_type=operation_type
-                        ))
+                        self._start_recording(token_tracker, usage)
                     except RuntimeError:
+                        if self._loop is not None and not self._loop.is_closed():
+                            # Span ended in a worker thread; hand it to the loop
+                            self._loop.call_soon_threadsafe(self._start_recording, token_tracker, usage)
+                            return
                         # No running loop - this shouldn't happen in FastAPI context
                         logger.warning(f"⚠️ No running event loop - cannot record token usage asynchronously")
                         logger.warning(f"⚠️ Token usage: {prompt_tokens}+{completion_tokens} tokens for {model_name} NOT saved")
@@ -142,11 +185,11 @@ def get_token_span_processor() -> Optional[TokenUsageSpanProcessor]:
     return _token_span_processor
 
 
-def setup_token_span_processor(token_tracker) -> TokenUsageSpanProcessor:
+def setup_token_span_processor(token_tracker=None) -> TokenUsageSpanProcessor:
     """Set up the token usage span processor.
     
     Args:
-        token_tracker: TokenUsageTracker instance
+        token_tracker: Fallback TokenUsageTracker for spans outside a tracked run
         
     Returns:
         Configured span processor
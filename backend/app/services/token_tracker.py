@@ -10,11 +10,12 @@ Follows patterns from: https://github.com/alipouw13/ai-sec-claims-analysis
 """
 from __future__ import annotations
 
+import contextvars
 import logging
 import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.config import get_settings
 from app.models.agent_models import (
@@ -222,61 +223,101 @@ class TokenUsageTracker:
             return
         
         try:
-            record_id = str(uuid.uuid4())
-            total_tokens = prompt_tokens + completion_tokens
-            
-            # Calculate costs
-            model_key = self._get_model_key_for_pricing(model_name or deployment_name)
-            pricing = self.token_pricing.get(model_key, {"prompt": 0.0, "completion": 0.0})
-            prompt_cost = (prompt_tokens / 1000) * pricing["prompt"]
-            completion_cost = (completion_tokens / 1000) * pricing["completion"]
-            total_cost = prompt_cost + completion_cost
-            
-            # Determine service type and operation type based on operation
-            is_embedding = "embedding" in operation_type.lower()
-            service_type = ServiceType.OPENAI_EMBEDDING if is_embedding else ServiceType.OPENAI_CHAT
-            
-            # Map agent_type to operation_type
-            operation_type_enum = OperationType.DOCUMENT_EMBEDDING if is_embedding else self._map_agent_to_operation(agent_type)
-            
-            # Create token usage record
-            # Use workflow_id as session_id, fallback to generating one if not set
-            session_id = self._current_workflow_id or f"session_{record_id}"
-            
-            record = TokenUsageRecord(
-                id=record_id,
-                record_id=record_id,
-                session_id=session_id,
-                claim_id=self._current_claim_id,
-                execution_id=self._current_workflow_id,
-                service_type=service_type,
-                operation_type=operation_type_enum,
-                agent_type=agent_type,
-                model_name=model_name,
-                deployment_name=deployment_name,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=total_tokens,
-                prompt_cost=prompt_cost,
-                completion_cost=completion_cost,
-                total_cost=total_cost,
-                timestamp=datetime.now(timezone.utc),
-                success=True,
-                **kwargs
+            record = self._build_token_record(
+                model_name, deployment_name, prompt_tokens, completion_tokens,
+                agent_type, operation_type, **kwargs
             )
             
             # Save immediately to Cosmos DB (following pattern from reference repo)
             if self._cosmos_service and self._cosmos_service._initialized:
                 await self._save_token_record(record)
-                logger.debug(f"💰 Saved token usage to Cosmos: {total_tokens} tokens (${total_cost:.6f}) for {model_name}/{agent_type}")
+                logger.debug(f"💰 Saved token usage to Cosmos: {record.total_tokens} tokens (${record.total_cost:.6f}) for {model_name}/{agent_type}")
             else:
                 # Fallback: store for later if Cosmos not available
-                self._active_sessions[record_id] = record
-                logger.warning(f"⚠️ Cosmos not available, storing token record for later: {record_id}")
+                self._active_sessions[record.record_id] = record
+                logger.warning(f"⚠️ Cosmos not available, storing token record for later: {record.record_id}")
             
         except Exception as e:
             logger.error(f"Failed to record token usage: {e}")
     
+    async def record_token_usage_batch(self, usages: List[Dict[str, Any]]) -> None:
+        """Record several token usages and save them to Cosmos DB in one batch.
+        
+        Args:
+            usages: Keyword arguments for ``record_token_usage``, one dict per call
+        """
+        if not usages:
+            return
+        if not self._current_claim_id or not self._current_workflow_id:
+            logger.warning("Token tracking not started - call start_tracking first")
+            return
+        
+        try:
+            records = [self._build_token_record(**usage) for usage in usages]
+            if self._cosmos_service and self._cosmos_service._initialized:
+                saved = await self._cosmos_service.save_token_usages(records)
+                logger.debug(f"💰 Saved {saved}/{len(records)} token usage records to Cosmos")
+            else:
+                for record in records:
+                    self._active_sessions[record.record_id] = record
+                logger.warning(f"⚠️ Cosmos not available, storing {len(records)} token records for later")
+        except Exception as e:
+            logger.error(f"Failed to record token usage batch: {e}")
+    
+    def _build_token_record(
+        self,
+        model_name: str,
+        deployment_name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        agent_type: Optional[str] = None,
+        operation_type: str = "chat_completion",
+        **kwargs
+    ) -> TokenUsageRecord:
+        """Build a priced token usage record for the current tracking session."""
+        record_id = str(uuid.uuid4())
+        total_tokens = prompt_tokens + completion_tokens
+        
+        # Calculate costs
+        model_key = self._get_model_key_for_pricing(model_name or deployment_name)
+        pricing = self.token_pricing.get(model_key, {"prompt": 0.0, "completion": 0.0})
+        prompt_cost = (prompt_tokens / 1000) * pricing["prompt"]
+        completion_cost = (completion_tokens / 1000) * pricing["completion"]
+        total_cost = prompt_cost + completion_cost
+        
+        # Determine service type and operation type based on operation
+        is_embedding = "embedding" in operation_type.lower()
+        service_type = ServiceType.OPENAI_EMBEDDING if is_embedding else ServiceType.OPENAI_CHAT
+        
+        # Map agent_type to operation_type
+        operation_type_enum = OperationType.DOCUMENT_EMBEDDING if is_embedding else self._map_agent_to_operation(agent_type)
+        
+        # Create token usage record
+        # Use workflow_id as session_id, fallback to generating one if not set
+        session_id = self._current_workflow_id or f"session_{record_id}"
+        
+        return TokenUsageRecord(
+            id=record_id,
+            record_id=record_id,
+            session_id=session_id,
+            claim_id=self._current_claim_id,
+            execution_id=self._current_workflow_id,
+            service_type=service_type,
+            operation_type=operation_type_enum,
+            agent_type=agent_type,
+            model_name=model_name,
+            deployment_name=deployment_name,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=total_tokens,
+            prompt_cost=prompt_cost,
+            completion_cost=completion_cost,
+            total_cost=total_cost,
+            timestamp=datetime.now(timezone.utc),
+            success=True,
+            **kwargs
+        )
+    
     def _map_agent_to_operation(self, agent_type: Optional[str]) -> OperationType:
         """Map agent type to operation type."""
         if not agent_type:
@@ -332,11 +373,9 @@ class TokenUsageTracker:
                 record_count = len(self._active_sessions)
                 if record_count > 0:
                     logger.debug(f"💾 Saving {record_count} token records to Cosmos DB...")
-                    saved_count = 0
-                    for record_id, record in list(self._active_sessions.items()):
-                        await self._save_token_record(record)
-                        del self._active_sessions[record_id]
-                        saved_count += 1
+                    saved_count = await self._cosmos_service.save_token_usages(
+                        list(self._active_sessions.values())
+                    )
                     
                     logger.debug(f"✅ Saved {saved_count}/{record_count} token records to Cosmos DB")
             
@@ -509,6 +548,32 @@ class TokenUsageTracker:
 # Global singleton instance
 _token_tracker: Optional[TokenUsageTracker] = None
 
+# Tracker of the workflow run in the current context. Each run gets its own
+# tracker, so concurrent runs don't overwrite each other's claim/workflow IDs;
+# copied into the worker thread that iterates the workflow.
+_run_token_tracker: contextvars.ContextVar[Optional[TokenUsageTracker]] = contextvars.ContextVar(
+    "run_token_tracker", default=None
+)
+
+
+def use_run_token_tracker(tracker: Optional[TokenUsageTracker]) -> contextvars.Token:
+    """Make ``tracker`` the tracker of the run in the current context.
+    
+    Returns:
+        Token to pass to ``reset_run_token_tracker``
+    """
+    return _run_token_tracker.set(tracker)
+
+
+def reset_run_token_tracker(token: contextvars.Token) -> None:
+    """Restore the run tracker that was current before ``use_run_token_tracker``."""
+    _run_token_tracker.reset(token)
+
+
+def get_run_token_tracker() -> Optional[TokenUsageTracker]:
+    """Get the tracker of the workflow run in the current context, if any."""
+    return _run_token_tracker.get()
+
 
 def get_token_tracker(cosmos_service=None) -> TokenUsageTracker:
     """Get or create the global token usage tracker instance.
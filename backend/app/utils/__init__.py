@@ -0,0 +1 @@
+"""Lightweight helpers with no dependencies on the rest of the app."""
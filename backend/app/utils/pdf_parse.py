@@ -0,0 +1,101 @@
+"""PDF parsing helpers for the PDF process pool.
+
+Kept free of app.workflow imports: spawned pool workers import the module
+of every function they run, and the workflow package pulls in the agents.
+"""
+from __future__ import annotations
+
+import logging
+from typing import List
+
+import fitz  # PyMuPDF
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+def documents_from_fitz(
+    doc: fitz.Document,
+    source: str,
+    filename: str,
+    chunk_pages: bool
+) -> List[Document]:
+    """Build LangChain documents from an open PyMuPDF document."""
+    documents = []
+
+    if chunk_pages:
+        # Create one document per page
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            text = page.get_text()
+
+            if text.strip():  # Only process non-empty pages
+                metadata = {
+                    "source": source,
+                    "page": page_num + 1,
+                    "total_pages": len(doc),
+                    "filename": filename,
+                    "file_type": "pdf"
+                }
+
+                # Add PDF metadata if available
+                pdf_metadata = doc.metadata
+                if pdf_metadata.get("title"):
+                    metadata["title"] = pdf_metadata["title"]
+                if pdf_metadata.get("author"):
+                    metadata["author"] = pdf_metadata["author"]
+
+                documents.append(Document(
+                    page_content=text,
+                    metadata=metadata
+                ))
+    else:
+        # Create one document for entire PDF
+        text_content = []
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            text = page.get_text()
+            if text.strip():
+                text_content.append(text)
+
+        if text_content:
+            full_text = "\n\n".join(text_content)
+            metadata = {
+                "source": source,
+                "total_pages": len(doc),
+                "filename": filename,
+                "file_type": "pdf"
+            }
+
+            # Add PDF metadata if available
+            pdf_metadata = doc.metadata
+            if pdf_metadata.get("title"):
+                metadata["title"] = pdf_metadata["title"]
+            if pdf_metadata.get("author"):
+                metadata["author"] = pdf_metadata["author"]
+
+            documents.append(Document(
+                page_content=full_text,
+                metadata=metadata
+            ))
+
+    return documents
+
+
+def parse_pdf_bytes(data: bytes, filename: str, chunk_pages: bool = True) -> List[Document]:
+    """Convert PDF bytes to LangChain documents.
+    
+    Top-level so it can run in a worker process of the PDF process pool.
+    """
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+        try:
+            documents = documents_from_fitz(doc, filename, filename, chunk_pages)
+        finally:
+            doc.close()
+        logger.info(f"Converted PDF to {len(documents)} LangChain documents: {filename}")
+        return documents
+        
+    except Exception as e:
+        logger.error(f"Failed to convert PDF to LangChain documents {filename}: {e}")
+        raise Exception(f"PDF to documents conversion failed: {e}")
@@ -6,12 +6,17 @@ for use in the policy vector search system.
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, BinaryIO
 
 import fitz  # PyMuPDF
 from langchain_core.documents import Document
 
+from app.utils.pdf_parse import documents_from_fitz
+
 logger = logging.getLogger(__name__)
 
 
@@ -123,64 +128,7 @@ class PDFProcessor:
         
         try:
             doc = fitz.open(str(pdf_path))
-            documents = []
-            
-            if chunk_pages:
-                # Create one document per page
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text = page.get_text()
-                    
-                    if text.strip():  # Only process non-empty pages
-                        metadata = {
-                            "source": str(pdf_path),
-                            "page": page_num + 1,
-                            "total_pages": len(doc),
-                            "filename": pdf_path.name,
-                            "file_type": "pdf"
-                        }
-                        
-                        # Add PDF metadata if available
-                        pdf_metadata = doc.metadata
-                        if pdf_metadata.get("title"):
-                            metadata["title"] = pdf_metadata["title"]
-                        if pdf_metadata.get("author"):
-                            metadata["author"] = pdf_metadata["author"]
-                        
-                        documents.append(Document(
-                            page_content=text,
-                            metadata=metadata
-                        ))
-            else:
-                # Create one document for entire PDF
-                text_content = []
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text = page.get_text()
-                    if text.strip():
-                        text_content.append(text)
-                
-                if text_content:
-                    full_text = "\n\n".join(text_content)
-                    metadata = {
-                        "source": str(pdf_path),
-                        "total_pages": len(doc),
-                        "filename": pdf_path.name,
-                        "file_type": "pdf"
-                    }
-                    
-                    # Add PDF metadata if available
-                    pdf_metadata = doc.metadata
-                    if pdf_metadata.get("title"):
-                        metadata["title"] = pdf_metadata["title"]
-                    if pdf_metadata.get("author"):
-                        metadata["author"] = pdf_metadata["author"]
-                    
-                    documents.append(Document(
-                        page_content=full_text,
-                        metadata=metadata
-                    ))
-            
+            documents = documents_from_fitz(doc, str(pdf_path), pdf_path.name, chunk_pages)
             doc.close()
             logger.info(f"Converted PDF to {len(documents)} LangChain documents: {pdf_path.name}")
             return documents
@@ -189,6 +137,34 @@ class PDFProcessor:
             logger.error(f"Failed to convert PDF to LangChain documents {pdf_path}: {e}")
             raise Exception(f"PDF to documents conversion failed: {e}")
     
+    def pdf_stream_to_langchain_documents(
+        self,
+        fp: BinaryIO,
+        filename: str,
+        chunk_pages: bool = True
+    ) -> List[Document]:
+        """Convert an in-memory PDF to LangChain Document objects.
+        
+        Args:
+            fp: File-like object containing the PDF
+            filename: Name recorded as the document source
+            chunk_pages: If True, create one document per page. If False, create one document for entire PDF.
+            
+        Returns:
+            List of LangChain Document objects
+        """
+        try:
+            fp.seek(0)
+            doc = fitz.open(stream=fp.read(), filetype="pdf")
+            documents = documents_from_fitz(doc, filename, filename, chunk_pages)
+            doc.close()
+            logger.info(f"Converted PDF to {len(documents)} LangChain documents: {filename}")
+            return documents
+            
+        except Exception as e:
+            logger.error(f"Failed to convert PDF to LangChain documents {filename}: {e}")
+            raise Exception(f"PDF to documents conversion failed: {e}")
+    
     def is_valid_pdf(self, pdf_path: str | Path) -> bool:
         """Check if a file is a valid PDF that can be processed.
         
@@ -211,6 +187,30 @@ class PDFProcessor:
             
         except Exception:
             return False
+    
+    def is_valid_pdf_stream(self, fp: BinaryIO) -> bool:
+        """Check if a file-like object holds a valid PDF that can be processed.
+        
+        The stream is rewound before and after the check.
+        
+        Args:
+            fp: File-like object containing the PDF
+            
+        Returns:
+            True if the stream is a valid PDF, False otherwise
+        """
+        try:
+            fp.seek(0)
+            doc = fitz.open(stream=fp.read(), filetype="pdf")
+            page_count = len(doc)
+            doc.close()
+            
+            return page_count > 0
+            
+        except Exception:
+            return False
+        finally:
+            fp.seek(0)
 
 
 # Singleton instance for easy access
@@ -222,4 +222,32 @@ def get_pdf_processor() -> PDFProcessor:
     global _pdf_processor_singleton
     if _pdf_processor_singleton is None:
         _pdf_processor_singleton = PDFProcessor()
-    return _pdf_processor_singleton 
\ No newline at end of file
+    return _pdf_processor_singleton
+
+
+# Process pool for CPU-bound PDF parsing, created on first use
+_pdf_process_pool: ProcessPoolExecutor | None = None
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool used to parse PDFs outside the event loop process.
+    
+    Workers are spawned rather than forked, since the API process runs
+    threads (SDK clients, agent deployment) that are unsafe to fork. Submit
+    functions from app.utils.pdf_parse so workers skip the workflow imports.
+    """
+    global _pdf_process_pool
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_process_pool
+
+
+def shutdown_pdf_process_pool() -> None:
+    """Shut down the PDF process pool if it was started."""
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_process_pool = None 
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched and concurrent Cosmos DB writes.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require Azure OpenAI values; none of these tests reach Azure
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-10-21")
+
+from app.models.agent_models import AgentExecution
+from app.services import cosmos_service
+from app.services.cosmos_service import CosmosAgentService, ExecutionWriteQueue
+
+
+def _execution(n: int) -> AgentExecution:
+    return AgentExecution(id=f"exec-{n}", workflow_id="CLM-1", claim_id="CLM-1")
+
+
+class RecordingCosmos:
+    """Collects flushed batches, optionally blocking until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def save_executions(self, executions):
+        await self.release.wait()
+        self.batches.append([e.id for e in executions])
+        return len(executions)
+
+
+class SlowContainer:
+    """Container whose upserts take a while and track peak concurrency."""
+
+    id = "executions"
+
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def upsert_item(self, document, no_response=True):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            if document["id"] in self.fail_ids:
+                raise RuntimeError("conflict")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _patch_cosmos(monkeypatch, fake):
+    async def get_fake():
+        return fake
+    monkeypatch.setattr(cosmos_service, "get_cosmos_service", get_fake)
+
+
+def test_queue_coalesces_records_into_batches(monkeypatch):
+    """Records put within the wait window are flushed together, up to batch_size."""
+    fake = RecordingCosmos()
+    _patch_cosmos(monkeypatch, fake)
+
+    async def run():
+        queue = ExecutionWriteQueue(batch_size=3, max_wait_ms=50)
+        for n in range(5):
+            await queue.put(_execution(n))
+        await queue.close()
+
+    asyncio.run(run())
+    assert fake.batches == [["exec-0", "exec-1", "exec-2"], ["exec-3", "exec-4"]]
+
+
+def test_full_queue_applies_backpressure(monkeypatch):
+    """put waits while max_size records are buffered and resumes once flushed."""
+    fake = RecordingCosmos()
+    fake.release.clear()
+    _patch_cosmos(monkeypatch, fake)
+
+    async def run():
+        queue = ExecutionWriteQueue(batch_size=1, max_wait_ms=0, max_size=2)
+        await queue.put(_execution(0))
+        # Let the consumer take the first record and block on the flush
+        await asyncio.sleep(0.01)
+        await queue.put(_execution(1))
+        await queue.put(_execution(2))
+
+        blocked = asyncio.create_task(queue.put(_execution(3)))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        fake.release.set()
+        await asyncio.wait_for(blocked, 1)
+        await queue.close()
+
+    asyncio.run(run())
+    assert [batch[0] for batch in fake.batches] == ["exec-0", "exec-1", "exec-2", "exec-3"]
+
+
+def test_upserts_run_concurrently_with_a_cap(monkeypatch):
+    """Batch upserts overlap, never exceed the cap, and count failures out."""
+    monkeypatch.setattr(cosmos_service, "_UPSERT_CONCURRENCY", 4)
+    service = object.__new__(CosmosAgentService)
+    container = SlowContainer(fail_ids={"exec-3"})
+    documents = [{"id": f"exec-{n}"} for n in range(12)]
+
+    saved = asyncio.run(service._upsert_concurrently(container, documents, "id"))
+
+    assert saved == 11
+    assert 1 < container.peak <= 4
+
+
+class RecordingQueue:
+    """Stands in for the shared execution write queue."""
+
+    def __init__(self):
+        self.executions = []
+
+    async def put(self, execution):
+        self.executions.append(execution)
+
+
+class DirectSaveCosmos:
+    """Initialized Cosmos service that records direct saves."""
+
+    def __init__(self):
+        self.saved = []
+
+    async def save_execution(self, execution):
+        self.saved.append(execution)
+
+
+def _run_agent(monkeypatch, params=None):
+    from app.api.v1.endpoints import agent
+
+    async def run_single_agent(agent_name, claim_data, user_token=None):
+        return [], {"total_tokens": 0}, "thread-1"
+
+    queue = RecordingQueue()
+    cosmos = DirectSaveCosmos()
+    monkeypatch.setattr(agent, "run_single_agent", run_single_agent)
+    monkeypatch.setattr(agent, "get_cosmos_service_if_ready", lambda: cosmos)
+    monkeypatch.setattr(agent, "get_execution_write_queue", lambda: queue)
+
+    # Exercise the endpoint so its query parameter default is covered too
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(agent.router)
+    response = TestClient(app).post(
+        "/agent/claim_assessor/run", params=params, json={"claim_id": "CLM-2026-000001"}
+    )
+    assert response.status_code == 200
+    return queue, cosmos
+
+
+def test_agent_runs_are_queued_by_default(monkeypatch):
+    """Agent execution records go through the write queue unless a save is requested."""
+    queue, cosmos = _run_agent(monkeypatch)
+
+    assert [e.workflow_type for e in queue.executions] == ["single_agent_execution"]
+    assert cosmos.saved == []
+
+
+def test_wait_for_save_writes_before_responding(monkeypatch):
+    """wait_for_save bypasses the queue and saves on the request path."""
+    queue, cosmos = _run_agent(monkeypatch, {"wait_for_save": "true"})
+
+    assert queue.executions == []
+    assert len(cosmos.saved) == 1
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-memory document metadata store and upload dedup.
+"""
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require Azure OpenAI values; none of these tests reach Azure
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-10-21")
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.api.v1.endpoints import documents
+from app.api.v1.endpoints.documents import DocumentMetadata, MetadataStore
+
+
+def _doc(doc_id: str, category: str = "policy", indexed: bool = False,
+         minutes_ago: int = 0) -> DocumentMetadata:
+    return DocumentMetadata(
+        id=doc_id,
+        filename=f"{doc_id}.txt",
+        original_filename=f"{doc_id}.txt",
+        category=category,
+        size=1,
+        content_type="text/plain",
+        upload_date=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        indexed=indexed,
+        blob_name=f"{category}/{doc_id}.txt",
+        blob_url=f"https://storage.test/documents/{category}/{doc_id}.txt",
+    )
+
+
+class FakeStorage:
+    """Records uploads in memory instead of Azure Blob Storage."""
+
+    def __init__(self):
+        self.blobs = {}
+
+    def document_exists(self, blob_name):
+        return blob_name in self.blobs
+
+    def get_blob_url(self, blob_name):
+        return f"https://storage.test/documents/{blob_name}"
+
+    def upload_document(self, file_data, filename, category, content_type,
+                        metadata=None, length=None, doc_id=None, upload_date=None):
+        extension = os.path.splitext(filename)[1].lower()
+        blob_name = f"{category}/{doc_id}{extension}"
+        self.blobs[blob_name] = file_data.read()
+        return blob_name, self.get_blob_url(blob_name)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MetadataStore()
+    monkeypatch.setattr(documents, "_metadata_cache", store)
+    return store
+
+
+def _upload(content: bytes, filename: str) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        size=len(content),
+        filename=filename,
+        headers=Headers({"content-type": "text/plain"}),
+    )
+
+
+def _store(upload: UploadFile, category: str, storage: FakeStorage,
+           raw_bytes: dict = None) -> DocumentMetadata:
+    return asyncio.run(documents._store_upload(upload, category, storage, raw_bytes))
+
+
+def test_metadata_store_counts():
+    """Category and indexed counters follow add, mark_indexed and remove."""
+    store = MetadataStore()
+    store.add(_doc("a", "policy", indexed=True))
+    store.add(_doc("b", "policy"))
+    store.add(_doc("c", "claim"))
+
+    assert store.count() == 3
+    assert store.count("policy") == 2
+    assert store.indexed_count() == 1
+    assert store.indexed_count("claim") == 0
+
+    assert store.mark_indexed("c")
+    assert store.indexed_count("claim") == 1
+    assert not store.mark_indexed("missing")
+
+    store.remove("a")
+    assert store.count("policy") == 1
+    assert store.indexed_count("policy") == 0
+    assert store.indexed_count() == 1
+
+    store.clear_indexed()
+    assert store.indexed_count() == 0
+    assert not store.get("c").indexed
+
+
+def test_metadata_store_replace_keeps_counters():
+    """Re-adding a document moves it between categories without double counting."""
+    store = MetadataStore()
+    store.add(_doc("a", "policy", indexed=True))
+    store.add(_doc("a", "claim", indexed=True))
+
+    assert store.count() == 1
+    assert store.count("policy") == 0
+    assert store.indexed_count("policy") == 0
+    assert store.indexed_count("claim") == 1
+
+
+def test_metadata_store_lists_newest_first():
+    """Listings come back newest first, per category and overall."""
+    store = MetadataStore()
+    store.add(_doc("old", "policy", minutes_ago=10))
+    store.add(_doc("new", "policy", minutes_ago=1))
+    store.add(_doc("mid", "claim", minutes_ago=5))
+
+    page, total = store.list()
+    assert [d.id for d in page] == ["new", "mid", "old"]
+    assert total == 3
+
+    page, total = store.list(category="policy", limit=1)
+    assert [d.id for d in page] == ["new"]
+    assert total == 2
+
+
+def test_same_category_duplicate_is_skipped(store):
+    """Uploading the same bytes twice into one category stores one blob."""
+    storage = FakeStorage()
+    first = _store(_upload(b"same content", "a.txt"), "policy", storage)
+    store.mark_indexed(first.id)
+    second = _store(_upload(b"same content", "b.txt"), "policy", storage)
+
+    assert not first.duplicate
+    assert second.duplicate
+    assert second.id == first.id
+    assert len(storage.blobs) == 1
+    assert store.count() == 1
+
+
+def test_cross_category_upload_is_not_a_duplicate(store):
+    """The same bytes uploaded as a policy and as a claim are separate documents."""
+    storage = FakeStorage()
+    policy = _store(_upload(b"same content", "a.txt"), "policy", storage)
+    claim = _store(_upload(b"same content", "a.txt"), "claim", storage)
+
+    assert not claim.duplicate
+    assert claim.id != policy.id
+    assert claim.blob_name.startswith("claim/")
+    assert store.count("policy") == 1
+    assert store.count("claim") == 1
+
+
+def test_extension_case_maps_to_one_blob(store):
+    """A.TXT and a.txt with the same bytes share a lowercase blob name."""
+    storage = FakeStorage()
+    upper = _store(_upload(b"same content", "A.TXT"), "policy", storage)
+    store.mark_indexed(upper.id)
+    lower = _store(_upload(b"same content", "a.txt"), "policy", storage)
+
+    assert upper.blob_name.endswith(".txt")
+    assert lower.duplicate
+    assert list(storage.blobs) == [upper.blob_name]
+
+
+def test_existing_blob_is_not_assumed_indexed(store):
+    """A blob stored earlier but missing from the cache still gets indexed."""
+    storage = FakeStorage()
+    first = _store(_upload(b"same content", "a.txt"), "policy", storage)
+    store.remove(first.id)
+
+    again = _store(_upload(b"same content", "a.txt"), "policy", storage)
+
+    assert again.id == first.id
+    assert not again.indexed
+    assert not again.duplicate
+    assert len(storage.blobs) == 1
+
+
+def test_cached_unindexed_upload_is_indexed_again(store):
+    """Re-uploading a cached document that was never indexed queues it for indexing."""
+    storage = FakeStorage()
+    first = _store(_upload(b"same content", "a.txt"), "policy", storage)
+
+    raw_bytes = {}
+    again = _store(_upload(b"same content", "b.txt"), "policy", storage, raw_bytes)
+
+    assert again.id == first.id
+    assert not again.indexed
+    assert not again.duplicate
+    assert raw_bytes == {first.id: b"same content"}
+    assert len(storage.blobs) == 1
+    assert store.count() == 1
+
+
+def test_reset_removes_indexed_chunks(store, monkeypatch):
+    """Resetting the index deletes search chunks of indexed uploads."""
+    from app.api.v1.endpoints import index_management
+
+    store.add(_doc("a", "policy", indexed=True))
+    store.add(_doc("b", "claim", indexed=True))
+    store.add(_doc("c", "policy"))
+    deleted = []
+    monkeypatch.setattr(index_management, "_metadata_cache", store)
+    monkeypatch.setattr(index_management, "_delete_search_chunks", lambda doc: deleted.append(doc.id))
+    monkeypatch.setattr(index_management, "save_indexed_ids", lambda ids: None)
+    monkeypatch.setattr(index_management, "rebuild_index_sync", lambda include_uploaded: None)
+
+    asyncio.run(index_management._reset_index())
+
+    assert sorted(deleted) == ["a", "b"]
+    assert store.indexed_count() == 0
+
+
+def test_reset_deletes_chunks_concurrently_with_a_cap(store, monkeypatch):
+    """Chunk deletions during a reset overlap but never exceed the cap."""
+    from app.api.v1.endpoints import index_management
+
+    for n in range(10):
+        store.add(_doc(f"doc-{n}", "policy", indexed=True))
+    active = peak = 0
+    lock = threading.Lock()
+
+    def delete_chunks(doc):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    monkeypatch.setattr(index_management, "_RESET_DELETE_CONCURRENCY", 3)
+    monkeypatch.setattr(index_management, "_metadata_cache", store)
+    monkeypatch.setattr(index_management, "_delete_search_chunks", delete_chunks)
+    monkeypatch.setattr(index_management, "save_indexed_ids", lambda ids: None)
+    monkeypatch.setattr(index_management, "rebuild_index_sync", lambda include_uploaded: None)
+
+    asyncio.run(index_management._reset_index())
+
+    assert 1 < peak <= 3
+
+
+def test_index_status_recompute_scans_metadata(store, monkeypatch):
+    """recompute counts uploaded policy documents by scanning, like the counters do."""
+    from app.api.v1.endpoints import index_management
+    from app.services import azure_search
+
+    class FakeSearch:
+        index_name = "insurance-policies"
+
+        def get_index_statistics(self):
+            return {"document_count": 5, "storage_size_bytes": 0}
+
+    store.add(_doc("a", "policy", indexed=True))
+    store.add(_doc("b", "policy"))
+    store.add(_doc("c", "claim", indexed=True))
+    # Drift the counters so only a scan gets the indexed count right
+    store._indexed_by_category["claim"] = 0
+    monkeypatch.setattr(index_management, "_is_search_configured", lambda: True)
+    monkeypatch.setattr(azure_search, "get_azure_search_service", lambda: FakeSearch())
+
+    status = index_management.get_index_status(recompute=True)
+
+    assert status.uploaded_docs_count == 2
+    assert status.indexed_uploaded_count == 1
+
+
+class ListingStorage:
+    """Lists a fixed set of blobs, running a hook while the listing is in flight."""
+
+    blob_url_prefix = "https://storage.test/documents/"
+
+    def __init__(self, blob_names, during_listing=None):
+        self.blob_names = blob_names
+        self.during_listing = during_listing
+
+    def list_documents(self):
+        if self.during_listing is not None:
+            self.during_listing()
+        return [
+            {"blob_name": name, "size": 1, "content_type": "text/plain",
+             "created": datetime.now(timezone.utc), "metadata": {}}
+            for name in self.blob_names
+        ]
+
+
+def _refresh(monkeypatch, storage):
+    monkeypatch.setattr(documents, "get_azure_storage_service", lambda: storage)
+    monkeypatch.setattr(documents, "_missing_documents", {})
+    # Not the first load, so documents missing from the listing are evicted
+    monkeypatch.setattr(documents, "_cache_loaded_at", 0.0)
+    asyncio.run(documents._refresh_cache_from_storage())
+
+
+def test_refresh_adds_listed_and_evicts_deleted(store, monkeypatch):
+    """Blobs from the listing are added; cached documents no longer listed are dropped."""
+    store.add(_doc("kept", "policy", indexed=True))
+    store.add(_doc("deleted", "policy", minutes_ago=5))
+
+    _refresh(monkeypatch, ListingStorage(["policy/kept.txt", "claim/new.txt"]))
+
+    assert "deleted" not in store
+    assert store.get("kept").indexed
+    assert store.get("new").category == "claim"
+
+
+def test_refresh_keeps_documents_added_during_listing(store, monkeypatch):
+    """An upload that lands while the container is being listed is not evicted."""
+    store.add(_doc("old", "policy"))
+    # Uploaded earlier by the clock, but added to the store mid-listing
+    late = _doc("late", "policy", minutes_ago=30)
+
+    _refresh(monkeypatch, ListingStorage(["policy/old.txt"], lambda: store.add(late)))
+
+    assert "late" in store
+    assert "old" in store
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Unit tests for streaming execution history out of Cosmos DB.
+"""
+import asyncio
+import os
+import sys
+import threading
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require Azure OpenAI values; none of these tests reach Azure
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-10-21")
+
+import pytest
+
+from app.services.cosmos_service import CosmosAgentService
+
+
+def _item(n: int) -> dict:
+    return {"id": f"exec-{n}", "workflow_id": "CLM-1", "claim_id": "CLM-1"}
+
+
+class PagedQuery:
+    """Query result whose pages are fetched lazily, like the Cosmos SDK's."""
+
+    def __init__(self, pages, fail_on_page=None):
+        self.pages = pages
+        self.fail_on_page = fail_on_page
+        self.fetch_threads = []
+
+    def by_page(self):
+        for number, page in enumerate(self.pages):
+            self.fetch_threads.append(threading.current_thread())
+            if number == self.fail_on_page:
+                raise RuntimeError("service unavailable")
+            yield iter(page)
+
+
+class QueryContainer:
+    def __init__(self, result):
+        self.result = result
+
+    def query_items(self, **kwargs):
+        return self.result
+
+
+def _service(result: PagedQuery) -> CosmosAgentService:
+    service = object.__new__(CosmosAgentService)
+    service._initialized = True
+    service._executions_container = QueryContainer(result)
+    return service
+
+
+async def _collect(service: CosmosAgentService) -> list:
+    return [execution.id async for execution in service.list_executions_stream(limit=10)]
+
+
+def test_pages_are_fetched_off_the_event_loop():
+    """Every page fetch runs in a worker thread, and all items come through."""
+    result = PagedQuery([[_item(0), _item(1)], [_item(2)]])
+
+    ids = asyncio.run(_collect(_service(result)))
+
+    assert ids == ["exec-0", "exec-1", "exec-2"]
+    assert result.fetch_threads
+    assert threading.main_thread() not in result.fetch_threads
+
+
+def test_mid_stream_failure_is_raised():
+    """A failing page fetch aborts the stream instead of ending it early."""
+    result = PagedQuery([[_item(0)], [_item(1)]], fail_on_page=1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_collect(_service(result)))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for SAS URL generation in the Azure Blob Storage service.
+"""
+import base64
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require Azure OpenAI values; none of these tests reach Azure
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-10-21")
+
+from azure.storage.blob import UserDelegationKey
+
+from app.services.azure_storage import AzureStorageService
+
+BLOB_URL = "https://account.blob.core.windows.net/documents/policy/a.pdf"
+
+
+def _service(sas_expiry_minutes: int) -> AzureStorageService:
+    """Storage service with a local delegation key instead of Azure clients."""
+    service = object.__new__(AzureStorageService)
+    service.account_name = "account"
+    service.container_name = "documents"
+    service.blob_url_prefix = "https://account.blob.core.windows.net/documents/"
+    service.sas_expiry_minutes = sas_expiry_minutes
+
+    key = UserDelegationKey()
+    key.signed_oid = "oid"
+    key.signed_tid = "tid"
+    key.signed_start = "2026-01-01T00:00:00Z"
+    key.signed_expiry = "2026-01-08T00:00:00Z"
+    key.signed_service = "b"
+    key.signed_version = "2020-02-10"
+    key.value = base64.b64encode(b"k" * 32).decode()
+    service._delegation_key = key
+    service._delegation_key_expiry = datetime.now(timezone.utc) + timedelta(days=7)
+    service._delegation_key_lock = threading.Lock()
+    service._delegation_retry_at = 0.0
+    service._sas_cache = {}
+    return service
+
+
+def _expiry(url: str) -> datetime:
+    value = parse_qs(urlsplit(url).query)["se"][0]
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def test_direct_url_without_sas_expiry():
+    """Without a configured expiry the plain blob URL is returned."""
+    assert _service(0).generate_sas_url("policy/a.pdf") == BLOB_URL
+
+
+def test_sas_url_is_reused_and_short_lived():
+    """Signed URLs are reused within a bucket and expire shortly after the configured time."""
+    service = _service(15)
+    url = service.generate_sas_url("policy/a.pdf")
+
+    assert url.startswith(BLOB_URL + "?")
+    assert service.generate_sas_url("policy/a.pdf") == url
+
+    remaining = _expiry(url) - datetime.now(timezone.utc)
+    assert timedelta(minutes=14) < remaining <= timedelta(minutes=20)
+
+
+def test_sas_cache_is_per_service_and_cleared_on_key_rotation():
+    """Each service keeps its own signed tokens, dropped when a new key is obtained."""
+    service = _service(15)
+    other = _service(15)
+    service.generate_sas_url("policy/a.pdf")
+
+    assert len(service._sas_cache) == 1
+    assert other._sas_cache == {}
+
+    # Force a rotation: the cached key is about to expire
+    service._delegation_key_expiry = datetime.now(timezone.utc)
+    new_key = service._delegation_key
+    service.blob_service_client = type(
+        "BlobServiceClient", (), {"get_user_delegation_key": lambda self, start, expiry: new_key}
+    )()
+    service.generate_sas_url("policy/b.pdf")
+
+    assert [key[0] for key in service._sas_cache] == ["policy/b.pdf"]
+
+
+def test_sas_expiry_capped_by_expiry_hours():
+    """The configured expiry never exceeds the caller's expiry_hours."""
+    service = _service(24 * 60)
+    url = service.generate_sas_url("policy/a.pdf", expiry_hours=1)
+
+    remaining = _expiry(url) - datetime.now(timezone.utc)
+    assert remaining <= timedelta(minutes=65)
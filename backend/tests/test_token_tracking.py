@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-run token tracking through the token span processor.
+"""
+import asyncio
+import os
+import sys
+import threading
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require Azure OpenAI values; none of these tests reach Azure
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-10-21")
+
+from app.services.token_span_processor import TokenUsageSpanProcessor
+from app.services.token_tracker import (
+    TokenUsageTracker,
+    reset_run_token_tracker,
+    use_run_token_tracker,
+)
+
+
+class FakeSpan:
+    """Ended OpenAI chat span carrying token usage attributes."""
+
+    name = "openai.chat"
+
+    def __init__(self, prompt_tokens: int):
+        self.attributes = {
+            "gen_ai.system": "openai",
+            "gen_ai.request.model": "gpt-4.1-mini",
+            "gen_ai.usage.prompt_tokens": prompt_tokens,
+            "gen_ai.usage.completion_tokens": 1,
+        }
+
+
+def _claims(tracker: TokenUsageTracker) -> set:
+    return {record.claim_id for record in tracker._active_sessions.values()}
+
+
+def test_overlapping_runs_record_to_their_own_tracker():
+    """Spans ending in each run's worker thread are booked to that run's claim."""
+    processor = TokenUsageSpanProcessor()
+    both_started = threading.Barrier(2)
+
+    async def run(claim_id: str) -> TokenUsageTracker:
+        tracker = TokenUsageTracker()
+        token = use_run_token_tracker(tracker)
+        try:
+            await tracker.start_tracking(claim_id=claim_id, workflow_id=f"wf-{claim_id}")
+
+            def workflow():
+                # Both runs are in flight before either span ends
+                both_started.wait(timeout=5)
+                processor.on_end(FakeSpan(10))
+
+            await asyncio.to_thread(workflow)
+            await processor.wait_pending(tracker)
+            return tracker
+        finally:
+            reset_run_token_tracker(token)
+
+    async def main():
+        processor.enable()
+        return await asyncio.gather(run("CLM-A"), run("CLM-B"))
+
+    tracker_a, tracker_b = asyncio.run(main())
+
+    assert _claims(tracker_a) == {"CLM-A"}
+    assert _claims(tracker_b) == {"CLM-B"}
+
+
+def test_spans_outside_a_run_are_skipped():
+    """Without a run tracker in context, spans are not booked anywhere."""
+    processor = TokenUsageSpanProcessor()
+
+    async def main():
+        processor.enable()
+        await asyncio.to_thread(processor.on_end, FakeSpan(10))
+        await asyncio.sleep(0)
+        return dict(processor._pending)
+
+    assert asyncio.run(main()) == {}